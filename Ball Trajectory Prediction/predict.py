@@ -1,16 +1,20 @@
 from collections import deque
-from ultralytics import YOLO
-import math
 import time
 import cv2
 import os
+import sys
+import json
 
-def angle_between_lines(m1, m2=1):
-    if m1 != -1/m2:
-        angle = math.degrees(math.atan(abs((m2 - m1) / (1 + m1 * m2))))
-        return angle
-    else:
-        return 90.0
+# share the app's model registry so weights load once per process
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.models import get_model
+from src.detectors import get_detector, Detections
+from src import trajectory
+import numpy as np
+
+MODEL_PATH = os.path.join('runs','detect','train5','weights','best.pt')
+VIDEO_PATH = os.path.join('videos','test1.mp4')
 
 class FixedSizeQueue:
     def __init__(self, max_size):
@@ -32,103 +36,114 @@ class FixedSizeQueue:
         return len(self.queue)
 
 
-model_path = os.path.join('runs','detect','train5','weights','best.pt')
-model = YOLO(model_path)
+def configured_backend():
+    """detector.backend from the app's config.json (torch if unset)."""
+    try:
+        with open(os.path.join(ROOT, 'config.json')) as f:
+            return json.load(f).get('detector', {}).get('backend', 'torch')
+    except OSError:
+        return 'torch'
+
+def ball_detector(model_path, backend):
+    """
+    frame -> boxes. The trajectory overlay assumes one ball in the history: on torch,
+    model.track keeps ids across frames; the exported backends only detect, so
+    they keep the most confident box per frame.
+    """
+    if backend == 'torch':
+        model = get_model(model_path)
+        return lambda frame: model.track(frame, persist=True, conf=0.35, verbose=False)[0].boxes
+    detector = get_detector(model_path, backend)
+    def detect(frame):
+        boxes = detector.predict([frame], conf=0.35)[0]
+        return Detections(boxes.data[[np.argmax(boxes.conf)]]) if len(boxes) > 1 else boxes
+    return detect
+
+def main(video_path=VIDEO_PATH, model_path=MODEL_PATH, backend=None):
+    detect = ball_detector(model_path, backend or configured_backend())
 
-video_path = os.path.join('videos','test1.mp4')
-cap = cv2.VideoCapture(video_path)
-ret = True
-prevTime = 0
-centroid_history = FixedSizeQueue(10)
-start_time = time.time()
-interval = 0.6
-paused = False
-angle = 0
-prev_frame_time = 0 
-new_frame_time = 0
+    cap = cv2.VideoCapture(video_path)
+    ret = True
+    prevTime = 0
+    centroid_history = FixedSizeQueue(10)
+    start_time = time.time()
+    interval = 0.6
+    paused = False
+    prev_frame_time = 0 
+    new_frame_time = 0
 
-while ret:
-    ret, frame = cap.read()
-    if ret:
-        new_frame_time = time.time() 
-        fps = 1/(new_frame_time-prev_frame_time) 
-        prev_frame_time = new_frame_time 
-        fps = int(fps)  
-        fps = str(fps)
-        print(list(centroid_history.queue))
-        current_time = time.time()
-        if current_time - start_time >= interval and len(centroid_history)>0:
-            centroid_history.pop()
-            start_time = current_time
+    while ret:
+        ret, frame = cap.read()
+        if ret:
+            new_frame_time = time.time() 
+            fps = 1/(new_frame_time-prev_frame_time) 
+            prev_frame_time = new_frame_time 
+            fps = int(fps)  
+            fps = str(fps)
+            current_time = time.time()
+            if current_time - start_time >= interval and len(centroid_history)>0:
+                centroid_history.pop()
+                start_time = current_time
         
-        results = model.track(frame, persist=True,conf=0.35,verbose=False)
-        boxes = results[0].boxes
-        box = boxes.xyxy
-        rows,cols = box.shape
-        if len(box)!=0:
-            for i in range(rows):
-                x1,y1,x2,y2 = box[i]
-                x1,y1,x2,y2 = x1.item(),y1.item(),x2.item(),y2.item()
+            boxes = detect(frame)
+            box = boxes.xyxy
+            rows,cols = box.shape
+            if len(box)!=0:
+                for i in range(rows):
+                    x1,y1,x2,y2 = box[i]
+                    x1,y1,x2,y2 = x1.item(),y1.item(),x2.item(),y2.item()
                 
-                centroid_x = int((x1+x2)/2)
-                centroid_y = int((y1+y2)/2)
+                    centroid_x = int((x1+x2)/2)
+                    centroid_y = int((y1+y2)/2)
                 
-                centroid_history.add((centroid_x, centroid_y))
-                cv2.circle(frame,(centroid_x, centroid_y),radius=3,color=(0,0,255),thickness=-1)
-                cv2.rectangle(frame,(int(x1),int(y1)),(int(x2),int(y2)),(0,0,255),2)
+                    centroid_history.add((centroid_x, centroid_y))
+                    cv2.circle(frame,(centroid_x, centroid_y),radius=3,color=(0,0,255),thickness=-1)
+                    cv2.rectangle(frame,(int(x1),int(y1)),(int(x2),int(y2)),(0,0,255),2)
                 
-        if len(centroid_history) > 1:
-            centroid_list = list(centroid_history.get_queue())
-            for i in range(1, len(centroid_history)):
-                # if math.sqrt(y_diff**2+x_diff**2)<7:
-                cv2.line(frame, centroid_history.get_queue()[i-1], centroid_history.get_queue()[i], (255, 0, 0), 4)    
-                
-        if len(centroid_history) > 1:
-            centroid_list = list(centroid_history.get_queue())
-            x_diff = centroid_list[-1][0] - centroid_list[-2][0]
-            y_diff = centroid_list[-1][1] - centroid_list[-2][1]
-            if(x_diff!=0):
-                m1 = y_diff/x_diff
-                if m1==1:
-                    angle = 90
-                elif m1!=0:
-                    angle = 90-angle_between_lines(m1)
-                if angle>=45:
-                        print("ball bounced")
-            future_positions = [centroid_list[-1]]
-            for i in range(1, 5):
-                future_positions.append(
-                    (
-                        centroid_list[-1][0] + x_diff * i,
-                        centroid_list[-1][1] + y_diff * i
-                    )
-                )
-            print("Future Positions: ",future_positions)
-            for i in range(1,len(future_positions)):
-                cv2.line(frame, future_positions[i-1], future_positions[i], (0, 255, 0), 4)
-                cv2.circle(frame,future_positions[i],radius=3,color=(0,0,255),thickness=-1)
+            if len(centroid_history) > 1:
+                centroid_list = list(centroid_history.get_queue())
+                for i in range(1, len(centroid_history)):
+                    cv2.line(frame, centroid_history.get_queue()[i-1], centroid_history.get_queue()[i], (255, 0, 0), 4)    
                 
+            if len(centroid_history) > 1:
+                centroid_list = list(centroid_history.get_queue())
+                # piecewise parabola over the whole history instead of repeating the last step
+                xs, ys = np.array(centroid_list, dtype=np.float64).T
+                fitted = trajectory.fit([(np.arange(len(xs)), xs, ys)])[0]
+                if fitted["bounce"] is not None:
+                    bounce = (int(fitted["bounce"][1]), int(fitted["bounce"][2]))
+                    cv2.circle(frame, bounce, radius=8, color=(0, 255, 255), thickness=2)
+                    cv2.putText(frame, "Bounce", (bounce[0] + 10, bounce[1]), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 255), 2)
+                    text = "Deviation: {:.2f} degrees".format(fitted["deviation_deg"])
+                    cv2.putText(frame,text,(20,20),cv2.FONT_HERSHEY_PLAIN,1,(255,0,0),2)
+                future_positions = [centroid_list[-1]]
+                future_positions += [(int(x), int(y)) for _, x, y in fitted["path"]]
+                for i in range(1,len(future_positions)):
+                    cv2.line(frame, future_positions[i-1], future_positions[i], (0, 255, 0), 4)
+                    cv2.circle(frame,future_positions[i],radius=3,color=(0,0,255),thickness=-1)
 
-        text = "Angle: {:.2f} degrees".format(angle)
-        cv2.putText(frame,text,(20,20),cv2.FONT_HERSHEY_PLAIN,1,(255,0,0),2)
-        cv2.putText(frame, f'FPS: {fps}', (20, 50), cv2.FONT_HERSHEY_SIMPLEX , 1, (255, 0, 0), 2) 
-        frame_resized = cv2.resize(frame, (1000, 600))
-        cv2.imshow('frame',frame_resized)
+            cv2.putText(frame, f'FPS: {fps}', (20, 50), cv2.FONT_HERSHEY_SIMPLEX , 1, (255, 0, 0), 2) 
+            frame_resized = cv2.resize(frame, (1000, 600))
+            cv2.imshow('frame',frame_resized)
          
-        key = cv2.waitKey(1)
-        if key & 0xFF == ord('q'):
-            break
-        elif key & 0xFF == ord(' '):
-            paused = not paused
+            key = cv2.waitKey(1)
+            if key & 0xFF == ord('q'):
+                break
+            elif key & 0xFF == ord(' '):
+                paused = not paused
             
-            while paused:
-                key = cv2.waitKey(30) & 0xFF
-                if key == ord(' '):
-                    paused = not paused
-                elif key == ord('q'):
-                    break
-cap.release()
-cv2.destroyAllWindows()
+                while paused:
+                    key = cv2.waitKey(30) & 0xFF
+                    if key == ord(' '):
+                        paused = not paused
+                    elif key == ord('q'):
+                        break
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main(backend=sys.argv[sys.argv.index("--backend") + 1] if "--backend" in sys.argv else None)
 
 
 
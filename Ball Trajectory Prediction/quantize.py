@@ -0,0 +1,172 @@
+"""
+Post-training INT8 quantization of the trained cricketBall detector.
+
+    python quantize.py --weights runs/detect/train5/weights/best.pt --calib 200
+
+1. export the weights to ONNX (FP32), like modelSave.py
+2. statically quantize it with ONNX Runtime, calibrated on --calib images
+   from the train split of data.yaml
+3. run FP32 and INT8 over the validation split and compare ball recall and
+   mAP@0.5 against the labels
+
+The INT8 model is only published (as best_int8.onnx next to the weights,
+with a best_int8.json report) if neither metric drops by more than
+--max-recall-drop / --max-map-drop; otherwise the script exits with
+status 1 and leaves the previous published model alone. Use it with
+src.detectors.get_detector(path, "onnxruntime").
+"""
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+import cv2
+import numpy as np
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.detectors import OnnxDetector, Detections, letterbox
+from src.metrics import recall, average_precision
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join('runs', 'detect', 'train5', 'weights', 'best.pt')
+DATA_PATH = os.path.join(HERE, 'data.yaml')
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+HEAD_PREFIX = '/model.22/'   # YOLOv8 Detect head; kept in FP32 with --keep-head-fp32
+
+
+def split_images(data_path, split):
+    """Image paths of a data.yaml split ('train' / 'val'), resolved like ultralytics does."""
+    with open(data_path) as f:
+        data = yaml.safe_load(f)
+    base = data.get('path') or ''
+    if not os.path.isdir(base):
+        base = os.path.dirname(os.path.abspath(data_path))   # dataset copied next to data.yaml
+    folder = os.path.join(base, data[split])
+    return sorted(p for p in glob.glob(os.path.join(folder, '*')) if p.lower().endswith(IMAGE_EXTS))
+
+
+def load_labels(image_path, shape):
+    """YOLO txt labels (cls cx cy w h, normalised) of an image as Detections in pixels."""
+    label_path = os.path.splitext(image_path.replace(os.sep + 'images' + os.sep, os.sep + 'labels' + os.sep))[0] + '.txt'
+    h, w = shape[:2]
+    rows = np.loadtxt(label_path, ndmin=2) if os.path.exists(label_path) else np.empty((0, 5))
+    if not len(rows):
+        return Detections(np.empty((0, 6)))
+    cls, cx, cy, bw, bh = rows[:, :5].T
+    return Detections(np.column_stack([(cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w,
+                                       (cy + bh / 2) * h, np.ones(len(rows)), cls]))
+
+
+class CalibrationReader:
+    """Feeds letterboxed calibration images to quantize_static, one at a time."""
+    def __init__(self, images, input_name, imgsz):
+        self.images = iter(images)
+        self.input_name = input_name
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.images:
+            frame = cv2.imread(path)
+            if frame is not None:
+                return {self.input_name: letterbox(frame, self.imgsz)[0]}
+        return None
+
+
+def export_fp32(weights, imgsz):
+    onnx_path = os.path.splitext(weights)[0] + '.onnx'
+    if not os.path.exists(onnx_path):
+        from ultralytics import YOLO
+        YOLO(weights).export(format='onnx', imgsz=imgsz)
+    return onnx_path
+
+
+def quantize(fp32_path, int8_path, images, imgsz, keep_head_fp32=False):
+    import onnx
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared = fp32_path.replace('.onnx', '.prep.onnx')
+    quant_pre_process(fp32_path, prepared)
+    input_name = ort.InferenceSession(prepared, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    exclude = [n.name for n in onnx.load(prepared).graph.node
+               if keep_head_fp32 and n.name.startswith(HEAD_PREFIX)]
+    quantize_static(prepared, int8_path, CalibrationReader(images, input_name, imgsz),
+                    quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    nodes_to_exclude=exclude)
+    os.remove(prepared)
+    return int8_path
+
+
+def evaluate(model_path, images, imgsz, conf):
+    """(recall, mAP@0.5, mean ms per image) of an ONNX model on labelled images."""
+    detector = OnnxDetector(model_path, imgsz=imgsz)
+    labels, found, times = [], [], []
+    for path in images:
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        start = time.perf_counter()
+        found += detector.predict([frame], conf=conf)
+        times.append((time.perf_counter() - start) * 1000)
+        labels.append(load_labels(path, frame.shape))
+    return recall(labels, found), average_precision(labels, found), float(np.mean(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--weights', default=MODEL_PATH)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--calib', type=int, default=200, help='calibration images from the train split')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--conf', type=float, default=0.001, help='low, as for mAP evaluation')
+    parser.add_argument('--max-recall-drop', type=float, default=0.02)
+    parser.add_argument('--max-map-drop', type=float, default=0.02)
+    parser.add_argument('--keep-head-fp32', action='store_true')
+    args = parser.parse_args()
+
+    train, val = split_images(args.data, 'train'), split_images(args.data, 'val')
+    if not train or not val:
+        sys.exit(f"❌ No images found for the train/val splits of {args.data}")
+    calib = random.Random(0).sample(train, min(args.calib, len(train)))
+
+    fp32_path = export_fp32(args.weights, args.imgsz)
+    base = os.path.splitext(args.weights)[0]
+    candidate = quantize(fp32_path, base + '_int8.candidate.onnx', calib, args.imgsz, args.keep_head_fp32)
+    print(f"✅ Quantized {fp32_path} with {len(calib)} calibration images")
+
+    fp32_recall, fp32_map, fp32_ms = evaluate(fp32_path, val, args.imgsz, args.conf)
+    int8_recall, int8_map, int8_ms = evaluate(candidate, val, args.imgsz, args.conf)
+    report = {
+        'weights': args.weights, 'calibration_images': len(calib), 'val_images': len(val),
+        'fp32': {'recall': fp32_recall, 'map50': fp32_map, 'ms': fp32_ms,
+                 'mb': os.path.getsize(fp32_path) / 1e6},
+        'int8': {'recall': int8_recall, 'map50': int8_map, 'ms': int8_ms,
+                 'mb': os.path.getsize(candidate) / 1e6},
+        'speedup': fp32_ms / int8_ms,
+    }
+    print(f"{'':<6}{'recall':>10}{'mAP50':>10}{'ms/img':>10}{'MB':>8}")
+    for name in ('fp32', 'int8'):
+        r = report[name]
+        print(f"{name:<6}{r['recall']:>10.3f}{r['map50']:>10.3f}{r['ms']:>10.1f}{r['mb']:>8.1f}")
+    print(f"Speedup: {report['speedup']:.2f}x")
+
+    if fp32_recall - int8_recall > args.max_recall_drop or fp32_map - int8_map > args.max_map_drop:
+        os.remove(candidate)
+        sys.exit(f"❌ INT8 model not published: recall drop {fp32_recall - int8_recall:.3f} "
+                 f"(max {args.max_recall_drop}), mAP50 drop {fp32_map - int8_map:.3f} (max {args.max_map_drop})")
+
+    published = base + '_int8.onnx'
+    os.replace(candidate, published)
+    with open(base + '_int8.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Published {published}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
 from flask import Flask, render_template, request, redirect, url_for, flash
 import os
-from pipeline import *
+import cv2
+from pipeline import (load_config, mainfn, season_charts, charts_path, cached_charts, charts_job, render_annotated_job,
+                      analyze_trajectory_job, OUT_DIR)
+from src.track_store import store_path, read_meta
 from werkzeug.utils import secure_filename
 import secrets
 import time
-from flask import jsonify, send_from_directory
+from flask import jsonify, send_from_directory, send_file, Response, stream_with_context
+import json
 import subprocess
+import functools
+from src.jobs import JobQueue, QueueFull
+from src.uploads import UploadStore, OffsetMismatch, QuotaExceeded
+from src.deliveries import load_index
+from src.clips import extract_clip, annotated_path, tracks_tag, MAX_CLIP_S
+from src.season import SeasonStore, SEASON_SHAPE
+from src.heatmap import TILE_SIZE
+from src.charts import encode_grid
+from src.utils import scale_pitch
+from src import models
 
 
 UPLOAD_FOLDER = os.path.join('static', 'uploads')
@@ -19,14 +33,25 @@ app.secret_key = secrets.token_hex(32)
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Long analyses run in a bounded process pool; see config.json "jobs".
+# Models listed under "models" are loaded by each worker as it starts, off the request thread.
+CONFIG = load_config()
+models.set_memory_budget(CONFIG.get("models", {}).get("memory_budget_mb", models.MEMORY_BUDGET_MB))
+JOBS = JobQueue(**CONFIG.get("jobs", {}),
+                preload=functools.partial(models.preload, CONFIG.get("models", {}).get("preload", [])))
+
+# Every upload gets its own directory (video + outputs); see config.json "uploads"
+UPLOADS = UploadStore(UPLOAD_FOLDER, **CONFIG.get("uploads", {}))
+# Analysed uploads added to the season outlive upload cleanup; see src/season.py
+SEASON = SeasonStore()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/', methods=['GET'])
 def index():
-    # list uploaded files to show recently uploaded preview (optional)
-    uploads = sorted(os.listdir(app.config['UPLOAD_FOLDER']), reverse=True)
-    return render_template('index.html', uploads=uploads)
+    # Only the upload this client made (?upload_id= after a form upload); never anyone else's
+    return render_template('index.html', upload_id=request.args.get('upload_id'))
 
 
 #Heatmap and wagon wheel detection function
@@ -70,30 +95,339 @@ def upload():
         flash('No selected file')
         return redirect(url_for('index'))
 
-    # Force save as sample.mp4
-    save_path = os.path.join(app.config['UPLOAD_FOLDER'], 'sample.mp4')
+    if file and allowed_file(file.filename):
+        # Streamed into its own upload directory; nothing else's video is overwritten
+        info = UPLOADS.save(file.filename, file.stream)
+        flash(f"Uploaded: {info['filename']}")
+        return redirect(url_for('index', upload_id=info['id']))
 
-    if file:
-        file.save(save_path)
-        flash('Video saved as sample.mp4')
-        # If you want to trigger your processing pipeline, call it here:
-        # process_video(save_path)
-        return redirect(url_for('index'))
-
-    flash('Upload failed')
+    flash('Unsupported file type')
     return redirect(url_for('index'))
 
+# Resumable chunked uploads for long match footage:
+#   POST  /uploads             {"filename", "size"}  -> upload_id
+#   PATCH /uploads/<id>        body = next chunk, header Upload-Offset = its first byte
+#   GET   /uploads/<id>        where to resume after a dropped connection
+def upload_payload(info):
+    payload = {
+        'upload_id': info['id'],
+        'filename': info['filename'],
+        'size': info['size'],
+        'offset': info['size'] if info['complete'] else info['received'],
+        'complete': info['complete'],
+        'upload_url': url_for('upload_chunk', upload_id=info['id']),
+    }
+    if info['complete']:
+        payload['url'] = url_for('static', filename=os.path.relpath(
+            UPLOADS.video_path(info['id']), 'static').replace(os.sep, '/'))
+    return payload
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    body = request.get_json(silent=True) or {}
+    filename = body.get('filename', '')
+    if not allowed_file(filename):
+        return jsonify({'status': 'error', 'message': 'Unsupported file type'}), 400
+    try:
+        size = int(body['size']) if body.get('size') is not None else None
+        if size is not None and size < 0:
+            raise ValueError(size)
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'size must be a whole number of bytes'}), 400
+    try:
+        info = UPLOADS.create(secure_filename(filename) or 'video.mp4', size)
+    except QuotaExceeded as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 413
+    return jsonify(upload_payload(info)), 201
+
+@app.route('/uploads/<upload_id>', methods=['GET', 'PATCH'])
+def upload_chunk(upload_id):
+    info = UPLOADS.info(upload_id)
+    if info is None:
+        return jsonify({'status': 'error', 'message': 'unknown upload'}), 404
+    if request.method == 'GET':
+        return jsonify(upload_payload(info))
+    try:
+        offset = int(request.headers.get('Upload-Offset', 0))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Upload-Offset must be a byte offset'}), 400
+    try:
+        info = UPLOADS.write_chunk(upload_id, request.stream, offset, request.content_length)
+        if request.headers.get('Upload-Complete') == '1':
+            info = UPLOADS.finish(upload_id)
+    except OffsetMismatch as e:
+        return jsonify({'status': 'error', 'message': str(e), 'offset': e.offset}), 409
+    except QuotaExceeded as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 413
+    return jsonify(upload_payload(info))
+
 # For Button
 
 SAMPLE_NAME = 'sample.mp4'
 SAMPLE_PATH = os.path.join(app.config['UPLOAD_FOLDER'], SAMPLE_NAME)
 
+@app.route('/uploads/<upload_id>/deliveries', methods=['GET'])
+def upload_deliveries(upload_id):
+    """Per-delivery index (frame/time window, bounce, length) of an analysed upload."""
+    info = UPLOADS.info(upload_id)
+    if info is None or not info['complete']:
+        return jsonify({'status': 'error', 'message': 'unknown upload'}), 404
+    store_dir = store_path(UPLOADS.video_path(upload_id))
+    if not os.path.exists(os.path.join(store_dir, 'meta.json')):
+        return jsonify({'status': 'error', 'message': 'upload has not been analysed yet'}), 409
+    return jsonify(load_index(store_dir))
+
+@app.route('/uploads/<upload_id>/clip', methods=['GET'])
+def upload_clip(upload_id):
+    """
+    MP4 of one delivery (?delivery=n) or a frame range (?start=&end=, inclusive)
+    of an upload; ?overlay=1 draws the tracked boxes for that range only.
+    """
+    info = UPLOADS.info(upload_id)
+    if info is None or not info['complete']:
+        return jsonify({'status': 'error', 'message': 'unknown upload'}), 404
+    video_path = UPLOADS.video_path(upload_id)
+    store_dir = store_path(video_path)
+    analysed = os.path.exists(os.path.join(store_dir, 'meta.json'))
+    overlay = request.args.get('overlay') in ('1', 'true')
+    if (overlay or 'delivery' in request.args) and not analysed:
+        return jsonify({'status': 'error', 'message': 'upload has not been analysed yet'}), 409
+
+    try:
+        if 'delivery' in request.args:
+            deliveries = load_index(store_dir)['deliveries']
+            n = int(request.args['delivery'])
+            if n < 0:
+                raise IndexError(n)
+            start, end = deliveries[n]['start'], deliveries[n]['end']
+        else:
+            start, end = int(request.args['start']), int(request.args['end'])
+    except (KeyError, ValueError, IndexError):
+        return jsonify({'status': 'error', 'message': 'give delivery=<n> or start=<frame>&end=<frame>'}), 400
+    fps = (read_meta(store_dir).get('fps') if analysed else None) or 30
+    if start < 0 or end < start or (end - start + 1) / fps > MAX_CLIP_S:
+        return jsonify({'status': 'error', 'message': f'clip must be 1 frame to {MAX_CLIP_S}s long'}), 400
+
+    UPLOADS.touch(upload_id)
+    try:
+        path = extract_clip(video_path, start, end, UPLOADS.out_dir(upload_id),
+                            store_dir=store_dir if analysed else None, overlay=overlay)
+    except (OSError, subprocess.CalledProcessError) as e:
+        app.logger.exception('Clip extraction failed')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+    return send_file(path, mimetype='video/mp4', conditional=True)
+
+@app.route('/uploads/<upload_id>/annotated', methods=['GET', 'POST'])
+def upload_annotated(upload_id):
+    """
+    The upload's annotated video. Analyses no longer encode one, so the first
+    request queues a render from the stored tracks (202 + job id, as /heatwagon);
+    once rendered it is served straight from the upload's outputs.
+    """
+    info = UPLOADS.info(upload_id)
+    if info is None or not info['complete']:
+        return jsonify({'status': 'error', 'message': 'unknown upload'}), 404
+    UPLOADS.touch(upload_id)
+    video_path, out_dir = UPLOADS.video_path(upload_id), UPLOADS.out_dir(upload_id)
+    store_dir = store_path(video_path)
+    if os.path.exists(os.path.join(store_dir, 'meta.json')):
+        path = annotated_path(out_dir, store_dir)
+        if os.path.exists(path):
+            return send_file(path, mimetype='video/mp4', conditional=True)
+    _, response = submit_job(render_annotated_job, video_path, kind='annotated', out_dir=out_dir)
+    return response
+
+MAX_VIEW_SIZE = 2048   # largest heatmap view rendered per request (px per side)
+
+def requested_lengths(body=None):
+    """length filters from JSON (string or list) or repeated / comma separated query values."""
+    lengths = (body or {}).get('length') or [l for v in request.values.getlist('length') for l in v.split(',') if l]
+    return [lengths] if isinstance(lengths, str) else lengths or None
+
+def requested_region(shape, default_size):
+    """
+    ((x0, y0, x1, y1), (w, h)) from the query: the region in frame pixels
+    (default: the configured pitch box) and the output size. Raises ValueError.
+    """
+    H, W = shape
+    pitch = scale_pitch(load_config()['pitch'], W, H)
+    x0 = max(0, int(request.args.get('x0', pitch['x1'])))
+    y0 = max(0, int(request.args.get('y0', pitch['y1'])))
+    x1 = min(W, int(request.args.get('x1', pitch['x2'])))
+    y1 = min(H, int(request.args.get('y1', pitch['y2'])))
+    w, h = default_size(x1 - x0, y1 - y0)
+    size = (int(request.args.get('w', w)), int(request.args.get('h', h)))
+    if x1 <= x0 or y1 <= y0 or not (0 < size[0] <= MAX_VIEW_SIZE and 0 < size[1] <= MAX_VIEW_SIZE):
+        raise ValueError('empty region or bad output size')
+    return (x0, y0, x1, y1), size
+
+def heatmap_view(pyramid):
+    """PNG of one region of a HeatmapPyramid; see requested_region for the parameters."""
+    H, W = pyramid.shape
+    try:
+        region, size = requested_region(pyramid.shape, lambda w, h: (TILE_SIZE, TILE_SIZE))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'x0, y0, x1, y1, w, h: {e}'}), 400
+    ok, png = cv2.imencode('.png', pyramid.render(*region, size=size))
+    return Response(png.tobytes(), mimetype='image/png', headers={
+        'Cache-Control': 'private, max-age=60',
+        'X-Heatmap-Region': ','.join(map(str, region)),   # what was drawn, for the zooming client
+        'X-Heatmap-Frame': f'{W},{H}',
+    })
+
+DATA_CELL = 4     # default frame pixels per heatmap cell in chart data
+DATA_LEVELS = 32  # default intensity steps; plenty for a blurred heatmap, and the grid compresses 4x better
+
+def chart_data(pyramid, wagon):
+    """
+    The charts as data for client-side drawing: the heatmap region as a
+    quantised uint8 grid (src.charts.encode_grid, ?levels= steps) and the
+    wagon wheel as per-sector counts, bin 0 starting at -180 degrees.
+    """
+    try:
+        region, size = requested_region(pyramid.shape, lambda w, h: (-(-w // DATA_CELL), -(-h // DATA_CELL)))
+        levels = min(256, max(2, int(request.args.get('levels', DATA_LEVELS))))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'x0, y0, x1, y1, w, h, levels: {e}'}), 400
+    return jsonify({
+        'heatmap': dict(encode_grid(pyramid.values(*region, size=size), levels), region=region,
+                        frame=[pyramid.shape[1], pyramid.shape[0]]),
+        'wagon': {'start_deg': -180, 'counts': [int(n) for n in wagon]},
+    })
+
+CHART_JOBS = {}   # charts_path -> id of the job building it, so polling clients share one build
+
+def built_charts(store_dirs, shape, cache_dir, tag, lengths):
+    """
+    (pyramid, wagon counts) from the chart cache, or (None, response): 202
+    with the id of the job aggregating them (queued on the first miss, never
+    in the request thread), or 500 if that job failed.
+    """
+    path = charts_path(shape, cache_dir, tag, lengths)
+    cached = cached_charts(path)
+    if cached:
+        return cached, None
+    job_id = CHART_JOBS.get(path)
+    job = JOBS.status(job_id) if job_id else None
+    if job and job['state'] == 'failed':
+        CHART_JOBS.pop(path, None)   # the next request tries again
+        return None, (jsonify({'status': 'error', 'message': f"building the charts failed: {job['error']}"}), 500)
+    if job and job['state'] != 'done':
+        return None, (jsonify({'status': 'queued', 'job_id': job_id,
+                               'status_url': url_for('job_status', job_id=job_id)}), 202)
+    job_id, response = submit_job(charts_job, store_dirs, shape, cache_dir, tag, kind='charts', lengths=lengths)
+    if job_id:
+        CHART_JOBS[path] = job_id
+    return None, response
+
+def upload_charts(upload_id):
+    """(pyramid, wagon counts) of an analysed upload for the requested lengths, or (None, response)."""
+    info = UPLOADS.info(upload_id)
+    if info is None or not info['complete']:
+        return None, (jsonify({'status': 'error', 'message': 'unknown upload'}), 404)
+    store_dir = store_path(UPLOADS.video_path(upload_id))
+    meta = read_meta(store_dir)
+    if not meta:
+        return None, (jsonify({'status': 'error', 'message': 'upload has not been analysed yet'}), 409)
+    return built_charts([store_dir], (meta['height'], meta['width']),
+                        os.path.join(UPLOADS.out_dir(upload_id), 'pyramids'), tracks_tag(store_dir),
+                        requested_lengths())
+
+def season_charts_data():
+    """(pyramid, wagon counts) of the season sessions matching bowler, from / to and length, or (None, response)."""
+    sessions = SEASON.sessions(request.args.get('bowler'), request.args.get('from'), request.args.get('to'))
+    tag = [(s['id'], s['added']) for s in sessions]
+    return built_charts([SEASON.session_dir(s['id']) for s in sessions], SEASON_SHAPE,
+                        os.path.join(OUT_DIR, 'season', 'pyramids'), tag, requested_lengths())
+
+@app.route('/uploads/<upload_id>/heatmap.png', methods=['GET'])
+def upload_heatmap(upload_id):
+    """Zoomable pitch heatmap of an analysed upload; see requested_region for the region parameters."""
+    aggregated, error = upload_charts(upload_id)
+    return error or heatmap_view(aggregated[0])
+
+@app.route('/uploads/<upload_id>/charts.json', methods=['GET'])
+def upload_chart_data(upload_id):
+    """Heatmap grid + wagon wheel histogram of an upload as compact JSON (see chart_data)."""
+    aggregated, error = upload_charts(upload_id)
+    return error or chart_data(*aggregated)
+
+@app.route('/season/heatmap.png', methods=['GET'])
+def season_heatmap():
+    """Zoomable season heatmap filtered by bowler, from / to and length, as /season."""
+    aggregated, error = season_charts_data()
+    return error or heatmap_view(aggregated[0])
+
+@app.route('/season/charts.json', methods=['GET'])
+def season_chart_data():
+    """Season heatmap grid + wagon wheel histogram as compact JSON, filtered as /season/heatmap.png."""
+    aggregated, error = season_charts_data()
+    return error or chart_data(*aggregated)
+
+@app.route('/uploads/<upload_id>/session', methods=['POST'])
+def add_session(upload_id):
+    """Add an analysed upload to the season: {"bowler": ..., "date": "YYYY-MM-DD"}."""
+    info = UPLOADS.info(upload_id)
+    if info is None or not info['complete']:
+        return jsonify({'status': 'error', 'message': 'unknown upload'}), 404
+    body = request.get_json(silent=True) or request.form
+    try:
+        session = SEASON.add(upload_id, store_path(UPLOADS.video_path(upload_id)),
+                             bowler=body.get('bowler') or None, date=body.get('date') or None)
+    except FileNotFoundError:
+        return jsonify({'status': 'error', 'message': 'upload has not been analysed yet'}), 409
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'date must be YYYY-MM-DD'}), 400
+    return jsonify(session), 201
+
+@app.route('/season', methods=['GET', 'POST'])
+def season():
+    """
+    GET lists the season's sessions; POST queues the season heatmap + wagon
+    wheel job. Filters (JSON, form or query): bowler, from / to (YYYY-MM-DD,
+    inclusive) and, for the charts, length (repeatable or comma separated:
+    "full/yorker", "good length", "short").
+    """
+    body = request.get_json(silent=True) or {}
+    get = lambda k: body.get(k) or request.values.get(k) or None
+    if request.method == 'GET':
+        return jsonify({'sessions': SEASON.sessions(get('bowler'), get('from'), get('to'))})
+    _, response = submit_job(season_charts, kind='season', bowler=get('bowler'), date_from=get('from'),
+                             date_to=get('to'), lengths=requested_lengths(body))
+    return response
+
+def requested_upload():
+    """(upload_id named in the request (JSON, form or query) or None, its info or None)."""
+    body = request.get_json(silent=True) or {}
+    upload_id = body.get('upload_id') or request.values.get('upload_id')
+    return upload_id, UPLOADS.info(upload_id) if upload_id else None
+
+def requested_video():
+    """
+    (video_path, out_dir, None) for the complete upload named in the request
+    (upload_id in JSON, form or query), else (None, None, error response).
+    There is no fallback: a client only ever analyses its own upload.
+    """
+    upload_id, info = requested_upload()
+    if not upload_id:
+        return None, None, (jsonify({'status': 'error', 'message': 'upload_id is required'}), 400)
+    if not info or not info['complete']:
+        return None, None, (jsonify({'status': 'error', 'message': 'unknown upload'}), 404)
+    UPLOADS.touch(info['id'])
+    return UPLOADS.video_path(info['id']), UPLOADS.out_dir(info['id']), None
+
 @app.route('/sample_exists', methods=['GET'])
 def sample_exists():
     """
-    Quick endpoint frontend uses to check whether sample.mp4 exists on server.
-    Returns JSON with a direct static URL if exists.
+    Quick endpoint frontend uses to check whether a video exists on server:
+    the upload named by ?upload_id= (with its static URL), else the bundled
+    sample.mp4. Other clients' uploads are never reported.
     """
+    upload_id, info = requested_upload()
+    if upload_id:
+        if not info:
+            return jsonify({'exists': False}), 404
+        return jsonify({'exists': info['complete'], **upload_payload(info)})
     if os.path.exists(SAMPLE_PATH):
         url = url_for('static', filename=f'uploads/{SAMPLE_NAME}')
         return jsonify({'exists': True, 'url': url})
@@ -161,45 +495,103 @@ def analyze_trajectory_and_person(video_path):
 #         app.logger.exception('Trajectory analysis failed')
 #         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/outputs/<filename>')
+@app.route('/outputs/<path:filename>')
 def get_file2(filename):
     return send_from_directory(app.config['RESULT_PHOTOS_DEST'], filename)
 
+def result_urls(result):
+    """Map artifact paths returned by a job to URLs the browser can fetch."""
+    urls = {}
+    for key, path in (result or {}).items():
+        if not path:
+            continue
+        if path.startswith('static' + os.sep):
+            urls[key] = url_for('static', filename=os.path.relpath(path, 'static').replace(os.sep, '/'))
+        else:
+            rel = os.path.relpath(path, app.config['RESULT_PHOTOS_DEST'])
+            urls[key] = url_for('get_file2', filename=rel.replace(os.sep, '/'))
+    return urls
+
+def submit_job(fn, *args, kind=None, **kwargs):
+    """Queue an analysis; answers 202 with the job id, or 429 when the queue is full."""
+    try:
+        job_id = JOBS.submit(fn, *args, kind=kind, **kwargs)
+    except QueueFull as e:
+        resp = jsonify({'status': 'busy', 'message': f'Server busy, try again shortly ({e})'})
+        resp.headers['Retry-After'] = '30'
+        return None, (resp, 429)
+    return job_id, (jsonify({'status': 'queued', 'job_id': job_id,
+                             'status_url': url_for('job_status', job_id=job_id)}), 202)
+
 @app.route('/heatwagon', methods=['GET','POST'])
 def analyze_heatwagon():
-    if not os.path.exists(SAMPLE_PATH):
-        return jsonify({'status': 'error', 'message': 'sample.mp4 not found'}), 400
-    try:
-        # Run your actual script
-        # subprocess.run(["python", "src/analyze_heatwagon.py", SAMPLE_PATH], check=True)
-        # subprocess.run(["python", "pipeline.py", SAMPLE_PATH], check=True)
-        # Assume script saves heatmap.png in static/outputs/
-        draw_heat_wagon()
-        print("heatmap done")
-        # return jsonify({
-        #     'status': 'ok',
-        #     'message': 'Heatmap & Wagon Wheel analysis complete',
-        #     'result_url': url_for('static', filename='outputs/heatmap.png')
-        # })
-        file_url = url_for('get_file2' , filename='pitch_heatmap.png')
-        return render_template('result.html', file_url = file_url)
-    except subprocess.CalledProcessError as e:
-        return jsonify({'status': 'error', 'message': f'Analysis failed: {e}'}), 500
+    video_path, out_dir, error = requested_video()
+    if error:
+        return error
+    job_id, response = submit_job(mainfn, video_path, kind='heatwagon', out_dir=out_dir)
+    if request.method == 'POST' or job_id is None:
+        return response
+    # Plain link from the index page: show the result page, which polls the job
+    # and then swaps the heatmap for the zoomable view of the upload
+    upload_id, _ = requested_upload()
+    return render_template('result.html', job_url=url_for('job_status', job_id=job_id),
+                           heatmap_url=url_for('upload_heatmap', upload_id=upload_id),
+                           charts_url=url_for('upload_chart_data', upload_id=upload_id))
 
 
 @app.route('/analyze/trajectory', methods=['POST'])
 def analyze_trajectory():
-    if not os.path.exists(SAMPLE_PATH):
-        return jsonify({'status': 'error', 'message': 'sample.mp4 not found'}), 400
-    try:
-        subprocess.run(["python", "analyze_trajectory.py", SAMPLE_PATH], check=True)
-        return jsonify({
-            'status': 'ok',
-            'message': 'Trajectory & On-field Detection complete',
-            'result_url': url_for('static', filename='outputs/trajectory.png')
-        })
-    except subprocess.CalledProcessError as e:
-        return jsonify({'status': 'error', 'message': f'Analysis failed: {e}'}), 500
+    video_path, _, error = requested_video()
+    if error:
+        return error
+    _, response = submit_job(analyze_trajectory_job, video_path, kind='trajectory')
+    return response
+
+
+SSE_INTERVAL = 0.5   # seconds between job state checks on an event stream
+
+def job_payload(job_id, job):
+    """Status body shared by /jobs/<id> and its event stream."""
+    partial = {k: v for k, v in job['info'].items() if k.startswith('partial_') and isinstance(v, str)}
+    return {
+        'job_id': job_id,
+        'kind': job['kind'],
+        'state': job['state'],
+        'progress': job['progress'],
+        'partial_urls': result_urls(partial),
+        'result_urls': result_urls(job['result']),
+        'error': job['error'],
+    }
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = JOBS.status(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'unknown job'}), 404
+    return jsonify(job_payload(job_id, job))
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events: one message per change in the job's status, until it finishes."""
+    if JOBS.status(job_id) is None:
+        return jsonify({'status': 'error', 'message': 'unknown job'}), 404
+
+    def stream():
+        last = None
+        while True:
+            job = JOBS.status(job_id)
+            if job is None:
+                return
+            message = json.dumps(job_payload(job_id, job))
+            if message != last:
+                yield f"data: {message}\n\n"
+                last = message
+            if job['state'] in ('done', 'failed'):
+                return
+            time.sleep(SSE_INTERVAL)
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 # Button End
@@ -0,0 +1,88 @@
+"""
+Latency, throughput and accuracy drift of each detector backend on CPU.
+The torch detections are the reference: drift is 1 - AP@0.5 of a
+backend's boxes against them (same frame, same class), so 0.0% means
+the export finds exactly what PyTorch finds.
+
+    python benchmarks/bench_backends.py --weights yolov8n.pt --frames 200
+
+Export the weights first (model.export(format="onnx") / format="openvino");
+backends whose runtime or export is missing are skipped.
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.detectors import get_detector, BACKENDS
+from src.metrics import average_precision
+
+VIDEOS = [
+    os.path.join(ROOT, "data", "sample.mp4"),
+    os.path.join(ROOT, "Ball Trajectory Prediction", "videos", "test.mp4"),
+]
+
+
+def read_frames(videos, count):
+    frames = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+def bench(detector, frames, batch_size, conf):
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        detector.predict([frame], conf=conf)
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    found = []
+    for i in range(0, len(frames), batch_size):
+        found += detector.predict(frames[i:i + batch_size], conf=conf)
+    fps = len(frames) / (time.perf_counter() - start)
+    return np.array(latencies), fps, found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("videos", nargs="*", default=VIDEOS)
+    args = parser.parse_args()
+
+    frames = read_frames(args.videos, args.frames)
+    print(f"{len(frames)} frames, {os.cpu_count()} CPUs")
+    print(f"{'backend':<12}{'p50 ms':>10}{'p95 ms':>10}{'fps':>10}{'AP50 vs torch':>16}{'drift':>10}")
+    reference = None
+    for backend in args.backends:
+        try:
+            detector = get_detector(args.weights, backend, imgsz=args.imgsz)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{backend:<12}skipped: {e}")
+            continue
+        latencies, fps, found = bench(detector, frames, args.batch_size, args.conf)
+        if backend == "torch":
+            reference = found
+        ap = average_precision(reference, found) if reference is not None else float("nan")
+        print(f"{backend:<12}{np.percentile(latencies, 50):>10.1f}{np.percentile(latencies, 95):>10.1f}"
+              f"{fps:>10.1f}{ap:>16.3f}{1 - ap:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Frames/sec of the streaming model.track() path against batched offline
+inference (src/batch_infer.py) for a few batch sizes.
+
+    python benchmarks/bench_batch_infer.py --batch-sizes 1 4 8 16
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.models import get_model
+from src.batch_infer import batch_track, MODEL_NAME
+
+VIDEOS = [
+    os.path.join(ROOT, "data", "sample.mp4"),
+    os.path.join(ROOT, "Ball Trajectory Prediction", "videos", "test.mp4"),
+    os.path.join(ROOT, "Ball Trajectory Prediction", "videos", "test1.mp4"),
+]
+
+
+def frame_count(video_path):
+    cap = cv2.VideoCapture(video_path)
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return n
+
+
+def bench_stream(video_path):
+    model = get_model(MODEL_NAME)
+    start = time.perf_counter()
+    frames = sum(1 for _ in model.track(source=video_path, stream=True, save=False, classes=[32],
+                                        tracker="bytetrack.yaml", imgsz=640, conf=0.25, verbose=False))
+    return frames / (time.perf_counter() - start)
+
+
+def bench_batch(video_path, batch_size):
+    start = time.perf_counter()
+    for _ in batch_track(video_path, batch_size=batch_size):
+        pass
+    return frame_count(video_path) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("videos", nargs="*", default=VIDEOS)
+    args = parser.parse_args()
+
+    get_model(MODEL_NAME)  # load + warm up outside the timings
+    print(f"{'video':<24}{'mode':<12}{'fps':>8}")
+    for video in args.videos:
+        name = os.path.basename(video)
+        print(f"{name:<24}{'stream':<12}{bench_stream(video):>8.1f}")
+        for bs in args.batch_sizes:
+            print(f"{name:<24}{f'batch={bs}':<12}{bench_batch(video, bs):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
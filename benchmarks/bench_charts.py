@@ -0,0 +1,121 @@
+"""
+Per-chart latency of the NumPy/OpenCV renderer (src/charts.py) against
+the matplotlib code it replaced, both rendering PNG bytes in memory, plus
+the import cost each adds to a fresh worker process.
+
+    python benchmarks/bench_charts.py --points 2000 --repeat 20
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import subprocess
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import charts
+
+
+def mpl_wagon_wheel(angles):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(6,6), facecolor="white")
+    ax = plt.subplot(111, polar=True)
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    ax.scatter(angles, np.ones_like(angles), c="green", s=50, alpha=0.75)
+    ax.set_rticks([])
+    ax.set_title("Wagon Wheel", va="bottom")
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png", bbox_inches="tight")
+    plt.close()
+    return buf.getvalue()
+
+
+def mpl_wagon_counts(counts):
+    import matplotlib.pyplot as plt
+    width = 2 * np.pi / len(counts)
+    plt.figure(figsize=(6,6), facecolor="white")
+    ax = plt.subplot(111, polar=True)
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    ax.bar(-np.pi + width * (np.arange(len(counts)) + 0.5), counts, width=width, color="green", alpha=0.75)
+    ax.set_rticks([])
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png", bbox_inches="tight")
+    plt.close()
+    return buf.getvalue()
+
+
+def mpl_hist2d(xs, ys):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(4,6))
+    plt.hist2d(xs, ys, bins=(30,30))
+    plt.gca().invert_yaxis()
+    plt.colorbar(); plt.title("Bowling Heatmap")
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png"); plt.close()
+    return buf.getvalue()
+
+
+def mpl_histogram(values):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(5,5))
+    plt.hist(values, bins=12)
+    plt.title("Wagon Wheel (shot angles)")
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png"); plt.close()
+    return buf.getvalue()
+
+
+def import_ms(statement):
+    """Milliseconds a fresh interpreter spends on statement (median of 3)."""
+    code = f"import time; t = time.perf_counter(); {statement}; print((time.perf_counter() - t) * 1000)"
+    runs = [float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout) for _ in range(3)]
+    return sorted(runs)[1]
+
+
+def timed(fn, repeat):
+    fn()   # warm-up: first-call caches (fonts, colormaps) are not per-chart costs
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(-np.pi, np.pi, args.points)
+    xs, ys = rng.normal(320, 60, args.points), rng.normal(190, 50, args.points)
+    counts = np.bincount(((angles + np.pi) / (2 * np.pi) * 36).astype(int) % 36, minlength=36)
+    degrees = np.degrees(angles)
+
+    cases = [
+        ("wagon wheel", lambda: mpl_wagon_wheel(angles), lambda: charts.wagon_wheel(angles)),
+        ("wagon counts", lambda: mpl_wagon_counts(counts), lambda: charts.wagon_counts(counts)),
+        ("hist2d", lambda: mpl_hist2d(xs, ys), lambda: charts.hist2d(xs, ys)),
+        ("histogram", lambda: mpl_histogram(degrees), lambda: charts.histogram(degrees)),
+    ]
+    print(f"{args.points} points, median of {args.repeat}")
+    print(f"{'chart':<14}{'matplotlib ms':>15}{'charts ms':>12}{'speedup':>10}")
+    for name, old, new in cases:
+        a, b = timed(old, args.repeat), timed(new, args.repeat)
+        print(f"{name:<14}{a:>15.1f}{b:>12.2f}{a / b:>9.0f}x")
+
+    print(f"{'import':<14}{import_ms('import matplotlib.pyplot'):>15.1f}{import_ms('import src.charts'):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput and ball recall of ROI-cropped inference against full-frame
+inference. Full-frame detections that fall inside the ROI are the
+reference: recall is the share of them the ROI run also found (same
+frame, centres within --tol px).
+
+    python benchmarks/bench_roi.py --roi-refresh 150
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.models import get_model
+from src.batch_infer import batch_track, pitch_roi, MODEL_NAME
+
+VIDEOS = [
+    os.path.join(ROOT, "data", "sample.mp4"),
+    os.path.join(ROOT, "Ball Trajectory Prediction", "videos", "test.mp4"),
+    os.path.join(ROOT, "Ball Trajectory Prediction", "videos", "test1.mp4"),
+]
+
+
+def run(video_path, **kwargs):
+    cap = cv2.VideoCapture(video_path)
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    start = time.perf_counter()
+    parts = [rows for _, rows in batch_track(video_path, **kwargs)]
+    fps = frames / (time.perf_counter() - start)
+    rows = np.concatenate(parts) if parts else None
+    return fps, rows
+
+
+def centres(rows):
+    return np.stack([(rows["x1"] + rows["x2"]) / 2, (rows["y1"] + rows["y2"]) / 2], axis=1)
+
+
+def recall(reference, found, roi, tol):
+    if reference is None:
+        return float("nan")
+    c = centres(reference)
+    x1, y1, x2, y2 = roi
+    inside = (c[:, 0] >= x1) & (c[:, 0] < x2) & (c[:, 1] >= y1) & (c[:, 1] < y2)
+    reference, c = reference[inside], c[inside]
+    if len(reference) == 0:
+        return float("nan")
+    if found is None:
+        return 0.0
+    fc = centres(found)
+    hits = 0
+    for frame, centre in zip(reference["frame"], c):
+        same = fc[found["frame"] == frame]
+        hits += bool(len(same)) and np.min(np.linalg.norm(same - centre, axis=1)) <= tol
+    return hits / len(reference)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.json"))
+    parser.add_argument("--roi-refresh", type=int, default=None)
+    parser.add_argument("--tol", type=float, default=10)
+    parser.add_argument("videos", nargs="*", default=VIDEOS)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        pitch = json.load(f)["pitch"]
+    get_model(MODEL_NAME)  # load + warm up outside the timings
+    print(f"{'video':<16}{'full fps':>10}{'roi fps':>10}{'speedup':>10}{'recall':>10}")
+    for video in args.videos:
+        cap = cv2.VideoCapture(video)
+        w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        roi = pitch_roi(pitch, w, h)
+        full_fps, full_rows = run(video)
+        roi_fps, roi_rows = run(video, roi=roi, roi_refresh=args.roi_refresh)
+        print(f"{os.path.basename(video):<16}{full_fps:>10.1f}{roi_fps:>10.1f}"
+              f"{roi_fps / full_fps:>9.2f}x{recall(full_rows, roi_rows, roi, args.tol):>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
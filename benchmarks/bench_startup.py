@@ -0,0 +1,91 @@
+"""
+Cold-start cost of the web app and the CLI: the time a fresh interpreter
+spends importing app.py / run_pipeline.py, and whether that pulled in
+the ML or plotting stacks. Those belong to the analysis path only
+(src/models.py imports ultralytics on the first model load), so serving
+the index page never waits for torch.
+
+    python benchmarks/bench_startup.py --repeat 5 --top 10
+
+Exits non-zero if a heavy stack is imported at startup or the median
+import time is over budget, so it can gate a change that regresses it.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cold import, ms. Measured ~350 (app: flask ~200, cv2 + numpy ~100)
+# and ~150 (run_pipeline) on a laptop-class CPU; torch alone would add seconds.
+BUDGET_MS = {"app": 700, "run_pipeline": 400}
+HEAVY = ("torch", "ultralytics", "matplotlib", "onnxruntime", "openvino")
+
+CHILD = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t) * 1000
+heavy = sorted({{m.split(".")[0] for m in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"ms": ms, "heavy": heavy}}))
+"""
+
+
+def cold_import(module):
+    """(ms, heavy packages loaded) for importing module in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-c", CHILD.format(module=module, heavy=HEAVY)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["ms"], result["heavy"]
+
+
+def slowest(module, top):
+    """The top modules by cumulative import time (python -X importtime)."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, parts[2].strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports")
+    parser.add_argument("modules", nargs="*", default=list(BUDGET_MS))
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<14}{'median ms':>11}{'budget ms':>11}  heavy imports")
+    for module in args.modules:
+        try:
+            runs = [cold_import(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<14}  ❌ import failed: {e}")
+            failed = True
+            continue
+        ms = sorted(r[0] for r in runs)[len(runs) // 2]
+        heavy = sorted({h for r in runs for h in r[1]})
+        budget = BUDGET_MS.get(module)
+        over = budget is not None and ms > budget
+        failed |= over or bool(heavy)
+        print(f"{module:<14}{ms:>11.0f}{budget or '-':>11}  {', '.join(heavy) or '-'}"
+              f"{'  ❌' if over or heavy else ''}")
+        for cum_ms, name in slowest(module, args.top) if args.top else []:
+            print(f"    {cum_ms:>8.1f} ms  {name}")
+
+    if failed:
+        print("❌ Cold start regressed: keep heavy imports inside the functions that need them")
+        sys.exit(1)
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
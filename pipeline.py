@@ -1,10 +1,25 @@
 import os
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import json
-from ultralytics import YOLO
+import hashlib
+import subprocess
+from src.models import get_model
+from src.cache import ResultCache, cache_key, file_digest
+from src.track_store import TrackWriter, store_path, read_meta, load_tracks, read_rows, ball_points, BALL_CLASS, TRACK_DTYPE
+from src.batch_infer import track_video_batched, pitch_roi, BATCH_SIZE
+from src.parallel import track_parallel, SEGMENT_FRAMES, OVERLAP_FRAMES
+from src.scheduler import gated_track, DETECT_BUDGET
+from src.heatmap import HeatmapAccumulator, HeatmapPyramid, render_heatmap
+from src.checkpoint import resume, track_resumable, save_checkpoint, clear_checkpoint, still_growing, CHECKPOINT_EVERY
+from src.deliveries import load_index
+from src.clips import annotated_video, tracks_tag
+from src.season import SeasonStore, aggregate, SEASON_DIR, SEASON_SHAPE
+from src.visualizer import plot_wagon_counts
+from src import charts
+from src.charts import save_png
+from src.utils import scale_pitch, in_pitch
 
 MODEL_NAME = "yolov8n.pt"   # pre-trained YOLOv8
 
@@ -14,7 +29,21 @@ def load_config(config_path="config.json"):
     with open(config_path, "r") as f:
         return json.load(f)
 
-os.makedirs(OUT_DIR, exist_ok=True)
+PROGRESS_EVERY = 10   # frames between progress reports to a job worker
+PARTIAL_EVERY_S = 10  # seconds of video between partial heatmaps while tracking
+
+RESULT_CACHE = ResultCache()
+
+def video_info(video_path):
+    cap = cv2.VideoCapture(video_path)
+    info = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+    }
+    cap.release()
+    return info
 
 # def track_ball(video_path):
 #     cap = cv2.VideoCapture(video_path)
@@ -66,64 +95,213 @@ os.makedirs(OUT_DIR, exist_ok=True)
 #     print("✅ Annotated video saved at outputs/ball_tracking.mp4")
 #     return ball_positions
 
-def track_ball(video_path):
+def tracking_run(video_path, info=None, mode=None):
+    """
+    How track_ball tracks video_path with the current config: model,
+    backend and the options that change which rows come out. Saved with
+    checkpoints and in the store's meta.json; a store or checkpoint made
+    any other way is tracked again rather than reused.
     """
-    Tracks a ball in a video using YOLOv8 and saves an annotated video.
-    Returns the annotated video path and the ball's positions over time.
+    config = load_config()
+    tracking = config.get("tracking", {})
+    backend = config.get("detector", {}).get("backend", "torch")
+    mode = mode or tracking.get("mode", "stream")
+    if mode == "stream" and backend != "torch":
+        mode = "batch"
+    info = info or video_info(video_path)
+    return {"model": MODEL_NAME, "backend": backend, "mode": mode,
+            "roi": list(pitch_roi(config["pitch"], info["width"], info["height"])) if tracking.get("roi") else None,
+            "roi_refresh": tracking.get("roi_refresh"),
+            "batch_size": tracking.get("batch_size", BATCH_SIZE),
+            "detect_budget": tracking.get("detect_budget", DETECT_BUDGET) if mode == "gated" else None}
+
+def track_ball(video_path, progress=None, store_dir=None, mode=None, on_partial=None):
+    """
+    Tracks a ball in a video using YOLOv8. Every ball detection is written
+    to a track store (see src/track_store.py) so charts can be redrawn later
+    without running detection again. No annotated video is encoded here;
+    render_annotated_job draws one from the store when it is asked for.
 
     Args:
         video_path (str): The path to the input video file.
+        progress (callable, optional): Called as progress(frames_done, total_frames, **info)
+               every PROGRESS_EVERY frames, e.g. the hook a job worker hands in.
+        on_partial (callable, optional): Called with the track rows found since
+               its previous call (all rows so far on the first call after a resume)
+               every tracking.partial_every_s seconds of video; whatever dict
+               it returns (e.g. a partial heatmap path) is passed on as progress info.
+        store_dir (str, optional): Where to write the track store; defaults to
+               a .tracks directory next to the video.
+        mode (str, optional): "stream" (frame by frame with model.track),
+               "batch" (batched offline inference) or
+               "parallel" (overlapping segments tracked across CPU cores and
+               stitched back together) or "gated" (detector only on frames
+               with motion, within tracking.detect_budget calls per second,
+               Kalman-filled in between); defaults to config.json "tracking.mode".
+               The frame-driven modes honour tracking.roi (detect only inside
+               the configured pitch box); batch and parallel also tracking.roi_refresh.
+
+    Stream and batch runs save a checkpoint every tracking.checkpoint_every
+    frames. If the store already has a checkpoint for this video (the worker
+    died mid-run, or the recording has grown since) tracking picks up from
+    there in batch mode instead of starting again at frame 0, provided it
+    was tracked the same way (tracking_run). The checkpoint is removed once
+    a video that has stopped growing is fully tracked.
+
+    Detection runs on config.json "detector.backend" (torch, onnxruntime or
+    openvino; see src/detectors.py). model.track only exists for torch, so
+    other backends run stream mode as batch mode.
 
     Returns:
-        tuple: A tuple containing the path to the annotated video and
-               a list of tuples with (frame_idx, (x, y)) coordinates of the ball.
+        numpy.ndarray: The ball detections as a TRACK_DTYPE array
+               (frame, id, cls, x1, y1, x2, y2, conf).
     """
-    model = YOLO(MODEL_NAME)
-    project = "outputs"
-    name = "track"
+    config = load_config()
+    tracking = config.get("tracking", {})
+    backend = config.get("detector", {}).get("backend", "torch")
+    mode = mode or tracking.get("mode", "stream")
+    if mode == "stream" and backend != "torch":
+        print(f"⚠️ {backend} backend has no model.track; tracking in batch mode")
+        mode = "batch"
+    info = video_info(video_path)
+    total_frames = info["frame_count"] or None
+    store_dir = store_dir or store_path(video_path)
+    run = tracking_run(video_path, info, mode)
+    video_size = os.path.getsize(video_path)
+    checkpoint_every = tracking.get("checkpoint_every", CHECKPOINT_EVERY)
+    if checkpoint_every and mode in ("stream", "batch"):
+        writer, start, tracker = resume(store_dir, video_path, run)
+    else:
+        writer, start, tracker = TrackWriter(store_dir), 0, None
+
+    report = progress
+    if on_partial:
+        partial_frames = max(1, int(tracking.get("partial_every_s", PARTIAL_EVERY_S) * (info["fps"] or 30)))
+        last_partial = [0]
+        # Rows come straight from the writer as they are added; the store is never re-read
+        # or flushed early, so chunks stay chunk_rows long
+        new_rows = [read_rows(store_dir, 0, writer.rows)] if start else []
+        writer.on_rows = new_rows.append
+
+        def report(done, total=None, **extra):
+            if done - last_partial[0] >= partial_frames:
+                last_partial[0] = done
+                rows = np.concatenate(new_rows) if new_rows else np.empty(0, dtype=TRACK_DTYPE)
+                new_rows.clear()
+                extra.update(on_partial(rows) or {})
+            if progress:
+                progress(done, total, **extra)
+
+    # Options shared by the frame-driven modes ("batch" and "parallel")
+    frame_opts = {"batch_size": run["batch_size"], "model_name": MODEL_NAME,
+                  "roi_refresh": run["roi_refresh"], "backend": backend}
+    if run["roi"]:
+        frame_opts["roi"] = tuple(run["roi"])
+
+    if start or (mode == "batch" and checkpoint_every):
+        if start:
+            print(f"✅ Resuming {os.path.basename(video_path)} from checkpoint at frame {start}")
+        track_resumable(video_path, writer, start, tracker, checkpoint_every=checkpoint_every,
+                        progress=report, progress_every=PROGRESS_EVERY, run=run, **frame_opts)
+    elif mode == "batch":
+        track_video_batched(video_path, writer, progress=report,
+                            progress_every=PROGRESS_EVERY, **frame_opts)
+    elif mode == "parallel":
+        track_parallel(video_path, writer, workers=tracking.get("workers"),
+                       segment_frames=tracking.get("segment_frames", SEGMENT_FRAMES),
+                       overlap=tracking.get("overlap_frames", OVERLAP_FRAMES),
+                       progress=report, **frame_opts)
+    elif mode == "gated":
+        stats = {}
+        for frame_idx, rows in gated_track(video_path, tracking.get("detect_budget", DETECT_BUDGET),
+                                           model_name=MODEL_NAME, roi=frame_opts.get("roi"), stats=stats,
+                                           backend=backend, progress=report,
+                                           progress_every=PROGRESS_EVERY):
+            writer.add_rows(rows)
+        print(f"✅ Detector ran on {stats['detected']}/{stats['frames']} frames "
+              f"({stats['skipped_still']} still, {stats['skipped_budget']} over budget, "
+              f"{stats['interpolated']} Kalman-filled)")
+    else:
+        frames = track_stream(video_path, writer, report, total_frames, checkpoint_every=checkpoint_every,
+                              run=run)
+        if not frames:
+            print("❌ No frames were tracked.")
+
+    writer.close(video=os.path.basename(video_path), video_digest=file_digest(video_path),
+                 model=MODEL_NAME, backend=backend, run=run, **info)
+    if not still_growing(video_path, video_size):
+        clear_checkpoint(store_dir)
+    if progress:
+        progress(total_frames or writer.rows, total_frames)
+
+    return load_tracks(store_dir)
 
-    # Run tracking and save the annotated video
+def track_stream(video_path, writer, progress=None, total_frames=None, checkpoint_every=None, run=None):
+    """
+    Frame-by-frame model.track over the video; returns the number of frames seen.
+    With checkpoint_every, the predictor's tracker state is checkpointed
+    (see src/checkpoint.py, tagged with run) every that many frames and at the end.
+    """
+    model = get_model(MODEL_NAME)
+
+    # Only the tracks are kept; drawing and re-encoding the video is left to render_annotated_job
     results_generator = model.track(
         source=video_path,
         tracker="bytetrack.yaml",
         imgsz=640,
         conf=0.25,
-        save=True,
-        project=project,
+        save=False,
         classes=[32],
-        name=name,
         stream=True
     )
 
-    ball_positions = []
-    annotated_video_path = None
-    
-    # Process the streamed results to get ball positions and the video path
+    frames = 0
+    # Process the streamed results to get ball positions
     for i, r in enumerate(results_generator):
-        # Determine the annotated video path from the first result object
-        if annotated_video_path is None and r.save_dir:
-            annotated_video_path = os.path.join(r.save_dir, os.path.basename(video_path))
-        
+        frames = i + 1
         # Extract ball positions if detections exist
         if r.boxes and r.boxes.id is not None:
             boxes = r.boxes
             cls = boxes.cls.cpu().numpy().astype(int)
             ids = boxes.id.cpu().numpy().astype(int)
             xyxy = boxes.xyxy.cpu().numpy()
-            
-            for c, tid, bb in zip(cls, ids, xyxy):
-                # Check for the ball class (class ID 32)
-                if c == 32:
-                    x1, y1, x2, y2 = bb
-                    cx, cy = float((x1 + x2) / 2), float((y1 + y2) / 2)
-                    ball_positions.append((i, (int(cx), int(cy))))
-                    
-    if annotated_video_path:
-        print(f"✅ Annotated video saved at {annotated_video_path}")
-    else:
-        print("❌ Failed to generate annotated video.")
-
-    return ball_positions
+            conf = boxes.conf.cpu().numpy()
+
+            # Keep only the ball class (class ID 32)
+            ball = cls == BALL_CLASS
+            if ball.any():
+                writer.add(i, xyxy[ball], cls[ball], ids[ball], conf[ball])
+
+        if progress and (i + 1) % PROGRESS_EVERY == 0:
+            progress(i + 1, total_frames)
+        if checkpoint_every and (i + 1) % checkpoint_every == 0:
+            checkpoint_stream(model, writer, video_path, i + 1, run)
+
+    if checkpoint_every and frames:
+        checkpoint_stream(model, writer, video_path, frames, run)
+    return frames
+
+def checkpoint_stream(model, writer, video_path, frame, run=None):
+    trackers = getattr(getattr(model, "predictor", None), "trackers", None)
+    if trackers:
+        save_checkpoint(writer.store_dir, frame, trackers[0], writer, video_path, run)
+
+def load_or_track(video_path, progress=None, on_partial=None):
+    """Ball tracks for a video, read from its track store when it is already up to date."""
+    store_dir = store_path(video_path)
+    meta = read_meta(store_dir)
+    if meta.get("video_digest") == file_digest(video_path) and meta.get("run") == tracking_run(video_path):
+        print(f"✅ Using stored tracks from {store_dir}")
+        return load_tracks(store_dir)
+    return track_ball(video_path, progress=progress, store_dir=store_dir, on_partial=on_partial)
+
+def render_annotated_job(video_path, progress=None, out_dir=OUT_DIR):
+    """
+    Annotated video drawn from the video's track store (tracking first if the
+    store is missing or stale). Rendered once, then served from out_dir.
+    """
+    load_or_track(video_path, progress=progress)
+    return {"annotated_video": annotated_video(video_path, out_dir, store_path(video_path), progress=progress)}
 
 # def make_heatmap(ball_positions):
 #     xs = [p[1][0] for p in ball_positions if p[1] is not None]
@@ -175,33 +353,46 @@ def track_ball(video_path):
 #     cv2.imwrite(heatmap_path, heatmap_color)
 #     print(f"✅ Pitch Heatmap saved at {heatmap_path}")
 
-def make_pitch_heatmap(ball_positions, frame_shape=(360, 640), config_path="config.json"):
+DEFAULT_FRAME_SHAPE = (360, 640)   # only used when the caller doesn't know the video size
+
+def make_pitch_heatmap(ball_positions, frame_shape=None, config_path="config.json", accumulator_path=None,
+                       out_path=None, accumulator=None):
+    """
+    Pitch heatmap of ball positions inside the configured pitch box.
+    frame_shape is the video's (height, width); the box (set for 640x360)
+    is scaled to it, as the season heatmap does. With accumulator_path the
+    points are added to the counts saved there (created if missing) and the
+    image shows everything accumulated so far, e.g. a whole season;
+    accumulator does the same with a HeatmapAccumulator held in memory.
+    The image goes to out_path, by default outputs/pitch_heatmap.png.
+    """
     # Load config
     config = load_config(config_path)
-    pitch = config["pitch"]
+    frame_shape = tuple(frame_shape or DEFAULT_FRAME_SHAPE)
+    pitch = scale_pitch(config["pitch"], frame_shape[1], frame_shape[0])
     PITCH_X1, PITCH_X2 = pitch["x1"], pitch["x2"]
     PITCH_Y1, PITCH_Y2 = pitch["y1"], pitch["y2"]
 
-    # Filter only positions inside pitch
-    valid_positions = [
-        p[1] for p in ball_positions if p[1] is not None
-        and PITCH_X1 <= p[1][0] <= PITCH_X2
-        and PITCH_Y1 <= p[1][1] <= PITCH_Y2
-    ]
+    # Filter only positions inside pitch; ball_positions may be a track
+    # store array or the older [(frame, (x, y)), ...] list
+    _, xs, ys = ball_points(ball_positions)
+    inside = in_pitch(pitch, xs, ys)
 
-    if len(valid_positions) == 0:
+    if accumulator is not None:
+        acc = accumulator
+    elif accumulator_path:
+        acc = HeatmapAccumulator.load(accumulator_path, frame_shape)
+    else:
+        acc = HeatmapAccumulator(frame_shape)
+    acc.add(xs[inside], ys[inside])
+    if accumulator_path:
+        acc.save(accumulator_path)
+
+    if acc.total() == 0:
         print("⚠️ No ball positions inside pitch")
         return
 
-    heatmap = np.zeros((frame_shape[0], frame_shape[1]), dtype=np.float32)
-
-    for (x, y) in valid_positions:
-        if 0 <= int(y) < frame_shape[0] and 0 <= int(x) < frame_shape[1]:
-            heatmap[int(y), int(x)] += 1
-
-    heatmap = cv2.GaussianBlur(heatmap, (51, 51), 0)
-    heatmap = (heatmap / heatmap.max() * 255).astype(np.uint8)
-    heatmap_color = cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
+    heatmap_color = render_heatmap(acc.counts)
 
     # Draw pitch boundary
     cv2.rectangle(
@@ -209,10 +400,11 @@ def make_pitch_heatmap(ball_positions, frame_shape=(360, 640), config_path="conf
         (255, 255, 255), 2
     )
 
-    os.makedirs(OUT_DIR, exist_ok=True)
-    heatmap_path = os.path.join(OUT_DIR, "pitch_heatmap.png")
+    heatmap_path = out_path or os.path.join(OUT_DIR, "pitch_heatmap.png")
+    os.makedirs(os.path.dirname(heatmap_path) or ".", exist_ok=True)
     cv2.imwrite(heatmap_path, heatmap_color)
     print(f"✅ Pitch Heatmap saved at {heatmap_path}")
+    return heatmap_path
 
 # def make_wagon_wheel(ball_positions):
 #     valid_positions = [p[1] for p in ball_positions if p[1] is not None]
@@ -236,39 +428,33 @@ def make_pitch_heatmap(ball_positions, frame_shape=(360, 640), config_path="conf
 #     plt.close()
 #     print(f"✅ Wagon Wheel saved at {wagon_path}")
 
-def make_wagon_wheel(ball_positions):
-    valid_positions = [p[1] for p in ball_positions if p[1] is not None]
-    if len(valid_positions) < 2:
+def make_wagon_wheel(ball_positions, out_path=None, deliveries=None):
+    """
+    Polar plot of ball directions. With a delivery index (src/deliveries.py)
+    every delivery is measured from its own first sighting; without one the
+    first ball position of the whole video stands in for the batsman.
+    """
+    frames, xs, ys = ball_points(ball_positions)
+    if len(xs) < 2:
         print("⚠️ Not enough ball positions for wagon wheel")
         return
-    
-    # Take first ball position as "batsman"
-    origin = valid_positions[0]
-    angles = []
-    for x,y in valid_positions:
-        dx, dy = x - origin[0], y - origin[1]
-        angle = math.atan2(dy, dx)  # radians
-        angles.append(angle)
-
-    # Convert angles to radians for polar plot
-    angles = np.array(angles)
-    radii = np.ones_like(angles)  # just give each shot length 1 (equal weight)
-
-    plt.figure(figsize=(6,6), facecolor="white")
-    ax = plt.subplot(111, polar=True)
-    ax.set_theta_zero_location("N")   # 0° = top (like cricket pitch)
-    ax.set_theta_direction(-1)        # clockwise
-
-    ax.scatter(angles, radii, c="green", s=50, alpha=0.75)
-
-    # Optional: add radial grid (represents field)
-    ax.set_rticks([])
-    ax.set_title("Wagon Wheel", va="bottom")
-
-    wagon_path = os.path.join(OUT_DIR, "wagon_wheel.png")
-    plt.savefig(wagon_path, bbox_inches="tight")
-    plt.close()
+
+    if deliveries:
+        starts = np.array([d["first_ball"] for d in deliveries])
+        ends = np.array([d["last_ball"] for d in deliveries])
+        which = np.searchsorted(starts, frames, side="right") - 1
+        inside = (which >= 0) & (frames <= ends[np.maximum(which, 0)])
+        frames, xs, ys, which = frames[inside], xs[inside], ys[inside], which[inside]
+        first = np.searchsorted(frames, starts)   # index of each delivery's first sighting
+        ox, oy = xs[first[which]], ys[first[which]]
+    else:
+        ox, oy = xs[0], ys[0]   # Take first ball position as "batsman"
+    angles = np.arctan2(ys - oy, xs - ox)  # radians, 0° at the top and clockwise on the chart
+
+    # Every shot at the same radius (equal weight), drawn by src/charts.py
+    wagon_path = save_png(charts.wagon_wheel(angles), out_path or os.path.join(OUT_DIR, "wagon_wheel.png"))
     print(f"✅ Wagon Wheel saved at {wagon_path}")
+    return wagon_path
 
 
 # 
@@ -280,9 +466,121 @@ def make_wagon_wheel(ball_positions):
 #         print("Usage: python pipeline.py <video_path>")
 #         sys.exit(1)
     # video_path = sys.argv[1]
-def mainfn():
-    video_path = "static/uploads/sample.mp4"
-    ball_positions = track_ball(video_path)
+def mainfn(video_path="static/uploads/sample.mp4", progress=None, use_cache=True, out_dir=OUT_DIR):
+    """
+    Pitch heatmap + wagon wheel for one video. Each upload passes its own
+    out_dir so concurrent analyses never write to the same files.
+    """
+    # Same video bytes + weights + pitch box => same charts, served from the cache
+    config = load_config()
+    key = cache_key(video_path, MODEL_NAME, {"job": "heatwagon", "pitch": config["pitch"],
+                                             "tracking": config.get("tracking", {}),
+                                             "detector": config.get("detector", {})})
+    cached = RESULT_CACHE.get(key) if use_cache else None
+    if cached:
+        print(f"✅ Cache hit {key}")
+        return cached["artifacts"]
+
+    # While tracking, send a heatmap of what has been seen so far along with progress
+    info = video_info(video_path)
+    partial_path = os.path.join(out_dir, "partial", key + "_heatmap.png")
+    partial_counts = HeatmapAccumulator((info["height"], info["width"]))
+    def on_partial(rows):
+        # only the new rows are counted; the accumulator holds everything before them
+        path = make_pitch_heatmap(rows, (info["height"], info["width"]), out_path=partial_path,
+                                  accumulator=partial_counts)
+        return {"partial_heatmap": path} if path else {}
+
+    # A new pitch box only needs the charts redrawn from the stored tracks
+    ball_positions = load_or_track(video_path, progress=progress, on_partial=on_partial)
     #make_heatmap(ball_positions)
-    make_pitch_heatmap(ball_positions)
-    make_wagon_wheel(ball_positions)
+    meta = read_meta(store_path(video_path))
+    heatmap_path = make_pitch_heatmap(ball_positions, frame_shape=(meta["height"], meta["width"]),
+                                      out_path=os.path.join(out_dir, "pitch_heatmap.png"))
+    index = load_index(store_path(video_path))
+    wagon_path = make_wagon_wheel(ball_positions, out_path=os.path.join(out_dir, "wagon_wheel.png"),
+                                  deliveries=index["deliveries"])
+    # Unfiltered pyramid for the zoomable heatmap view, so the first request is instant
+    aggregated_charts([store_path(video_path)], (meta["height"], meta["width"]), os.path.join(out_dir, "pyramids"),
+                    tracks_tag(store_path(video_path)))
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+    entry = RESULT_CACHE.put(key, {"pitch_heatmap": heatmap_path, "wagon_wheel": wagon_path},
+                             {"tracks": store_path(video_path), "deliveries": len(index["deliveries"])})
+    return entry["artifacts"]
+
+def season_charts(bowler=None, date_from=None, date_to=None, lengths=None, progress=None,
+                  season_dir=SEASON_DIR, out_dir=os.path.join(OUT_DIR, "season")):
+    """
+    Pitch heatmap + wagon wheel over every season session matching the
+    filters (see src/season.py). Sessions are streamed chunk by chunk, so
+    a whole season never has to fit in memory.
+    """
+    config = load_config()
+    pitch = config["pitch"]
+    sessions = SeasonStore(season_dir).sessions(bowler, date_from, date_to)
+    acc, wagon, stats = aggregate([os.path.join(season_dir, s["id"]) for s in sessions],
+                                  lengths=lengths, pitch=pitch, progress=progress)
+    print(f"✅ Season: {stats['points']} ball positions from {stats['deliveries']} deliveries "
+          f"in {stats['sessions']} sessions")
+
+    # One file per query, so different filters never overwrite each other's charts
+    query = {"bowler": bowler, "from": date_from, "to": date_to, "lengths": sorted(lengths or []), "pitch": pitch}
+    name = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()[:12]
+    heatmap_path = None
+    if acc.total():
+        heatmap_color = render_heatmap(acc.counts)
+        box = scale_pitch(pitch, SEASON_SHAPE[1], SEASON_SHAPE[0])
+        cv2.rectangle(heatmap_color, (box["x1"], box["y1"]), (box["x2"], box["y2"]), (255, 255, 255), 2)
+        heatmap_path = os.path.join(out_dir, name + "_heatmap.png")
+        os.makedirs(out_dir, exist_ok=True)
+        cv2.imwrite(heatmap_path, heatmap_color)
+    else:
+        print("⚠️ No ball positions inside pitch")
+    wagon_path = plot_wagon_counts(wagon, os.path.join(out_dir, name + "_wagon_wheel.png"),
+                                   title=f"Wagon Wheel ({stats['deliveries']} deliveries)") if wagon.any() else None
+    return {"season_heatmap": heatmap_path, "season_wagon_wheel": wagon_path}
+
+def charts_path(shape, cache_dir, tag, lengths=None):
+    """Cache file of aggregated_charts for one tag (what the tracks are) + filters + pitch box."""
+    pitch = load_config()["pitch"]
+    query = {"tag": tag, "shape": list(shape), "lengths": sorted(lengths or []),
+             "pitch": scale_pitch(pitch, shape[1], shape[0])}
+    return os.path.join(cache_dir, hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()[:16] + ".npz")
+
+def cached_charts(path):
+    """(HeatmapPyramid, wagon counts) saved at a charts_path, or None if not built yet."""
+    wagon_path = path.replace(".npz", "_wagon.npy")
+    if os.path.exists(path) and os.path.exists(wagon_path):
+        return HeatmapPyramid.load(path), np.load(wagon_path)
+    return None
+
+def aggregated_charts(store_dirs, shape, cache_dir, tag, lengths=None, progress=None):
+    """
+    Pitch heatmap of the store_dirs' ball points (only lengths deliveries if
+    given) as a HeatmapPyramid for zoomed views, and their wagon wheel angle
+    histogram. Built once per charts_path and kept in cache_dir.
+    """
+    path = charts_path(shape, cache_dir, tag, lengths)
+    cached = cached_charts(path)
+    if cached:
+        return cached
+    acc, wagon, _ = aggregate(store_dirs, lengths=lengths, pitch=load_config()["pitch"], shape=shape,
+                              progress=progress)
+    pyramid = HeatmapPyramid.from_counts(acc.counts)
+    # wagon first and the pyramid last, both atomically: cached_charts never sees half a build
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path + ".wagon.tmp.npy", wagon)
+    os.replace(path + ".wagon.tmp.npy", path.replace(".npz", "_wagon.npy"))
+    pyramid.save(path)
+    return pyramid, wagon
+
+def charts_job(store_dirs, shape, cache_dir, tag, lengths=None, progress=None):
+    """Job wrapper: build aggregated_charts' cache in a worker; the chart routes then read it."""
+    aggregated_charts(store_dirs, shape, cache_dir, tag, lengths=lengths, progress=progress)
+    return {}
+
+def analyze_trajectory_job(video_path, progress=None):
+    """Job wrapper around the trajectory script so it runs in a worker, not a request thread."""
+    subprocess.run(["python", "analyze_trajectory.py", video_path], check=True)
+    return {"trajectory": os.path.join("static", "outputs", "trajectory.png")}
@@ -11,7 +11,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     video_path = sys.argv[1]
-    results = run_full_pipeline(video_path)
+    results = run_full_pipeline(video_path, annotate=True)
 
     #newly added code
     '''out = track_ball(video_path)
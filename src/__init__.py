@@ -1,4 +1,3 @@
-from pipeline import mainfn
-
 def start():
+    from pipeline import mainfn
     mainfn()
\ No newline at end of file
@@ -1,23 +1,31 @@
 import numpy as np
 import cv2
+from .track_store import ball_points, is_track_array, BALL_CLASS
 
 def detect_ball_positions(tracks):
     """Filter YOLO tracks for sports ball class (id=32)."""
+    if is_track_array(tracks):
+        return tracks[tracks["cls"] == BALL_CLASS]
     return [(t["frame"], t["cx"], t["cy"]) for t in tracks if t["cls"] == 32]
 
 def compute_bounces(points):
-    """Find local minima in y trajectory (bounce points)."""
-    if not points:
+    """
+    Find local minima in y trajectory (bounce points).
+    points is a list of (frame, cx, cy) or a track store array of ball rows.
+    """
+    if len(points) == 0:
         return []
-    points = sorted(points, key=lambda x: x[0])
-    ys = np.array([p[2] for p in points])
+    if is_track_array(points):
+        frames, xs, ys = ball_points(points, cls=None)
+    else:
+        arr = np.array(points, dtype=np.float64)
+        frames, xs, ys = arr[:, 0], arr[:, 1], arr[:, 2]
+    order = np.argsort(frames, kind="stable")
+    frames, xs, ys = frames[order], xs[order], ys[order]
     kernel = np.ones(5) / 5
     ys_s = np.convolve(ys, kernel, mode="same")
-    bounces = []
-    for i in range(2, len(ys_s)-2):
-        if ys_s[i] < ys_s[i-1] and ys_s[i] < ys_s[i+1]:
-            bounces.append((points[i][0], points[i][1], points[i][2]))
-    return bounces
+    idx = np.nonzero((ys_s[2:-2] < ys_s[1:-3]) & (ys_s[2:-2] < ys_s[3:-1]))[0] + 2
+    return [(int(frames[i]), float(xs[i]), float(ys[i])) for i in idx]
 
 def classify_length(y, H):
     """Classify delivery length based on bounce Y position."""
@@ -1,14 +1,17 @@
 import cv2
+import time
+import queue
+import threading
 import numpy as np
-from ultralytics import YOLO
+from .detectors import get_detector
 
 MODEL_NAME = "yolov8n.pt"   # still COCO, we’ll only use it for persons/stumps
 
-def detect_pitch_area(frame, model):
-    """Use YOLO to detect players/stumps, then crop pitch region around them."""
-    results = model(frame)
-    boxes = results[0].boxes.xyxy.cpu().numpy()
-    cls = results[0].boxes.cls.cpu().numpy().astype(int)
+def detect_pitch_area(frame, detector):
+    """Use YOLO (a src.detectors detector, any backend) to detect players/stumps, then crop pitch region around them."""
+    det = detector.predict([frame])[0]
+    boxes = det.xyxy
+    cls = det.cls.astype(int)
     
     persons = [b for b,c in zip(boxes,cls) if c==0]  # 0=person
     if not persons:
@@ -28,8 +31,57 @@ def detect_pitch_area(frame, model):
     return frame[y1:y2, x1:x2], (x1,y1,x2,y2)
 
 
-def track_ball(video_path, out_path="outputs/ball_tracking.mp4"):
-    model = YOLO(MODEL_NAME)
+QUEUE_SIZE = 32   # frames buffered between stages
+
+
+def _decode_stage(cap, frames_q, stats, errors):
+    """Decoder thread: read frames in order and hand them to the compute stage."""
+    idx = 0
+    try:
+        while True:
+            t = time.perf_counter()
+            ret, frame = cap.read()
+            stats["decode"] += time.perf_counter() - t
+            if not ret:
+                break
+            frames_q.put((idx, frame))
+            idx += 1
+    except Exception as e:
+        errors["decode"] = e   # re-raised by track_ball once the stages are joined
+    finally:
+        frames_q.put(None)
+
+
+def _write_stage(out, write_q, stats, errors):
+    """
+    Writer thread: encode annotated frames in the order they were queued.
+    After a failed write it only drains the queue, so compute never blocks on it.
+    """
+    while True:
+        item = write_q.get()
+        if item is None:
+            break
+        if "write" in errors:
+            continue
+        _, frame = item   # single FIFO producer, so idx arrives in order
+        t = time.perf_counter()
+        try:
+            out.write(frame)
+        except Exception as e:
+            errors["write"] = e   # re-raised by track_ball once the stages are joined
+        stats["write"] += time.perf_counter() - t
+
+
+def track_ball(video_path, out_path="outputs/ball_tracking.mp4", stats=None):
+    """
+    Optical-flow ball tracking inside the pitch ROI, written as an annotated video.
+
+    Decoding, flow/contour compute and mp4v encoding run as three stages
+    (decoder thread -> compute -> writer thread) joined by bounded queues,
+    so OpenCV's GIL-releasing calls overlap. Pass a dict as stats to get
+    seconds spent per stage plus frame count and wall time back.
+    """
+    model = get_detector(MODEL_NAME)
 
     cap = cv2.VideoCapture(video_path)
     w,h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -45,39 +97,72 @@ def track_ball(video_path, out_path="outputs/ball_tracking.mp4"):
     prev_gray = cv2.cvtColor(pitch_prev, cv2.COLOR_BGR2GRAY)
 
     ball_pos = None
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # use the SAME ROI as before
-        x1,y1,x2,y2 = roi
-        pitch = frame[y1:y2, x1:x2]
-        gray = cv2.cvtColor(pitch, cv2.COLOR_BGR2GRAY)
-
-        # resize to same size as prev_gray
-        if gray.shape != prev_gray.shape:
-            gray = cv2.resize(gray, (prev_gray.shape[1], prev_gray.shape[0]))
-
-        # optical flow
-        flow = cv2.calcOpticalFlowFarneback(prev_gray, gray,
-                                            None, 0.5, 3, 15, 3, 5, 1.2, 0)
-
-        mag, ang = cv2.cartToPolar(flow[...,0], flow[...,1])
-        motion_mask = (mag > 5).astype(np.uint8)*255
-
-        contours, _ = cv2.findContours(motion_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            c = max(contours, key=cv2.contourArea)
-            (x,y,wc,hc) = cv2.boundingRect(c)
-            cx,cy = x+wc//2, y+hc//2
-            ball_pos = (cx+x1, cy+y1)   # add offset back to full frame
-            cv2.circle(frame, ball_pos, 8, (0,0,255), -1)
-
-        out.write(frame)
-        prev_gray = gray.copy()
-
-    cap.release()
-    out.release()
+    stats = stats if stats is not None else {}
+    stats.update({"decode": 0.0, "compute": 0.0, "write": 0.0, "frames": 0})
+    started = time.perf_counter()
+
+    frames_q = queue.Queue(maxsize=QUEUE_SIZE)
+    write_q = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = {}   # stage -> exception raised in its thread
+    decoder = threading.Thread(target=_decode_stage, args=(cap, frames_q, stats, errors), daemon=True)
+    writer = threading.Thread(target=_write_stage, args=(out, write_q, stats, errors), daemon=True)
+    decoder.start()
+    writer.start()
+
+    try:
+        while True:
+            item = frames_q.get()
+            if item is None or "write" in errors:
+                break
+            idx, frame = item
+            t = time.perf_counter()
+
+            # use the SAME ROI as before
+            x1,y1,x2,y2 = roi
+            pitch = frame[y1:y2, x1:x2]
+            gray = cv2.cvtColor(pitch, cv2.COLOR_BGR2GRAY)
+
+            # resize to same size as prev_gray
+            if gray.shape != prev_gray.shape:
+                gray = cv2.resize(gray, (prev_gray.shape[1], prev_gray.shape[0]))
+
+            # optical flow
+            flow = cv2.calcOpticalFlowFarneback(prev_gray, gray,
+                                                None, 0.5, 3, 15, 3, 5, 1.2, 0)
+
+            mag, ang = cv2.cartToPolar(flow[...,0], flow[...,1])
+            motion_mask = (mag > 5).astype(np.uint8)*255
+
+            contours, _ = cv2.findContours(motion_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if contours:
+                c = max(contours, key=cv2.contourArea)
+                (x,y,wc,hc) = cv2.boundingRect(c)
+                cx,cy = x+wc//2, y+hc//2
+                ball_pos = (cx+x1, cy+y1)   # add offset back to full frame
+                cv2.circle(frame, ball_pos, 8, (0,0,255), -1)
+
+            prev_gray = gray
+            stats["compute"] += time.perf_counter() - t
+            stats["frames"] += 1
+            write_q.put((idx, frame))
+    finally:
+        write_q.put(None)
+        while decoder.is_alive():   # unblock the decoder if compute stopped early
+            try:
+                frames_q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        decoder.join()
+        writer.join()
+        cap.release()
+        out.release()
+    for stage in ("decode", "write"):
+        if stage in errors:
+            raise errors[stage]
+
+    stats["wall"] = time.perf_counter() - started
+    bottleneck = max(("decode", "compute", "write"), key=lambda k: stats[k])
+    print(f"✅ {stats['frames']} frames in {stats['wall']:.1f}s "
+          f"(decode {stats['decode']:.1f}s, compute {stats['compute']:.1f}s, "
+          f"write {stats['write']:.1f}s; bottleneck: {bottleneck})")
     return out_path
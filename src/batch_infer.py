@@ -0,0 +1,145 @@
+import cv2
+import numpy as np
+from .detectors import get_detector
+from .track_store import TRACK_DTYPE, BALL_CLASS
+from .ball_tracker import detect_pitch_area
+from .utils import PITCH_FRAME, scale_pitch
+
+MODEL_NAME = "yolov8n.pt"   # COCO weights; roi_refresh finds the players with them
+BATCH_SIZE = 8
+ROI_PAD = 40   # px (at 640 wide) added around the pitch box so balls at its edge are not cut in half
+
+
+class FrameRing:
+    """
+    Preallocated (slots, H, W, 3) frame buffers. cap.read() decodes straight
+    into a slot, so offline runs don't allocate a new array per frame.
+    """
+    def __init__(self, slots, height, width):
+        self.frames = np.empty((slots, height, width, 3), dtype=np.uint8)
+
+    def fill(self, cap, count):
+        """Decode up to count frames into the ring; returns how many were read."""
+        n = 0
+        while n < min(count, len(self.frames)):
+            slot = self.frames[n]
+            ret, img = cap.read(slot)
+            if not ret:
+                break
+            if img.ctypes.data != slot.ctypes.data:
+                # decoder handed back its own buffer (e.g. size changed mid-stream)
+                slot[:] = img if img.shape == slot.shape else cv2.resize(img, slot.shape[1::-1])
+            n += 1
+        return n
+
+
+def make_tracker(tracker="bytetrack.yaml", frame_rate=30):
+    """A fresh ByteTrack instance, configured the same way model.track() does it."""
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+    from ultralytics.trackers.byte_tracker import BYTETracker
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker)))
+    return BYTETracker(args=cfg, frame_rate=frame_rate)
+
+
+def pitch_roi(pitch, width, height, pad=ROI_PAD):
+    """
+    config.json pitch box {x1, x2, y1, y2} (set for 640x360) scaled to a
+    width x height frame, as a padded (x1, y1, x2, y2) crop inside it.
+    The pad is scaled with the box.
+    """
+    box = scale_pitch(pitch, width, height)
+    pad = int(round(pad * width / PITCH_FRAME[1]))
+    return (max(0, box["x1"] - pad), max(0, box["y1"] - pad),
+            min(width, box["x2"] + pad), min(height, box["y2"] + pad))
+
+
+def to_rows(frame, xyxy, cls, ids=None, conf=None):
+    rows = np.empty(len(xyxy), dtype=TRACK_DTYPE)
+    rows["frame"] = frame
+    rows["id"] = -1 if ids is None else ids
+    rows["cls"] = cls
+    if len(xyxy):
+        rows["x1"], rows["y1"], rows["x2"], rows["y2"] = np.asarray(xyxy, dtype=np.float32).T
+    rows["conf"] = 1.0 if conf is None else conf
+    return rows
+
+
+def batch_track(video_path, batch_size=BATCH_SIZE, start=0, end=None, model_name=MODEL_NAME,
+                classes=(BALL_CLASS,), imgsz=640, conf=0.25, tracker="bytetrack.yaml",
+                roi=None, roi_refresh=None, backend="torch", on_decoded=None):
+    """
+    Offline tracking in batches: decode batch_size frames into a FrameRing,
+    run one batched detector call over them, then feed each frame's boxes
+    through ByteTrack in order. Yields (frame_idx, rows) with TRACK_DTYPE
+    rows for every frame in [start, end) that has tracked boxes.
+
+    With roi=(x1, y1, x2, y2) detection only sees that crop of each frame
+    and boxes are shifted back to full-frame coordinates. roi_refresh=K
+    re-locates the pitch (detect_pitch_area, COCO MODEL_NAME on the same
+    backend) every K frames, starting from the first batch when no roi is given.
+
+    tracker is a ByteTrack config name or an existing tracker instance to
+    continue with (e.g. one restored from a checkpoint). backend picks the
+    detector runtime (see src/detectors.py). on_decoded(next_frame) is called
+    after every batch, once its rows have been consumed, with the index
+    after the last frame decoded and tracked: a safe point to checkpoint at
+    even when no frame of the batch had a box.
+    """
+    detector = get_detector(model_name, backend, imgsz=imgsz)
+    pitch_detector = get_detector(MODEL_NAME, backend, imgsz=imgsz) if roi_refresh else None
+    cap = cv2.VideoCapture(video_path)
+    w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    ring = FrameRing(batch_size, h, w)
+    if isinstance(tracker, str):
+        tracker = make_tracker(tracker, frame_rate=int(round(fps)))
+
+    frame_idx = start
+    last_refresh = None
+    try:
+        while end is None or frame_idx < end:
+            want = batch_size if end is None else min(batch_size, end - frame_idx)
+            n = ring.fill(cap, want)
+            if n == 0:
+                break
+            if roi_refresh and (last_refresh is None or frame_idx - last_refresh >= roi_refresh):
+                _, roi = detect_pitch_area(ring.frames[0], pitch_detector)
+                last_refresh = frame_idx
+            if roi:
+                rx1, ry1, rx2, ry2 = roi
+                batch = [np.ascontiguousarray(f[ry1:ry2, rx1:rx2]) for f in ring.frames[:n]]
+            else:
+                batch = list(ring.frames[:n])
+            results = detector.predict(batch, conf=conf, classes=classes or None)
+            for k, det in enumerate(results):
+                if roi and len(det):
+                    det.data[:, :4] += (rx1, ry1, rx1, ry1)   # back to full-frame coordinates
+                # every frame goes through ByteTrack, empty or not, so lost tracks age as under model.track
+                tracks = tracker.update(det, ring.frames[k])
+                if len(tracks):
+                    # columns: x1, y1, x2, y2, track id, score, cls, det index
+                    yield frame_idx + k, to_rows(frame_idx + k, tracks[:, :4], tracks[:, 6],
+                                                 tracks[:, 4], tracks[:, 5])
+            frame_idx += n
+            if on_decoded:
+                on_decoded(frame_idx)
+    finally:
+        cap.release()
+
+
+def track_video_batched(video_path, writer, batch_size=BATCH_SIZE, progress=None,
+                        progress_every=10, **kwargs):
+    """Run batch_track over a whole video into a TrackWriter; returns the writer."""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+    cap.release()
+    last_report = 0
+    for frame_idx, rows in batch_track(video_path, batch_size=batch_size, **kwargs):
+        writer.add_rows(rows)
+        if progress and frame_idx - last_report >= progress_every:
+            progress(frame_idx + 1, total)
+            last_report = frame_idx
+    return writer
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+CACHE_DIR = os.path.join("outputs", "cache")
+CACHE_QUOTA_MB = 2048
+CHUNK_SIZE = 1 << 20   # hash videos 1 MB at a time, never the whole file in memory
+
+_digests = {}          # (path, size, mtime) -> sha256, so repeat requests skip rehashing
+_digest_lock = threading.Lock()
+
+
+def file_digest(path, chunk_size=CHUNK_SIZE):
+    """sha256 of a file's bytes, streamed in chunks and memoised on (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digests:
+            return _digests[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digests[memo_key] = digest
+    return digest
+
+
+def cache_key(video_path, weights, config=None):
+    """
+    Content address for one analysis: the video bytes, the model weights
+    (file contents when the file is local, else its name) and the config
+    that affects the result.
+    """
+    h = hashlib.sha256()
+    h.update(file_digest(video_path).encode())
+    h.update((file_digest(weights) if os.path.exists(weights) else weights).encode())
+    h.update(json.dumps(config or {}, sort_keys=True).encode())
+    return h.hexdigest()[:32]
+
+
+class ResultCache:
+    """
+    Directory-per-key store of analysis results under a disk quota.
+
+    Each entry holds the rendered artifacts plus a manifest.json with their
+    paths and any JSON data (ball positions, insights). Reads touch the
+    manifest so eviction can drop the least recently used entries first.
+    """
+    def __init__(self, root=CACHE_DIR, quota_mb=CACHE_QUOTA_MB):
+        self.root = root
+        self.quota = quota_mb * 1024 * 1024
+        self.lock = threading.Lock()
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        manifest = os.path.join(self.entry_dir(key), "manifest.json")
+        try:
+            with open(manifest, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(p is None or os.path.exists(p) for p in entry["artifacts"].values()):
+            return None
+        os.utime(manifest)
+        return entry
+
+    def put(self, key, artifacts, data=None):
+        """Move artifacts (name -> path) into the entry for key and record them."""
+        entry_dir = self.entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        stored = {}
+        for name, path in artifacts.items():
+            if path is None or not os.path.exists(path):
+                stored[name] = None
+                continue
+            dest = os.path.join(entry_dir, name + os.path.splitext(path)[1])
+            if os.path.abspath(path) != os.path.abspath(dest):
+                shutil.move(path, dest)
+            stored[name] = dest
+        entry = {"key": key, "created": time.time(), "artifacts": stored, "data": data or {}}
+        tmp = os.path.join(entry_dir, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, os.path.join(entry_dir, "manifest.json"))
+        self.evict(keep=key)
+        return entry
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            entry_dir = self.entry_dir(key)
+            manifest = os.path.join(entry_dir, "manifest.json")
+            used = os.path.getmtime(manifest) if os.path.exists(manifest) else 0
+            size = sum(os.path.getsize(os.path.join(d, f))
+                       for d, _, files in os.walk(entry_dir) for f in files)
+            entries.append((used, size, key))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits its quota."""
+        with self.lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.quota:
+                    break
+                if key == keep:
+                    continue
+                shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+                total -= size
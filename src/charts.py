@@ -0,0 +1,176 @@
+"""
+Headless chart rendering with NumPy + OpenCV.
+
+Every chart is drawn straight into a uint8 image and returned as PNG bytes,
+so nothing touches disk unless the caller writes the bytes (save_png) and
+no matplotlib figure, backend or font cache is ever set up. Polar charts
+follow the old matplotlib layout: 0 degrees at the top, clockwise.
+
+encode_grid() is the data form of a heatmap for clients that draw it
+themselves (static/js/script.js): a uint8 grid quantised to a few levels,
+then run-length or deflate coded.
+"""
+import os
+import zlib
+import base64
+import cv2
+import numpy as np
+
+SIZE = 600                 # px, side of the square polar charts
+WHITE = (255, 255, 255)    # BGR
+GRID = (210, 210, 210)
+INK = (40, 40, 40)
+GREEN = (0, 128, 0)        # matplotlib "green"
+BAR = (180, 119, 31)       # matplotlib default blue
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def png(img):
+    """PNG bytes of a BGR image."""
+    ok, buf = cv2.imencode(".png", img)
+    if not ok:
+        raise ValueError("could not encode chart as PNG")
+    return buf.tobytes()
+
+
+def save_png(data, path):
+    """Write PNG bytes to path (creating its directory); returns path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _text(img, text, center_x, y, scale=0.6, color=INK, thickness=1):
+    (w, _), _ = cv2.getTextSize(text, FONT, scale, thickness)
+    cv2.putText(img, text, (int(center_x - w / 2), int(y)), FONT, scale, color, thickness, cv2.LINE_AA)
+
+
+def _polar_canvas(title, size):
+    """White square with a title, the outer ring and 45 degree spokes; returns (img, centre, radius)."""
+    img = np.full((size, size, 3), 255, dtype=np.uint8)
+    _text(img, title, size / 2, 30, 0.8)
+    c = (size // 2, size // 2 + 15)
+    r = size // 2 - 60
+    for ring in (0.5, 1.0):
+        cv2.circle(img, c, int(r * ring), GRID, 1, cv2.LINE_AA)
+    for deg in range(0, 360, 45):
+        t = np.radians(deg)
+        end = (int(c[0] + r * np.sin(t)), int(c[1] - r * np.cos(t)))
+        cv2.line(img, c, end, GRID, 1, cv2.LINE_AA)
+        _text(img, f"{deg}", c[0] + (r + 22) * np.sin(t), c[1] - (r + 22) * np.cos(t) + 5, 0.45)
+    return img, c, r
+
+
+def wagon_wheel(angles, title="Wagon Wheel", size=SIZE):
+    """Polar scatter of shot angles (radians, matplotlib's polar theta) at equal radius."""
+    img, c, r = _polar_canvas(title, size)
+    angles = np.asarray(angles, dtype=np.float64)
+    layer = img.copy()
+    xs = (c[0] + 0.9 * r * np.sin(angles)).astype(np.int32)
+    ys = (c[1] - 0.9 * r * np.cos(angles)).astype(np.int32)
+    # one dot per distinct pixel; repeats are invisible under the 0.75 alpha anyway
+    for x, y in set(zip(xs.tolist(), ys.tolist())):
+        cv2.circle(layer, (x, y), 4, GREEN, -1, cv2.LINE_AA)
+    return png(cv2.addWeighted(layer, 0.75, img, 0.25, 0))
+
+
+def wagon_counts(counts, title="Wagon Wheel", size=SIZE):
+    """Polar bars of an angle histogram whose bin 0 starts at -180 degrees."""
+    img, c, r = _polar_canvas(title, size)
+    counts = np.asarray(counts, dtype=np.float64)
+    peak = counts.max() if len(counts) else 0
+    width = 360 / max(len(counts), 1)
+    layer = img.copy()
+    for i, n in enumerate(counts):
+        if n <= 0:
+            continue
+        start = -180 + width * i
+        # cv2.ellipse angles run clockwise from its axis; rotating that by -90 puts 0 at the top
+        cv2.ellipse(layer, c, (int(r * n / peak),) * 2, -90, start, start + width, GREEN, -1, cv2.LINE_AA)
+    return png(cv2.addWeighted(layer, 0.75, img, 0.25, 0))
+
+
+def _axes(title, size):
+    """Canvas with a title and left/bottom axes; returns (img, (x0, y0, x1, y1) plot box)."""
+    w, h = size
+    img = np.full((h, w, 3), 255, dtype=np.uint8)
+    _text(img, title, w / 2, 28, 0.7)
+    box = (60, 45, w - 30, h - 45)
+    cv2.line(img, (box[0], box[3]), (box[2], box[3]), INK, 1)
+    cv2.line(img, (box[0], box[1]), (box[0], box[3]), INK, 1)
+    return img, box
+
+
+def histogram(values, bins=12, range=None, title="", size=(500, 500)):
+    """Bar chart of np.histogram(values, bins, range) with min / max tick labels."""
+    counts, edges = np.histogram(np.asarray(values, dtype=np.float64), bins=bins, range=range)
+    img, (x0, y0, x1, y1) = _axes(title, size)
+    peak = counts.max() or 1
+    bw = (x1 - x0) / len(counts)
+    for i, n in enumerate(counts):
+        top = int(y1 - (y1 - y0) * n / peak)
+        cv2.rectangle(img, (int(x0 + i * bw) + 1, top), (int(x0 + (i + 1) * bw) - 1, y1 - 1), BAR, -1)
+    _text(img, f"{edges[0]:g}", x0, y1 + 20, 0.45)
+    _text(img, f"{edges[-1]:g}", x1, y1 + 20, 0.45)
+    _text(img, f"{peak}", x0 - 25, y0 + 10, 0.45)
+    return png(img)
+
+
+def hist2d(xs, ys, bins=(30, 30), title="", size=(400, 600)):
+    """2-D histogram as a viridis grid with a colour bar; y grows downwards, as in the video."""
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    counts, _, _ = np.histogram2d(xs, ys, bins=bins)
+    img, (x0, y0, x1, y1) = _axes(title, size)
+    x1 -= 50   # room for the colour bar
+    peak = counts.max() or 1
+    grid = (counts.T / peak * 255).astype(np.uint8)
+    cells = cv2.resize(cv2.applyColorMap(grid, cv2.COLORMAP_VIRIDIS), (x1 - x0, y1 - y0),
+                       interpolation=cv2.INTER_NEAREST)
+    img[y0:y1, x0:x1] = cells
+    ramp = np.linspace(255, 0, y1 - y0).astype(np.uint8)[:, None].repeat(15, axis=1)
+    img[y0:y1, x1 + 15:x1 + 30] = cv2.applyColorMap(ramp, cv2.COLORMAP_VIRIDIS)
+    _text(img, f"{counts.max():g}", x1 + 22, y0 - 5, 0.4)
+    _text(img, "0", x1 + 22, y1 + 15, 0.4)
+    return png(img)
+
+
+def rle_encode(values):
+    """uint8 array -> bytes of (run length 1..255, value) pairs."""
+    flat = np.asarray(values, dtype=np.uint8).reshape(-1)
+    if not len(flat):
+        return b""
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    lengths = np.diff(np.r_[starts, len(flat)])
+    # runs longer than 255 become several pairs
+    pieces = -(-lengths // 255)
+    run_values = np.repeat(flat[starts], pieces)
+    run_lengths = np.full(pieces.sum(), 255, dtype=np.int64)
+    run_lengths[np.cumsum(pieces) - 1] = lengths - 255 * (pieces - 1)
+    return np.column_stack([run_lengths, run_values]).astype(np.uint8).tobytes()
+
+
+def encode_grid(grid, levels=256):
+    """
+    JSON-ready form of a uint8 grid: width, height and base64 data. Values
+    are first rounded to levels evenly spaced steps (0 and 255 kept), which
+    lengthens runs; the data is then "raw" row-major bytes, "rle" (run
+    length, value pairs) or "deflate" (zlib stream of the raw bytes),
+    whichever is smallest.
+    """
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    if levels < 256:
+        step = 255 / (levels - 1)
+        grid = (np.round(grid / step) * step).round().astype(np.uint8)
+    raw = grid.tobytes()
+    encoding, data = min([("raw", raw), ("rle", rle_encode(grid)), ("deflate", zlib.compress(raw, 6))],
+                         key=lambda c: len(c[1]))
+    return {"width": int(grid.shape[1]), "height": int(grid.shape[0]), "levels": levels,
+            "encoding": encoding, "data": base64.b64encode(data).decode("ascii")}
+
+
+def message(text, size=(500, 400)):
+    """A blank chart with one line of text, for "no data" results."""
+    img = np.full((size[1], size[0], 3), 255, dtype=np.uint8)
+    _text(img, text, size[0] / 2, size[1] / 2, 0.8)
+    return png(img)
@@ -0,0 +1,144 @@
+import os
+import glob
+import json
+import time
+import pickle
+import hashlib
+import cv2
+from .batch_infer import batch_track, make_tracker, BATCH_SIZE
+from .track_store import TrackWriter
+
+CHECKPOINT_EVERY = 300     # frames between checkpoints (~10 s of 30 fps video)
+FINGERPRINT_BYTES = 1 << 20
+GROWING_S = 60             # a video written to this recently may still be recording
+
+
+def video_fingerprint(path, size=None):
+    """
+    Cheap identity of the first size bytes of a video: the size plus the
+    first and last MB before it. A recording that keeps growing still
+    matches the fingerprint taken earlier at its old size.
+    """
+    size = os.path.getsize(path) if size is None else size
+    h = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+        f.seek(max(0, size - FINGERPRINT_BYTES))
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+    return h.hexdigest()
+
+
+def save_checkpoint(store_dir, frame, tracker, writer, video_path, run=None, **extra):
+    """
+    Flush the writer and record that frames [0, frame) are in the store,
+    together with the tracker state to carry on from frame. run describes
+    how they were tracked (model, backend, tracking options); a checkpoint
+    is only resumed by a run with the same description.
+    """
+    writer.flush()
+    tmp = os.path.join(store_dir, "tracker.pkl.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(tracker, f)
+    os.replace(tmp, os.path.join(store_dir, "tracker.pkl"))
+    size = os.path.getsize(video_path)
+    state = {"frame": int(frame), "rows": writer.rows, "chunks": writer.chunks,
+             "video_size": size, "video_fingerprint": video_fingerprint(video_path, size),
+             "run": _plain(run), "saved": time.time(), **extra}
+    tmp = os.path.join(store_dir, "checkpoint.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(store_dir, "checkpoint.json"))
+    return state
+
+
+def _plain(run):
+    """run as it reads back from checkpoint.json (tuples become lists)."""
+    return json.loads(json.dumps(run))
+
+
+def load_checkpoint(store_dir, video_path, run=None):
+    """
+    (state, tracker) of the last checkpoint if it belongs to this video (or
+    to an earlier, shorter version of it) and was tracked the same way
+    (run, see save_checkpoint), else (None, None).
+    """
+    try:
+        with open(os.path.join(store_dir, "checkpoint.json"), "r") as f:
+            state = json.load(f)
+        with open(os.path.join(store_dir, "tracker.pkl"), "rb") as f:
+            tracker = pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        return None, None
+    if os.path.getsize(video_path) < state["video_size"] or \
+            video_fingerprint(video_path, state["video_size"]) != state["video_fingerprint"]:
+        return None, None
+    if state.get("run") != _plain(run):
+        return None, None
+    return state, tracker
+
+
+def clear_checkpoint(store_dir):
+    for name in ("checkpoint.json", "tracker.pkl"):
+        if os.path.exists(os.path.join(store_dir, name)):
+            os.remove(os.path.join(store_dir, name))
+
+
+def still_growing(video_path, size):
+    """True if the video has grown past size or was written in the last GROWING_S seconds."""
+    st = os.stat(video_path)
+    return st.st_size != size or time.time() - st.st_mtime < GROWING_S
+
+
+def resume(store_dir, video_path, run=None):
+    """
+    (writer, start_frame, tracker) to continue a video's track store from
+    its last checkpoint: chunks written after the checkpoint are dropped.
+    Without a usable checkpoint (none, another video, or tracked with a
+    different run) the store starts over: (fresh writer, 0, None).
+    """
+    state, tracker = load_checkpoint(store_dir, video_path, run)
+    if state is None:
+        clear_checkpoint(store_dir)
+        return TrackWriter(store_dir), 0, None
+    for p in sorted(glob.glob(os.path.join(store_dir, "chunk_*.npy")))[state["chunks"]:]:
+        os.remove(p)
+    writer = TrackWriter(store_dir, append=True)
+    writer.chunks, writer.rows = state["chunks"], state["rows"]
+    return writer, state["frame"], tracker
+
+
+def track_resumable(video_path, writer, start=0, tracker=None, batch_size=BATCH_SIZE,
+                    checkpoint_every=CHECKPOINT_EVERY, progress=None, progress_every=10, run=None, **kwargs):
+    """
+    batch_track frames [start, end of video) into writer, saving a checkpoint
+    (tagged with run) every checkpoint_every decoded frames, ball or not, and
+    at the last frame actually decoded (the container's frame count is only
+    an estimate, and wrong for a file still being written).
+    tracker is the ByteTrack state to carry on with (from resume()), or
+    None for a fresh one. The caller clears the final checkpoint once the
+    video is complete (see still_growing); while it is kept, submitting a
+    growing recording again only tracks the new frames. Returns the writer.
+    """
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    cap.release()
+    if tracker is None:
+        tracker = make_tracker(frame_rate=int(round(fps)))
+
+    decoded = {"frame": start, "checkpoint": start, "report": start}
+
+    def on_decoded(next_frame):
+        decoded["frame"] = next_frame
+        if next_frame - decoded["checkpoint"] >= checkpoint_every:
+            save_checkpoint(writer.store_dir, next_frame, tracker, writer, video_path, run)
+            decoded["checkpoint"] = next_frame
+        if progress and next_frame - decoded["report"] >= progress_every:
+            progress(next_frame, total)
+            decoded["report"] = next_frame
+
+    for _, rows in batch_track(video_path, batch_size=batch_size, start=start, tracker=tracker,
+                               on_decoded=on_decoded, **kwargs):
+        writer.add_rows(rows)
+    save_checkpoint(writer.store_dir, decoded["frame"], tracker, writer, video_path, run)
+    return writer
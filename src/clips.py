@@ -0,0 +1,286 @@
+"""
+Short clips (one delivery) cut out of a long match video.
+
+With ffmpeg on the PATH, a plain clip is a "smart cut": everything from
+the first keyframe inside the range is stream-copied, and only the head
+between the requested start and that keyframe (at most one GOP) is
+re-encoded, with the source's codec, profile, level, pixel format and
+timescale. The copied tail keeps its own SPS/PPS in-band (avc3/hev1), so
+the decoder switches parameter sets at the join, and the result is decoded
+once to check its frame count; a join that doesn't decode cleanly is
+replaced by a plain re-encode of the range.
+Keyframe times are probed once per video and cached in the track store.
+
+Clips with overlays, and every clip without ffmpeg, are decoded and
+re-encoded frame by frame, but only for the requested frames: the capture
+seeks to the start, and boxes are drawn from the track store rows of
+that range (src/render.py), not from a full-length annotated video.
+Frames are encoded as H.264 (ffmpeg, else OpenCV's avc1 if it has one)
+so browsers can play them. Audio is dropped; clips are for replaying the ball.
+
+annotated_video() renders the whole video the same way. Tracking no
+longer writes an annotated video, so this is the only place one is made,
+on first request, and it is kept until the tracks change.
+"""
+import os
+import glob
+import json
+import hashlib
+import shutil
+import tempfile
+import subprocess
+import cv2
+import numpy as np
+from .track_store import frame_rows, read_meta
+from .render import Overlay
+
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+KEYFRAMES_FILE = "keyframes.json"
+ENCODERS = {"h264": "libx264", "hevc": "libx265"}   # source codecs a re-encoded head can be joined to
+ANNEXB = {"h264": "h264_mp4toannexb", "hevc": "hevc_mp4toannexb"}   # tail bsf: parameter sets in-band
+INBAND = {"h264": "avc3", "hevc": "hev1"}   # sample entries that let them change mid-stream
+PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high",
+            "High 10": "high10", "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444",
+            "Main 10": "main10"}   # ffprobe profile -> encoder -profile:v
+MAX_CLIP_S = 120      # longer ranges are refused; this is for replays, not exports
+PROGRESS_EVERY = 100  # frames between progress calls while rendering
+
+
+def probe(video_path):
+    """
+    First video stream's codec_name, profile, level, pix_fmt, time_base,
+    width and height as ffprobe reports them, plus fps as a float.
+    """
+    out = subprocess.run(
+        [FFPROBE, "-v", "error", "-select_streams", "v:0", "-of", "json", "-show_entries",
+         "stream=codec_name,profile,level,pix_fmt,avg_frame_rate,time_base,width,height", video_path],
+        check=True, capture_output=True, text=True).stdout
+    stream = json.loads(out)["streams"][0]
+    num, _, den = stream["avg_frame_rate"].partition("/")
+    stream["fps"] = float(num) / float(den or 1)
+    return stream
+
+
+def encode_args(stream):
+    """Encoder options for a head that matches stream (see probe) closely enough to join it."""
+    codec = stream["codec_name"]
+    args = ["-c:v", ENCODERS.get(codec, "libx264"), "-preset", "veryfast", "-crf", "18",
+            "-pix_fmt", stream["pix_fmt"]]
+    profile = PROFILES.get(stream.get("profile"))
+    level = stream.get("level")
+    if profile and codec in ENCODERS:
+        args += ["-profile:v", profile]
+    if level and level > 0:
+        if codec == "h264":
+            args += ["-level:v", f"{level / 10:.1f}"]
+        elif codec == "hevc":
+            args += ["-x265-params", f"level-idc={level / 30:.1f}:log-level=error"]
+    return args
+
+
+def frame_count(path):
+    """Frames that decode from path, or None if ffprobe reports a decoding error."""
+    proc = subprocess.run(
+        [FFPROBE, "-v", "error", "-count_frames", "-select_streams", "v:0", "-of", "csv=p=0",
+         "-show_entries", "stream=nb_read_frames", path], capture_output=True, text=True)
+    if proc.returncode or proc.stderr.strip():
+        return None
+    return int(proc.stdout.strip() or 0)
+
+
+def keyframes(video_path, store_dir=None):
+    """
+    Sorted keyframe times (s) of the video. Reads packet flags only (no
+    decoding); the result is cached in store_dir, keyed by size and mtime.
+    """
+    st = os.stat(video_path)
+    cache = os.path.join(store_dir, KEYFRAMES_FILE) if store_dir else None
+    if cache and os.path.exists(cache):
+        with open(cache, "r") as f:
+            data = json.load(f)
+        if data["size"] == st.st_size and data["mtime"] == st.st_mtime:
+            return np.array(data["times"])
+
+    out = subprocess.run(
+        [FFPROBE, "-v", "error", "-select_streams", "v:0", "-of", "csv=p=0",
+         "-show_entries", "packet=pts_time,flags", video_path],
+        check=True, capture_output=True, text=True).stdout
+    times = sorted(float(line.split(",")[0]) for line in out.splitlines()
+                   if "K" in line.split(",")[-1] and line.split(",")[0] not in ("", "N/A"))
+    if cache:
+        os.makedirs(store_dir, exist_ok=True)
+        with open(cache, "w") as f:
+            json.dump({"size": st.st_size, "mtime": st.st_mtime, "times": times}, f)
+    return np.array(times)
+
+
+def _ffmpeg(*args):
+    subprocess.run([FFMPEG, "-v", "error", "-y", *args], check=True)
+
+
+def smart_cut(video_path, start, end, out_path, store_dir=None):
+    """Frames start..end re-encoding only up to the first keyframe after start; returns out_path."""
+    stream = probe(video_path)
+    fps, codec = stream["fps"], stream["codec_name"]
+    times = keyframes(video_path, store_dir)
+    frames = np.round(times * fps).astype(int)
+    later = frames[(frames >= start) & (frames <= end)]
+    encode = encode_args(stream)
+    timescale = stream["time_base"].partition("/")[2]
+    mp4 = ["-movflags", "+faststart"] + (["-video_track_timescale", timescale] if timescale else [])
+
+    def part(first, count, codec_args, path):
+        _ffmpeg("-ss", f"{first / fps:.3f}", "-i", video_path, "-frames:v", str(count),
+                "-an", *codec_args, *mp4, path)
+
+    if not len(later) or codec not in ENCODERS:
+        # no keyframe inside the range (or a codec we can't match): the clip is all head
+        part(start, end - start + 1, encode, out_path)
+        return out_path
+    k = int(later[0])
+    if k == start:
+        part(k, end - k + 1, ["-c", "copy", "-avoid_negative_ts", "make_zero"], out_path)
+        return out_path
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(out_path) or ".") as tmp:
+        head, tail = os.path.join(tmp, "head.mp4"), os.path.join(tmp, "tail.mp4")
+        part(start, k - start, encode, head)
+        # the output keeps the head's parameter sets in its sample entry; the tail carries its own
+        part(k, end - k + 1, ["-c", "copy", "-bsf:v", ANNEXB[codec]], tail)
+        parts = os.path.join(tmp, "parts.txt")
+        with open(parts, "w") as f:
+            f.write(f"file '{head}'\nfile '{tail}'\n")
+        _ffmpeg("-f", "concat", "-safe", "0", "-i", parts, "-c", "copy", "-tag:v", INBAND[codec],
+                *mp4, out_path)
+    if frame_count(out_path) != end - start + 1:
+        print(f"⚠️ Smart cut of frames {start}-{end} did not decode cleanly; re-encoding the clip")
+        part(start, end - start + 1, encode, out_path)
+    return out_path
+
+
+class H264Writer:
+    """cv2.VideoWriter-like sink that pipes BGR frames into ffmpeg's libx264 (yuv420p, faststart)."""
+    def __init__(self, path, fps, size):
+        w, h = size
+        self.proc = subprocess.Popen(
+            [FFMPEG, "-v", "error", "-y", "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}",
+             "-r", f"{fps}", "-i", "-", "-an", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+             "-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-pix_fmt", "yuv420p",
+             "-movflags", "+faststart", path], stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def release(self):
+        self.proc.stdin.close()
+        if self.proc.wait():
+            raise subprocess.CalledProcessError(self.proc.returncode, FFMPEG)
+
+
+def video_writer(path, fps, size):
+    """An H.264 MP4 writer: ffmpeg if installed, else OpenCV (avc1 if its build has it, else mp4v)."""
+    if FFMPEG:
+        return H264Writer(path, fps, size)
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'avc1'), fps, size)
+    if not out.isOpened():
+        print("⚠️ No H.264 encoder (install ffmpeg); writing MPEG-4 Part 2, which browsers may not play")
+        out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    return out
+
+
+def render_clip(video_path, start, end, out_path, overlay=None, progress=None):
+    """Decode frames start..end (seeking straight to start), draw overlay(frame, n) on each, encode."""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    out = video_writer(out_path, fps, (w, h))
+    n = start
+    try:
+        while end is None or n <= end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            out.write(overlay(frame, n) if overlay else frame)
+            n += 1
+            if progress and (n - start) % PROGRESS_EVERY == 0:
+                progress(n - start, None if end is None else end - start + 1)
+    finally:
+        cap.release()
+        out.release()
+    return out_path
+
+
+def _temp_path(out_path):
+    """A new, unique file next to out_path, so concurrent renders of it never share a temp file."""
+    fd, tmp_path = tempfile.mkstemp(suffix=".part.mp4", dir=os.path.dirname(out_path) or ".")
+    os.close(fd)
+    return tmp_path
+
+
+def _publish(tmp_path, out_path, render):
+    """Run render(tmp_path), then move the result into place; the temp file never outlives a failure."""
+    try:
+        render(tmp_path)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+def tracks_tag(store_dir):
+    """Short id of a track store's contents; overlays rendered from other tracks don't match it."""
+    meta = read_meta(store_dir)
+    key = json.dumps([meta.get(k) for k in ("video_digest", "rows", "model", "backend")])
+    return hashlib.sha1(key.encode()).hexdigest()[:10]
+
+
+def clip_path(out_dir, start, end, tag=None):
+    return os.path.join(out_dir, "clips", f"{start}_{end}{'_' + tag if tag else ''}.mp4")
+
+
+def extract_clip(video_path, start, end, out_dir, store_dir=None, overlay=False):
+    """
+    Clip of frames start..end (inclusive) under out_dir/clips/, reused if it
+    already exists. overlay draws the track store's boxes for that range.
+    """
+    out_path = clip_path(out_dir, start, end, tracks_tag(store_dir) if overlay and store_dir else None)
+    if os.path.exists(out_path):
+        return out_path
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    if overlay:
+        rows = frame_rows(store_dir, start, end) if store_dir else None
+        draw = Overlay(rows) if rows is not None and len(rows) else None
+        render = lambda tmp: render_clip(video_path, start, end, tmp, draw)
+    elif FFMPEG and FFPROBE:
+        render = lambda tmp: smart_cut(video_path, start, end, tmp, store_dir)
+    else:
+        render = lambda tmp: render_clip(video_path, start, end, tmp)
+    return _publish(_temp_path(out_path), out_path, render)
+
+
+def annotated_path(out_dir, store_dir):
+    return os.path.join(out_dir, f"annotated_{tracks_tag(store_dir)}.mp4")
+
+
+def annotated_video(video_path, out_dir, store_dir, progress=None):
+    """
+    The full video with the stored tracks drawn on, rendered on first
+    request into out_dir and reused until the tracks change.
+    """
+    out_path = annotated_path(out_dir, store_dir)
+    if os.path.exists(out_path):
+        return out_path
+    for old in glob.glob(os.path.join(out_dir, "annotated_*.mp4")):
+        if not old.endswith(".part.mp4"):
+            os.remove(old)   # drawn from tracks that have since been replaced
+    os.makedirs(out_dir, exist_ok=True)
+    rows = frame_rows(store_dir, 0, np.iinfo(np.int32).max)
+    count = read_meta(store_dir).get("frame_count")
+    return _publish(_temp_path(out_path), out_path,
+                    lambda tmp: render_clip(video_path, 0, count - 1 if count else None, tmp,
+                                            Overlay(rows) if len(rows) else None, progress))
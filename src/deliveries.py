@@ -0,0 +1,86 @@
+"""
+Per-delivery index over a track store.
+
+A session's ball sightings are cut into deliveries wherever the ball is
+unseen for longer than GAP_S, or lies still (dead ball) for STILL_S, by the
+same rule trajectory.fit_session uses (trajectory.delivery_ranges). Each
+delivery records its frame window (with run-up pre-roll), the row range
+of the store it covers, and the bounce / length / swing from one batched
+trajectory fit. The index is saved as deliveries.json in the store, so
+charts and clip exports can go straight to one delivery.
+"""
+import os
+import json
+import numpy as np
+from .track_store import load_tracks, read_meta, read_rows, ball_points, BALL_CLASS
+from .trajectory import fit, delivery_ranges
+from .analyzer import classify_length
+
+INDEX_FILE = "deliveries.json"
+INDEX_VERSION = 2   # bumped when entries gain fields, so older indexes are rebuilt
+GAP_S = 0.5         # ball unseen this long ends a delivery
+STILL_S = 1.0       # ball barely moving this long is a dead ball
+PREROLL_S = 3.0     # run-up kept before the first sighting
+POSTROLL_S = 1.0    # kept after the last sighting
+
+
+def build_index(store_dir, cls=BALL_CLASS):
+    """Segment a store's ball track into deliveries and save deliveries.json."""
+    meta = read_meta(store_dir)
+    fps = meta.get("fps") or 30
+    height = meta.get("height")
+    last_frame = max(meta.get("frame_count", 0) - 1, 0)
+    tracks = load_tracks(store_dir)
+    frames, xs, ys = ball_points(tracks, cls=cls)
+    order = np.argsort(frames, kind="stable")
+    frames, xs, ys = frames[order], xs[order], ys[order]
+
+    ranges = delivery_ranges(frames, xs, ys, gap=GAP_S * fps, dead=STILL_S * fps)
+    fits = fit([(frames[a:b], xs[a:b], ys[a:b]) for a, b in ranges])
+    preroll, postroll = int(PREROLL_S * fps), int(POSTROLL_S * fps)
+    deliveries = []
+    for n, ((a, b), f) in enumerate(zip(ranges, fits)):
+        first, last = int(frames[a]), int(frames[b - 1])
+        start = max(0, first - preroll)
+        end = min(last + postroll, last_frame) if last_frame else last + postroll
+        rows = np.searchsorted(tracks["frame"], [start, end + 1])
+        deliveries.append({
+            "n": n, "start": start, "end": end,
+            "start_s": round(start / fps, 3), "end_s": round((end + 1) / fps, 3),
+            "first_ball": first, "last_ball": last, "points": b - a,
+            "origin": [round(float(xs[a]), 1), round(float(ys[a]), 1)],
+            "rows": [int(rows[0]), int(rows[1])],
+            "bounce": f["bounce"],
+            "length": classify_length(f["bounce"][2], height) if f["bounce"] and height else None,
+            "swing_px": round(f["swing_px"], 1),
+            "deviation_deg": None if np.isnan(f["deviation_deg"]) else round(f["deviation_deg"], 1),
+        })
+
+    index = {"version": INDEX_VERSION, "rows": meta.get("rows", len(tracks)), "video_digest": meta.get("video_digest"),
+             "fps": fps, "deliveries": deliveries}
+    tmp = os.path.join(store_dir, INDEX_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, os.path.join(store_dir, INDEX_FILE))
+    return index
+
+
+def load_index(store_dir, cls=BALL_CLASS):
+    """The store's delivery index, rebuilt when the tracks changed since it was written."""
+    meta = read_meta(store_dir)
+    try:
+        with open(os.path.join(store_dir, INDEX_FILE), "r") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index["rows"] == meta.get("rows") \
+                and index["video_digest"] == meta.get("video_digest"):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_index(store_dir, cls=cls)
+
+
+def delivery_tracks(store_dir, n, index=None):
+    """Track rows of delivery n, read straight from the chunks that hold them."""
+    index = index or load_index(store_dir)
+    start, end = index["deliveries"][n]["rows"]
+    return read_rows(store_dir, start, end)
@@ -0,0 +1,183 @@
+"""
+Detector backends behind one predict() call:
+
+    torch        ultralytics / PyTorch (the default; also what model.track uses)
+    onnxruntime  the ONNX export from modelSave.py / model.export(format="onnx")
+    openvino     the OpenVINO export (model.export(format="openvino"))
+
+Every backend returns one Detections per frame with the same columns as
+ultralytics' Boxes.cpu().numpy(), so ByteTrack, the track store and the
+ROI shifting code work unchanged whichever one is configured
+(config.json "detector.backend").
+"""
+import os
+import threading
+import cv2
+import numpy as np
+
+BACKENDS = ("torch", "onnxruntime", "openvino")
+IOU = 0.7           # NMS IoU, ultralytics' predict default
+MAX_DET = 300
+PAD_VALUE = 114     # letterbox grey, as in ultralytics
+
+_detectors = {}     # (weights, backend, imgsz) -> detector
+_lock = threading.Lock()
+
+
+class Detections:
+    """(N, 6) float32 boxes of one frame: x1, y1, x2, y2, conf, cls."""
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def xywh(self):
+        xyxy = self.data[:, :4]
+        return np.concatenate([(xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
+    def __len__(self):
+        return len(self.data)
+
+
+def export_path(weights, backend):
+    """Where ultralytics' exporter puts a backend's model for a .pt file."""
+    base, ext = os.path.splitext(weights)
+    if ext != ".pt" or backend == "torch":
+        return weights
+    if backend == "onnxruntime":
+        return base + ".onnx"
+    return os.path.join(base + "_openvino_model", os.path.basename(base) + ".xml")
+
+
+def letterbox(frame, size):
+    """Resize keeping aspect ratio and pad to size x size; returns (NCHW float blob, scale, (pad_x, pad_y))."""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+    canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+    canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0   # BGR -> RGB, HWC -> NCHW
+    return np.ascontiguousarray(blob), scale, (pad_x, pad_y)
+
+
+def decode(output, scale, pad, shape, conf=0.25, classes=None, iou=IOU, max_det=MAX_DET):
+    """
+    YOLOv8 head output (4 + num_classes, anchors) for one image -> Detections
+    in original frame coordinates, after confidence filter and per-class NMS.
+    """
+    pred = output.T
+    scores = pred[:, 4:]
+    cls = scores.argmax(axis=1)
+    best = scores[np.arange(len(scores)), cls]
+    keep = best >= conf
+    if classes is not None:
+        keep &= np.isin(cls, classes)
+    pred, cls, best = pred[keep], cls[keep], best[keep]
+    if len(pred) == 0:
+        return Detections(np.empty((0, 6)))
+
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    boxes = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    idx = cv2.dnn.NMSBoxesBatched(boxes.tolist(), best.tolist(), cls.tolist(), conf, iou)
+    idx = np.asarray(idx, dtype=np.intp).reshape(-1)[:max_det]
+
+    xyxy = np.concatenate([boxes[idx, :2], boxes[idx, :2] + boxes[idx, 2:]], axis=1)
+    xyxy -= (pad[0], pad[1], pad[0], pad[1])
+    xyxy /= scale
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, shape[1])
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, shape[0])
+    return Detections(np.column_stack([xyxy, best[idx], cls[idx]]))
+
+
+class TorchDetector:
+    backend = "torch"
+
+    def __init__(self, weights, imgsz=640):
+        from .models import get_model
+        self.model = get_model(weights, imgsz=imgsz)
+        self.imgsz = imgsz
+
+    def predict(self, frames, conf=0.25, classes=None):
+        results = self.model.predict(list(frames), imgsz=self.imgsz, conf=conf,
+                                     classes=list(classes) if classes is not None else None, verbose=False)
+        return [Detections(r.boxes.cpu().numpy().data[:, :6]) for r in results]
+
+
+class _ExportedDetector:
+    """Shared letterbox -> run -> decode loop for the exported (non-torch) models."""
+    def __init__(self, imgsz):
+        self.imgsz = imgsz
+        self.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8)[None])   # warm-up
+
+    def predict(self, frames, conf=0.25, classes=None):
+        out = []
+        classes = list(classes) if classes is not None else None
+        for frame in frames:
+            blob, scale, pad = letterbox(frame, self.imgsz)
+            out.append(decode(self._run(blob)[0], scale, pad, frame.shape, conf, classes))
+        return out
+
+
+class OnnxDetector(_ExportedDetector):
+    backend = "onnxruntime"
+
+    def __init__(self, weights, imgsz=640):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(weights, opts, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0].name
+        super().__init__(imgsz)
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input: blob})[0]
+
+
+class OpenVINODetector(_ExportedDetector):
+    backend = "openvino"
+
+    def __init__(self, weights, imgsz=640):
+        import openvino as ov
+        self.model = ov.Core().compile_model(weights, "CPU")
+        self.output = self.model.output(0)
+        super().__init__(imgsz)
+
+    def _run(self, blob):
+        return self.model(blob)[self.output]
+
+
+_CLASSES = {"torch": TorchDetector, "onnxruntime": OnnxDetector, "openvino": OpenVINODetector}
+
+
+def get_detector(weights="yolov8n.pt", backend="torch", imgsz=640):
+    """
+    Shared detector for these weights on the given backend. For onnxruntime
+    and openvino a .pt path is mapped to its export next to it (best.pt ->
+    best.onnx / best_openvino_model/best.xml); export it first with
+    model.export(format=...).
+    """
+    if backend not in _CLASSES:
+        raise ValueError(f"unknown detector backend {backend!r}, expected one of {BACKENDS}")
+    path = export_path(weights, backend)
+    if backend == "torch":
+        return TorchDetector(path, imgsz=imgsz)   # src.models already shares the model
+    key = (path, backend, imgsz)
+    with _lock:
+        if key not in _detectors:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found; export {weights} with format="
+                                        f"{'onnx' if backend == 'onnxruntime' else backend} first")
+            _detectors[key] = _CLASSES[backend](path, imgsz=imgsz)
+        return _detectors[key]
@@ -0,0 +1,162 @@
+import os
+import cv2
+import numpy as np
+
+BLUR = 51            # Gaussian kernel used for the pitch heatmap
+PYRAMID_LEVELS = 5   # level k is the count grid summed over 2^k x 2^k pixel blocks
+TILE_SIZE = 256      # default width/height of a rendered heatmap view
+
+
+class HeatmapAccumulator:
+    """
+    Per-pixel ball counts for one frame size. Points are binned with
+    np.bincount / np.add.at, and the grid can be saved and loaded again so a
+    new session's points are added on top of a season without recounting.
+    """
+    def __init__(self, shape):
+        self.counts = np.zeros(shape, dtype=np.uint32)
+
+    @property
+    def shape(self):
+        return self.counts.shape
+
+    def add(self, xs, ys):
+        """Count points at pixel (int(x), int(y)); points outside the frame are ignored."""
+        h, w = self.counts.shape
+        ix = np.asarray(xs).astype(np.intp)
+        iy = np.asarray(ys).astype(np.intp)
+        ok = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+        flat = iy[ok] * w + ix[ok]
+        if len(flat) > self.counts.size // 16:
+            # dense: one pass over the whole grid beats scattered increments
+            self.counts += np.bincount(flat, minlength=self.counts.size).reshape(h, w).astype(np.uint32)
+        else:
+            np.add.at(self.counts.reshape(-1), flat, 1)
+        return int(ok.sum())
+
+    def merge(self, other):
+        if other.shape != self.shape:
+            raise ValueError(f"heatmap shapes differ: {other.shape} vs {self.shape}")
+        self.counts += other.counts
+
+    def total(self):
+        return int(self.counts.sum())
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npy"
+        np.save(tmp, self.counts)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path, shape=None):
+        """Load a saved grid, or start an empty one of shape if there is none yet."""
+        if os.path.exists(path):
+            acc = cls.__new__(cls)
+            acc.counts = np.load(path).astype(np.uint32)
+            if shape is not None and tuple(shape) != acc.shape:
+                raise ValueError(f"{path} holds a {acc.shape} heatmap, not {tuple(shape)}")
+            return acc
+        if shape is None:
+            raise FileNotFoundError(path)
+        return cls(shape)
+
+
+class HeatmapPyramid:
+    """
+    A count grid pre-aggregated at several resolutions (a mip pyramid of
+    sums), plus the peak of each level after blurring. Any view of the
+    heatmap is rendered from the coarsest level that still has a cell per
+    output pixel, with the blur scaled to that level, so zooming never
+    blurs the full-resolution grid again.
+    """
+    def __init__(self, levels, peaks):
+        self.levels = levels
+        self.peaks = peaks
+
+    @classmethod
+    def from_counts(cls, counts, levels=PYRAMID_LEVELS, blur=BLUR):
+        grids = [counts.astype(np.uint32)]
+        for _ in range(1, levels):
+            g = grids[-1]
+            h, w = (g.shape[0] + 1) // 2 * 2, (g.shape[1] + 1) // 2 * 2
+            g = np.pad(g, ((0, h - g.shape[0]), (0, w - g.shape[1])))
+            grids.append(g.reshape(h // 2, 2, w // 2, 2).sum(axis=(1, 3), dtype=np.uint32))
+        peaks = [float(_blur(g, blur, k).max()) for k, g in enumerate(grids)]
+        return cls(grids, peaks)
+
+    @property
+    def shape(self):
+        return self.levels[0].shape
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, peaks=np.array(self.peaks), **{f"level{k}": g for k, g in enumerate(self.levels)})
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            levels = [data[f"level{k}"] for k in range(len(data["peaks"]))]
+            return cls(levels, list(data["peaks"]))
+
+    def level_for(self, region_w, region_h, out_w, out_h):
+        """Coarsest level with at least one cell per output pixel over the region."""
+        k = 0
+        while k + 1 < len(self.levels) and region_w >> (k + 1) >= out_w and region_h >> (k + 1) >= out_h:
+            k += 1
+        return k
+
+    def render(self, x0=0, y0=0, x1=None, y1=None, size=(TILE_SIZE, TILE_SIZE), blur=BLUR):
+        """
+        Colour image (size = (width, height)) of the region [x0, x1) x [y0, y1)
+        in full-resolution pixels, normalised to the whole heatmap's peak so
+        neighbouring views share one colour scale.
+        """
+        return cv2.applyColorMap(self.values(x0, y0, x1, y1, size, blur), cv2.COLORMAP_JET)
+
+    def values(self, x0=0, y0=0, x1=None, y1=None, size=(TILE_SIZE, TILE_SIZE), blur=BLUR):
+        """The uint8 intensities (0 = nothing, 255 = the peak) behind render(), for clients that colour them."""
+        H, W = self.shape
+        x1, y1 = W if x1 is None else x1, H if y1 is None else y1
+        k = self.level_for(x1 - x0, y1 - y0, *size)
+        grid = self.levels[k]
+        # crop with a margin of half the kernel so the blur sees the neighbours of edge cells
+        kb = _kernel(blur, k)
+        m = kb // 2
+        cx0, cy0 = (x0 >> k) - m, (y0 >> k) - m
+        cx1, cy1 = -(-x1 >> k) + m, -(-y1 >> k) + m
+        crop = grid[max(cy0, 0):max(cy1, 0), max(cx0, 0):max(cx1, 0)]
+        crop = np.pad(crop, ((max(-cy0, 0), max(cy1 - grid.shape[0], 0)),
+                             (max(-cx0, 0), max(cx1 - grid.shape[1], 0))))
+        heat = _blur(crop, blur, k)
+        # back to the exact region (sub-cell offsets included), then up to the output size
+        scale = float(1 << k)
+        fx0, fy0 = x0 / scale - cx0, y0 / scale - cy0
+        fx1, fy1 = x1 / scale - cx0, y1 / scale - cy0
+        M = np.float32([[(fx1 - fx0) / size[0], 0, fx0], [0, (fy1 - fy0) / size[1], fy0]])
+        heat = cv2.warpAffine(heat, M, size, flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP)
+        peak = self.peaks[k]
+        return np.clip(heat / peak * 255, 0, 255).astype(np.uint8) if peak > 0 else heat.astype(np.uint8)
+
+
+def _kernel(blur, level):
+    """The blur kernel (odd, >= 1) that covers the same area at a pyramid level."""
+    return max(1, int(blur / (1 << level)) // 2 * 2 + 1)
+
+
+def _blur(grid, blur, level):
+    k = _kernel(blur, level)
+    grid = grid.astype(np.float32)
+    return cv2.GaussianBlur(grid, (k, k), 0) if k > 1 else grid
+
+
+def render_heatmap(counts, blur=BLUR):
+    """Blurred, normalised JET colour image of a count grid."""
+    heatmap = cv2.GaussianBlur(counts.astype(np.float32), (blur, blur), 0)
+    peak = heatmap.max()
+    heatmap = (heatmap / peak * 255).astype(np.uint8) if peak > 0 else heatmap.astype(np.uint8)
+    return cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
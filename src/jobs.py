@@ -0,0 +1,159 @@
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_WORKERS = 2     # analyses running at once (each one holds a YOLO model)
+MAX_QUEUE = 8       # analyses allowed to wait for a free worker
+KEEP_FINISHED = 100 # finished jobs remembered for /jobs/<id>
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when every worker is busy and the queue is full."""
+
+
+class _Progress:
+    """
+    Progress hook handed to job functions in the worker process.
+    Call it as progress(done, total, **info); it is picklable so it can
+    cross the process boundary, and writes into a Manager dict the web
+    process reads from.
+    """
+    def __init__(self, job_id, shared):
+        self.job_id = job_id
+        self.shared = shared
+
+    def __call__(self, done, total=None, **info):
+        state = dict(self.shared.get(self.job_id, {}))
+        state.update(info)
+        state["done"] = int(done)
+        if total:
+            state["total"] = int(total)
+        elapsed = time.time() - state.get("started", time.time())
+        if elapsed > 0 and done:
+            state["fps"] = round(done / elapsed, 1)
+            if state.get("total"):
+                state["eta"] = round((state["total"] - done) / state["fps"], 1)
+        self.shared[self.job_id] = state
+
+
+def _init_worker(preload, initializer):
+    if preload:
+        preload()
+    if initializer:
+        initializer()
+
+
+def _run_job(fn, job_id, shared, args, kwargs):
+    progress = _Progress(job_id, shared)
+    shared[job_id] = {"started": time.time(), "done": 0, "total": None}
+    return fn(*args, progress=progress, **kwargs)
+
+
+class JobQueue:
+    """
+    Bounded process pool for long-running analyses.
+
+    submit() returns a job id straight away and raises QueueFull once
+    max_workers jobs are running and max_queue more are waiting, so the
+    caller can answer with HTTP 429 instead of piling work onto the box.
+    Job functions are called as fn(*args, progress=hook, **kwargs) and
+    must be importable module-level functions returning something picklable.
+    preload, if given, runs in each worker as it starts (before initializer),
+    so loading e.g. YOLO weights never holds up a request thread; it must be
+    picklable (a module-level function or functools.partial of one).
+    If a worker dies, the pool is broken: every job still in it is marked
+    failed and the next submit starts a fresh pool.
+    """
+    def __init__(self, max_workers=MAX_WORKERS, max_queue=MAX_QUEUE, initializer=None, preload=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.preload = preload
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pool = None
+        self.manager = None
+        self.progress = None
+
+    def _ensure_pool(self):
+        if self.pool is not None:
+            return
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        if self.manager is None:
+            self.manager = ctx.Manager()
+            self.progress = self.manager.dict()
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx,
+                                        initializer=_init_worker, initargs=(self.preload, self.initializer))
+
+    def pending(self):
+        return sum(1 for j in self.jobs.values() if j["state"] in ("queued", "running"))
+
+    def submit(self, fn, *args, kind=None, **kwargs):
+        with self.lock:
+            if self.pending() >= self.max_workers + self.max_queue:
+                raise QueueFull(f"{self.pending()} jobs already queued or running")
+            self._ensure_pool()
+            self._prune()
+            job_id = uuid.uuid4().hex[:12]
+            self.jobs[job_id] = {"id": job_id, "kind": kind or fn.__name__, "state": "queued",
+                                 "submitted": time.time(), "finished": None,
+                                 "result": None, "error": None}
+            try:
+                future = self.pool.submit(_run_job, fn, job_id, self.progress, args, kwargs)
+            except BrokenProcessPool:
+                # a worker died since the last submit and its jobs' callbacks haven't run yet
+                self.pool = None
+                self._ensure_pool()
+                future = self.pool.submit(_run_job, fn, job_id, self.progress, args, kwargs)
+            pool = self.pool
+        future.add_done_callback(lambda f: self._finish(job_id, f, pool))
+        return job_id
+
+    def _finish(self, job_id, future, pool=None):
+        with self.lock:
+            job = self.jobs[job_id]
+            job["finished"] = time.time()
+            try:
+                job["result"] = future.result()
+                job["state"] = "done"
+            except BrokenProcessPool:
+                job["error"] = "a worker process died; run the analysis again"
+                job["state"] = "failed"
+                if pool is not None and self.pool is pool:
+                    self.pool = None   # the next submit starts a fresh pool
+                    pool.shutdown(wait=False)
+            except Exception as e:
+                job["error"] = str(e)
+                job["state"] = "failed"
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j["finished"] is not None]
+        finished.sort(key=lambda j: j["finished"])
+        for job in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            self.jobs.pop(job["id"], None)
+            self.progress.pop(job["id"], None)
+
+    def status(self, job_id):
+        """Return a JSON-friendly snapshot of a job, or None if unknown."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        progress = dict(self.progress.get(job_id, {})) if self.progress is not None else {}
+        if job["state"] == "queued" and progress:
+            job["state"] = "running"
+        job["progress"] = {k: progress.get(k) for k in ("done", "total", "fps", "eta")}
+        job["progress"]["done"] = job["progress"]["done"] or 0
+        job["info"] = {k: v for k, v in progress.items() if k not in job["progress"]}
+        return job
+
+    def shutdown(self, wait=True):
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait, cancel_futures=True)
+            self.manager.shutdown()
+            self.pool = None
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+
+class BallKalman:
+    """
+    Constant-acceleration Kalman filter on the ball centre.
+    State is (x, y, vx, vy, ax, ay) in pixels and frames; only (x, y) is measured.
+    """
+    def __init__(self, process_noise=1e-2, measurement_noise=4.0):
+        kf = cv2.KalmanFilter(6, 2)
+        kf.measurementMatrix = np.array([[1, 0, 0, 0, 0, 0],
+                                         [0, 1, 0, 0, 0, 0]], dtype=np.float32)
+        kf.processNoiseCov = np.eye(6, dtype=np.float32) * process_noise
+        kf.measurementNoiseCov = np.eye(2, dtype=np.float32) * measurement_noise
+        self.kf = kf
+        self.initialized = False
+        self.last_frame = None
+
+    def _transition(self, dt):
+        half = 0.5 * dt * dt
+        self.kf.transitionMatrix = np.array([
+            [1, 0, dt, 0, half, 0],
+            [0, 1, 0, dt, 0, half],
+            [0, 0, 1, 0, dt, 0],
+            [0, 0, 0, 1, 0, dt],
+            [0, 0, 0, 0, 1, 0],
+            [0, 0, 0, 0, 0, 1],
+        ], dtype=np.float32)
+
+    def update(self, frame_idx, x, y):
+        """Feed a detected ball centre seen at frame_idx."""
+        z = np.array([[x], [y]], dtype=np.float32)
+        if not self.initialized:
+            self.kf.statePost = np.array([[x], [y], [0], [0], [0], [0]], dtype=np.float32)
+            self.kf.errorCovPost = np.eye(6, dtype=np.float32) * 100
+            self.initialized = True
+        else:
+            self._transition(frame_idx - self.last_frame)
+            self.kf.predict()
+            self.kf.correct(z)
+        self.last_frame = frame_idx
+
+    def predict(self, frame_idx):
+        """Estimated (x, y) at frame_idx without changing the filter state."""
+        if not self.initialized:
+            return None
+        dt = frame_idx - self.last_frame
+        s = self.kf.statePost.ravel()
+        return (float(s[0] + s[2] * dt + 0.5 * s[4] * dt * dt),
+                float(s[1] + s[3] * dt + 0.5 * s[5] * dt * dt))
+
+    def reset(self):
+        self.initialized = False
+        self.last_frame = None
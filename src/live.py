@@ -0,0 +1,183 @@
+"""
+Live analysis over a camera / RTSP feed (or a file replayed at its native
+FPS, which stands in for a camera in tests):
+
+    python -m src.live rtsp://camera/stream
+    python -m src.live data/sample.mp4 --model "Ball Trajectory Prediction/runs/detect/train5/weights/best.pt"
+
+The detector always gets the newest frame; frames that arrive while it is
+busy are dropped rather than queued, so latency stays bounded when
+inference can't keep up.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+import cv2
+import numpy as np
+from .models import get_model
+from .track_store import BALL_CLASS
+from . import trajectory
+
+MODEL_NAME = "yolov8n.pt"
+HISTORY = 40        # centroids kept for the trajectory fit (about one delivery)
+FUTURE_STEPS = 4    # frames of predicted path published with each event
+LATENCY_WINDOW = 9000   # latest latencies kept for summary() (5 min at 30 fps), so a long feed stays bounded
+
+
+class LatestFrameReader(threading.Thread):
+    """
+    Reads a capture source on its own thread and keeps only the newest frame.
+    Files are replayed at their native FPS (like a camera would deliver
+    them) unless realtime=False. get() returns (frame_idx, frame, capture_ts)
+    and counts every frame that was overwritten before anyone took it.
+    """
+    def __init__(self, source, realtime=None):
+        super().__init__(daemon=True)
+        self.cap = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+        self.realtime = os.path.isfile(str(source)) if realtime is None else realtime
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self.cond = threading.Condition()
+        self.latest = None
+        self.ended = False
+        self.stopped = False
+        self.captured = 0
+        self.dropped = 0
+
+    def run(self):
+        started = time.perf_counter()
+        idx = 0
+        while not self.stopped:
+            if self.realtime:
+                delay = started + idx / self.fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            with self.cond:
+                if self.latest is not None:
+                    self.dropped += 1
+                self.latest = (idx, frame, time.perf_counter())
+                self.captured += 1
+                self.cond.notify()
+            idx += 1
+        with self.cond:
+            self.ended = True
+            self.cond.notify_all()
+        self.cap.release()
+
+    def get(self, timeout=1.0):
+        """Newest unread frame, or None once the source has ended."""
+        with self.cond:
+            while self.latest is None and not self.ended:
+                self.cond.wait(timeout)
+            item, self.latest = self.latest, None
+            return item
+
+    def stop(self):
+        self.stopped = True
+
+
+class LiveAnalyzer:
+    """
+    Runs ball detection on the newest frame of a LatestFrameReader and
+    publishes one event per processed frame to every subscriber:
+    {"frame", "ball", "trajectory", "bounce", "bounce_point", "swing_px",
+    "latency_ms", "dropped"}. trajectory and bounce_point come from the
+    piecewise fit in src/trajectory.py over the current delivery; bounce is
+    True on the first event that sees the bounce. latency_ms is capture ->
+    event, measured on the same clock.
+    """
+    def __init__(self, source, model_name=MODEL_NAME, classes=(BALL_CLASS,), conf=0.35,
+                 realtime=None):
+        self.reader = LatestFrameReader(source, realtime=realtime)
+        self.model = get_model(model_name)
+        self.classes = list(classes) if classes else None
+        self.conf = conf
+        self.history = deque(maxlen=HISTORY)   # (frame, x, y) of the current delivery
+        self.bounced = False
+        self.subscribers = []
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.processed = 0
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def _publish(self, event):
+        for callback in self.subscribers:
+            callback(event)
+
+    def process(self, frame_idx, frame, captured_at):
+        results = self.model.track(frame, persist=True, conf=self.conf, classes=self.classes, verbose=False)
+        boxes = results[0].boxes
+        ball = None
+        if len(boxes):
+            best = int(boxes.conf.argmax())
+            x1, y1, x2, y2 = boxes.xyxy[best].tolist()
+            ball = (int((x1 + x2) / 2), int((y1 + y2) / 2))
+            if self.history and frame_idx - self.history[-1][0] > trajectory.DELIVERY_GAP:
+                self.history.clear()   # ball was gone long enough: a new delivery
+                self.bounced = False
+            self.history.append((frame_idx,) + ball)
+        fitted = self.fit()
+        new_bounce = fitted["bounce"] is not None and not self.bounced
+        self.bounced = self.bounced or new_bounce
+        latency = (time.perf_counter() - captured_at) * 1000
+        self.latencies.append(latency)
+        self.processed += 1
+        event = {
+            "frame": frame_idx,
+            "ball": ball,
+            "trajectory": [(x, y) for _, x, y in fitted["path"]],
+            "bounce": new_bounce,
+            "bounce_point": fitted["bounce"],
+            "swing_px": fitted["swing_px"],
+            "latency_ms": round(latency, 1),
+            "dropped": self.reader.dropped,
+        }
+        self._publish(event)
+        return event
+
+    def fit(self):
+        if len(self.history) < 2:
+            return {"bounce": None, "path": [], "swing_px": 0.0}
+        frames, xs, ys = np.array(self.history, dtype=np.float64).T
+        return trajectory.fit([(frames, xs, ys)], steps=FUTURE_STEPS)[0]
+
+    def run(self, max_frames=None):
+        self.reader.start()
+        try:
+            while max_frames is None or self.processed < max_frames:
+                item = self.reader.get()
+                if item is None:
+                    break
+                self.process(*item)
+        finally:
+            self.reader.stop()
+        return self.summary()
+
+    def summary(self):
+        lat = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "captured": self.reader.captured,
+            "processed": self.processed,
+            "dropped": self.reader.dropped,
+            "latency_ms_p50": round(float(np.percentile(lat, 50)), 1),
+            "latency_ms_p95": round(float(np.percentile(lat, 95)), 1),
+            "latency_ms_max": round(float(lat.max()), 1),
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.live <source> [--model weights.pt]")
+        sys.exit(1)
+    model = sys.argv[sys.argv.index("--model") + 1] if "--model" in sys.argv else MODEL_NAME
+    classes = (BALL_CLASS,) if model == MODEL_NAME else None
+    analyzer = LiveAnalyzer(sys.argv[1], model_name=model, classes=classes)
+    analyzer.subscribe(lambda event: print(json.dumps(event)))
+    print(json.dumps(analyzer.run()))
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def box_iou(box, boxes):
+    """IoU of one xyxy box against an (N, 4) array of them."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = lambda b: (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area(box) + area(boxes) - inter + 1e-9)
+
+
+def match(reference, found, thresh=0.5):
+    """
+    Greedy matching of found detections to reference ones, per image and
+    class, highest confidence first. reference and found are lists (one
+    entry per image) of Detections. Returns ([(conf, is_true_positive)], n_reference).
+    """
+    scored = []
+    for ref, det in zip(reference, found):
+        used = np.zeros(len(ref), dtype=bool)
+        for row in det.data[np.argsort(-det.conf)]:
+            same = (ref.cls == row[5]) & ~used
+            if same.any():
+                overlaps = np.where(same, box_iou(row[:4], ref.xyxy), 0)
+                best = int(overlaps.argmax())
+                if overlaps[best] >= thresh:
+                    used[best] = True
+                    scored.append((float(row[4]), True))
+                    continue
+            scored.append((float(row[4]), False))
+    return scored, sum(len(r) for r in reference)
+
+
+def recall(reference, found, thresh=0.5):
+    """Share of reference boxes that some found box overlaps by at least thresh IoU."""
+    scored, n_ref = match(reference, found, thresh)
+    return sum(tp for _, tp in scored) / n_ref if n_ref else float("nan")
+
+
+def average_precision(reference, found, thresh=0.5):
+    """AP@thresh of found detections against reference ones, pooled over images and classes."""
+    scored, n_ref = match(reference, found, thresh)
+    if n_ref == 0:
+        return float("nan")
+    if not scored:
+        return 0.0
+    scored.sort(key=lambda s: -s[0])
+    tp = np.cumsum([s[1] for s in scored])
+    precision = tp / np.arange(1, len(tp) + 1)
+    rec = tp / n_ref
+    # area under the precision envelope (all-point interpolation, as in COCO/VOC)
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    return float(np.sum(np.diff(np.concatenate([[0], rec])) * precision))
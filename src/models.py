@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MEMORY_BUDGET_MB = 1024   # evict least-recently-used models beyond this
+
+_models = OrderedDict()   # (weights, task, imgsz) -> (model, size in bytes)
+_lock = threading.Lock()
+memory_budget = MEMORY_BUDGET_MB * 1024 * 1024
+_torch_patched = False
+
+
+def _model_bytes(model, weights):
+    """Rough resident size of a loaded model: its parameter tensors, else the weights file."""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.model.parameters())
+    except Exception:
+        return os.path.getsize(weights) if os.path.exists(weights) else 0
+
+
+def _allow_yolo_pickles():
+    """PyTorch 2.6 only unpickles allow-listed classes; allow the ones in YOLO .pt files."""
+    global _torch_patched
+    if _torch_patched:
+        return
+    import torch
+    import ultralytics.nn.tasks as tasks
+    torch.serialization.add_safe_globals([
+        tasks.DetectionModel,                # YOLO model
+        torch.nn.modules.container.Sequential,  # standard Sequential
+        torch.nn.Conv2d,
+        torch.nn.BatchNorm2d,
+        torch.nn.ReLU,
+        torch.nn.SiLU,
+        torch.nn.MaxPool2d,
+        torch.nn.AdaptiveAvgPool2d,
+        torch.nn.Linear,
+    ])
+    _torch_patched = True
+
+
+def _evict():
+    total = sum(size for _, size in _models.values())
+    while total > memory_budget and len(_models) > 1:
+        key, (_, size) = _models.popitem(last=False)
+        total -= size
+        print(f"♻️ Evicted model {key[0]} (imgsz={key[2]})")
+
+
+def get_model(weights="yolov8n.pt", task=None, imgsz=640, warmup=True):
+    """
+    Return a shared YOLO model for these weights, loading it on first use.
+    Models are keyed by (weights, task, imgsz), warmed up with one dummy
+    inference so the first real frame doesn't pay for graph setup, and kept
+    until the memory budget forces the least-recently-used one out.
+    ultralytics (and with it torch) is only imported here, on the first
+    load, so importing this module stays cheap.
+    """
+    key = (weights, task, imgsz)
+    with _lock:
+        if key in _models:
+            _models.move_to_end(key)
+            return _models[key][0]
+
+        from ultralytics import YOLO
+        _allow_yolo_pickles()
+        model = YOLO(weights, task=task) if task else YOLO(weights)
+        if warmup:
+            model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, verbose=False)
+        _models[key] = (model, _model_bytes(model, weights))
+        _evict()
+        return model
+
+
+def preload(specs):
+    """
+    Load models up front. The job pool runs this once in each worker as it
+    starts (jobs._init_worker), so the first analysis a worker picks up
+    doesn't pay for loading weights and the web process never holds them.
+    specs is a list of weight paths or dicts of get_model keyword arguments.
+    """
+    for spec in specs or []:
+        if isinstance(spec, dict):
+            get_model(**spec)
+        else:
+            get_model(spec)
+
+
+def set_memory_budget(mb):
+    global memory_budget
+    with _lock:
+        memory_budget = int(mb * 1024 * 1024)
+        _evict()
+
+
+def loaded():
+    """List the keys of currently loaded models, least recently used first."""
+    with _lock:
+        return list(_models.keys())
+
+
+def clear():
+    with _lock:
+        _models.clear()
@@ -0,0 +1,127 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from .batch_infer import batch_track, track_video_batched
+from .track_store import TRACK_DTYPE
+
+SEGMENT_FRAMES = 1800   # ~1 minute of 30 fps video per worker task
+OVERLAP_FRAMES = 30     # frames both neighbouring segments track, used to join ids
+MATCH_DIST = 40         # px between centres for two detections to be the same object
+
+
+def plan_segments(total_frames, segment_frames=SEGMENT_FRAMES, overlap=OVERLAP_FRAMES):
+    """[(start, end), ...] covering the video, each reaching overlap frames into the next."""
+    segments = []
+    for start in range(0, total_frames, segment_frames):
+        segments.append((start, min(total_frames, start + segment_frames + overlap)))
+    return segments
+
+
+def _init_worker(threads, backend):
+    # N processes x all-core thread pools would just fight over the same cores
+    cv2.setNumThreads(threads)
+    if backend == "torch":   # other backends never need torch in the worker
+        import torch
+        torch.set_num_threads(threads)
+
+
+def _track_segment(video_path, start, end, kwargs):
+    """Worker: track frames [start, end) with this process's own model instance."""
+    parts = [rows for _, rows in batch_track(video_path, start=start, end=end, **kwargs)]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=TRACK_DTYPE)
+
+
+def _match_ids(prev, cur, max_dist=MATCH_DIST):
+    """
+    Map track ids of cur onto ids of prev by voting over the frames both saw:
+    every same-class pair closer than max_dist in a shared frame is one vote.
+    """
+    votes = {}
+    for frame in np.intersect1d(prev["frame"], cur["frame"]):
+        a = prev[prev["frame"] == frame]
+        b = cur[cur["frame"] == frame]
+        ca = np.stack([(a["x1"] + a["x2"]) / 2, (a["y1"] + a["y2"]) / 2], axis=1)
+        cb = np.stack([(b["x1"] + b["x2"]) / 2, (b["y1"] + b["y2"]) / 2], axis=1)
+        dist = np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+        dist[a["cls"][:, None] != b["cls"][None, :]] = np.inf
+        for i, j in zip(*np.nonzero(dist < max_dist)):
+            key = (int(b["id"][j]), int(a["id"][i]))
+            votes[key] = votes.get(key, 0) + 1
+    mapping, taken = {}, set()
+    for (cur_id, prev_id), _ in sorted(votes.items(), key=lambda kv: -kv[1]):
+        if cur_id not in mapping and prev_id not in taken:
+            mapping[cur_id] = prev_id
+            taken.add(prev_id)
+    return mapping
+
+
+def stitch(segments, max_dist=MATCH_DIST):
+    """
+    Join per-segment tracks into one array with globally unique ids.
+    segments is [(start, end, rows), ...] in order. Ids are reconciled in
+    each overlap window; rows in the overlap are taken from the earlier
+    segment up to the window's midpoint and from the later one after it.
+    """
+    out = []
+    next_id = 0
+    prev_end = None
+    for start, end, rows in segments:
+        rows = np.array(rows, dtype=TRACK_DTYPE)
+        mapping = {}
+        if out:
+            prev = out[-1]
+            mapping = _match_ids(prev[prev["frame"] >= start], rows[rows["frame"] < prev_end], max_dist)
+        for local_id in np.unique(rows["id"]):
+            if int(local_id) not in mapping:
+                mapping[int(local_id)] = next_id
+                next_id += 1
+        if len(rows):
+            rows["id"] = np.vectorize(mapping.get, otypes=[np.int32])(rows["id"])
+        if out:
+            cut = start + (prev_end - start) // 2
+            out[-1] = out[-1][out[-1]["frame"] < cut]
+            rows = rows[rows["frame"] >= cut]
+        out.append(rows)
+        prev_end = end
+    return np.concatenate(out) if out else np.empty(0, dtype=TRACK_DTYPE)
+
+
+def track_parallel(video_path, writer, workers=None, segment_frames=SEGMENT_FRAMES,
+                   overlap=OVERLAP_FRAMES, progress=None, **kwargs):
+    """
+    Track a long video across CPU cores: split it into overlapping segments,
+    track each in a process pool (one model per process), stitch the ids
+    back together and append the result to writer. Returns the writer.
+    Extra keyword arguments (batch_size, model_name, roi, ...) go to batch_track.
+    Without a frame count (some containers and streams report 0) the video
+    can't be split, so it is tracked serially instead.
+    """
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if total <= 0:
+        print(f"⚠️ {os.path.basename(video_path)} has no frame count; tracking it in one process")
+        return track_video_batched(video_path, writer, progress=progress, **kwargs)
+    workers = workers or os.cpu_count() or 1
+    segments = plan_segments(total, segment_frames, overlap)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(segments) or 1), mp_context=ctx,
+                             initializer=_init_worker, initargs=(threads, kwargs.get("backend", "torch"))) as pool:
+        futures = {pool.submit(_track_segment, video_path, s, e, kwargs): (s, e)
+                   for s, e in segments}
+        done = 0
+        for future in as_completed(futures):
+            s, e = futures[future]
+            results[s] = (s, e, future.result())
+            done += e - s
+            if progress:
+                progress(min(done, total), total)
+
+    writer.add_rows(stitch([results[s] for s, _ in segments]))
+    return writer
@@ -1,10 +1,17 @@
 import os
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import json
-from ultralytics import YOLO
+from .models import get_model
+from .cache import ResultCache, cache_key
+from .tracker import extract_tracks
+from .analyzer import detect_ball_positions, compute_bounces, classify_length
+from .visualizer import plot_heatmap, compute_wagon_wheel
+from .track_store import ball_points, store_path
+from .trajectory import fit_session
+from .clips import annotated_video
+from .charts import wagon_wheel, save_png
 
 MODEL_NAME = "yolov8n.pt"   # pre-trained YOLOv8
 
@@ -14,7 +21,7 @@ def load_config(config_path="config.json"):
     with open(config_path, "r") as f:
         return json.load(f)
 
-os.makedirs(OUT_DIR, exist_ok=True)
+RESULT_CACHE = ResultCache()
 
 # def track_ball(video_path):
 #     cap = cv2.VideoCapture(video_path)
@@ -78,7 +85,7 @@ def track_ball(video_path):
         tuple: A tuple containing the path to the annotated video and
                a list of tuples with (frame_idx, (x, y)) coordinates of the ball.
     """
-    model = YOLO(MODEL_NAME)
+    model = get_model(MODEL_NAME)
     project = "outputs"
     name = "track"
 
@@ -92,6 +99,7 @@ def track_ball(video_path):
         project=project,
         classes=[32],
         name=name,
+        exist_ok=True,   # reuse outputs/track instead of piling up track2, track3, ...
         stream=True
     )
 
@@ -250,30 +258,61 @@ def make_wagon_wheel(ball_positions):
         angle = math.atan2(dy, dx)  # radians
         angles.append(angle)
 
-    # Convert angles to radians for polar plot
-    angles = np.array(angles)
-    radii = np.ones_like(angles)  # just give each shot length 1 (equal weight)
-
-    plt.figure(figsize=(6,6), facecolor="white")
-    ax = plt.subplot(111, polar=True)
-    ax.set_theta_zero_location("N")   # 0° = top (like cricket pitch)
-    ax.set_theta_direction(-1)        # clockwise
-
-    ax.scatter(angles, radii, c="green", s=50, alpha=0.75)
-
-    # Optional: add radial grid (represents field)
-    ax.set_rticks([])
-    ax.set_title("Wagon Wheel", va="bottom")
-
-    wagon_path = os.path.join(OUT_DIR, "wagon_wheel.png")
-    plt.savefig(wagon_path, bbox_inches="tight")
-    plt.close()
+    # Every shot at the same radius (equal weight), drawn by src/charts.py
+    wagon_path = save_png(wagon_wheel(np.array(angles)), os.path.join(OUT_DIR, "wagon_wheel.png"))
     print(f"✅ Wagon Wheel saved at {wagon_path}")
 
 
 # 
 
 
+def run_full_pipeline(video_path, out_dir=OUT_DIR, use_cache=True, annotate=False):
+    """
+    Track the ball, find bounces and render the bowling heatmap and wagon wheel.
+    Results are cached by video bytes + model weights, so re-running on an
+    unchanged video returns the stored artifacts without re-tracking.
+    With annotate, the annotated video is drawn from the stored tracks
+    (src/clips.annotated_video) instead of re-running detection with save=True.
+    """
+    backend = load_config().get("detector", {}).get("backend", "torch")
+    key = cache_key(video_path, MODEL_NAME, {"job": "full", "backend": backend})
+    cached = RESULT_CACHE.get(key) if use_cache else None
+    if cached:
+        print(f"✅ Cache hit {key}")
+        result = dict(cached["artifacts"], insights=cached["data"]["insights"])
+        if annotate:
+            result["annotated_video"] = annotated_video(video_path, out_dir, store_path(video_path))
+        return result
+
+    os.makedirs(out_dir, exist_ok=True)
+    points = detect_ball_positions(extract_tracks(video_path, backend=backend))
+    bounces = compute_bounces(points)
+    _, xs, ys = ball_points(points, cls=None)
+
+    cap = cv2.VideoCapture(video_path)
+    H = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+
+    heatmap = plot_heatmap([(x, y) for _, x, y in bounces], os.path.join(out_dir, "bowling_heatmap.png"))
+    vectors = list(zip(np.diff(xs), np.diff(ys)))
+    wagon = compute_wagon_wheel(vectors, os.path.join(out_dir, "wagon_wheel.png"))
+
+    lengths = [classify_length(y, H) for _, _, y in bounces]
+    insights = {"ball_detections": len(points), "bounces": len(bounces),
+                "lengths": {l: lengths.count(l) for l in set(lengths)}}
+    # Every delivery's bounce, swing and deviation from one batched fit
+    insights["deliveries"] = [
+        {"start": d["start"], "end": d["end"], "bounce": d["bounce"], "swing_px": round(d["swing_px"], 1),
+         "deviation_deg": None if np.isnan(d["deviation_deg"]) else round(d["deviation_deg"], 1)}
+        for d in fit_session(points, cls=None)]
+
+    entry = RESULT_CACHE.put(key, {"bowling_heatmap": heatmap, "wagon_wheel": wagon}, {"insights": insights})
+    result = dict(entry["artifacts"], insights=insights)
+    if annotate:
+        result["annotated_video"] = annotated_video(video_path, out_dir, store_path(video_path))
+    return result
+
+
 # if __name__ == "__main__":
 #     import sys
 #     if len(sys.argv) < 2:
@@ -0,0 +1,50 @@
+"""
+Annotation overlays drawn from a track store instead of kept as a
+separately encoded video. Only the frames being shown are drawn.
+"""
+import cv2
+import numpy as np
+from .track_store import BALL_CLASS
+
+BALL_COLOR = (0, 0, 255)      # BGR
+PLAYER_COLOR = (0, 255, 0)
+TRAIL = 30                    # frames of ball path drawn behind the ball
+
+
+def draw_tracks(frame, rows, trail=None):
+    """
+    Draw one frame's TRACK_DTYPE rows onto frame (in place): a box and id
+    per tracked object, the ball as a filled dot, and trail (an (N, 2)
+    array of earlier ball centres) as a fading line.
+    """
+    if trail is not None and len(trail) > 1:
+        pts = np.asarray(trail, dtype=np.int32)
+        for i in range(1, len(pts)):
+            shade = int(255 * i / len(pts))
+            cv2.line(frame, tuple(pts[i - 1]), tuple(pts[i]), (0, 0, shade), 2)
+    for r in rows:
+        x1, y1, x2, y2 = int(r["x1"]), int(r["y1"]), int(r["x2"]), int(r["y2"])
+        if r["cls"] == BALL_CLASS:
+            cv2.circle(frame, ((x1 + x2) // 2, (y1 + y2) // 2), 8, BALL_COLOR, -1)
+            continue
+        cv2.rectangle(frame, (x1, y1), (x2, y2), PLAYER_COLOR, 2)
+        if r["id"] >= 0:
+            cv2.putText(frame, f"id:{r['id']}", (x1, max(y1 - 5, 10)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, PLAYER_COLOR, 1)
+    return frame
+
+
+class Overlay:
+    """Draws the rows of a frame range (e.g. from frame_rows) onto frames as they are decoded."""
+    def __init__(self, rows, trail=TRAIL):
+        self.rows = rows
+        self.trail = trail
+        ball = rows[rows["cls"] == BALL_CLASS]
+        self.ball_frames = np.asarray(ball["frame"])
+        self.ball_xy = np.column_stack([(ball["x1"] + ball["x2"]) / 2, (ball["y1"] + ball["y2"]) / 2])
+
+    def __call__(self, frame, frame_no):
+        lo, hi = np.searchsorted(self.rows["frame"], [frame_no, frame_no + 1])
+        b = np.searchsorted(self.ball_frames, frame_no, side="right")
+        first = np.searchsorted(self.ball_frames, frame_no - self.trail)
+        return draw_tracks(frame, self.rows[lo:hi], self.ball_xy[first:b])
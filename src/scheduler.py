@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+from .detectors import get_detector, Detections
+from .kalman import BallKalman
+from .batch_infer import make_tracker, to_rows, MODEL_NAME
+from .track_store import BALL_CLASS
+
+GATE_SCALE = 0.25       # motion gate works on a quarter-size grayscale frame
+MOTION_THRESHOLD = 25   # per-pixel intensity change that counts as motion
+MIN_MOTION_PIXELS = 12  # changed pixels (at gate scale) needed to wake the detector
+DETECT_BUDGET = 10      # detector calls allowed per second of video
+MAX_COAST = 5           # skipped frames the Kalman filter may fill in after the last detection
+
+
+class MotionGate:
+    """
+    Cheap "is anything moving?" check: difference of consecutive downscaled
+    grayscale frames, thresholded like the motion_mask in ball_tracker.py.
+    """
+    def __init__(self, scale=GATE_SCALE, threshold=MOTION_THRESHOLD, min_pixels=MIN_MOTION_PIXELS):
+        self.scale = scale
+        self.threshold = threshold
+        self.min_pixels = min_pixels
+        self.prev = None
+
+    def __call__(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        prev, self.prev = self.prev, gray
+        if prev is None:
+            return True
+        motion_mask = cv2.absdiff(gray, prev) > self.threshold
+        return int(np.count_nonzero(motion_mask)) >= self.min_pixels
+
+
+class DetectionBudget:
+    """Token bucket refilled at per_second detector calls per second of video."""
+    def __init__(self, per_second=DETECT_BUDGET, fps=30):
+        self.rate = per_second / float(fps or 30)
+        self.capacity = max(1.0, float(per_second))
+        self.tokens = self.capacity
+
+    def tick(self):
+        self.tokens = min(self.capacity, self.tokens + self.rate)
+
+    def take(self):
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def gated_track(video_path, detect_budget=DETECT_BUDGET, model_name=MODEL_NAME, imgsz=640,
+                conf=0.25, tracker="bytetrack.yaml", max_coast=MAX_COAST, roi=None,
+                stats=None, backend="torch", progress=None, progress_every=10):
+    """
+    Adaptive tracking: the detector only runs on frames the MotionGate
+    flags, within detect_budget calls per second of video. Frames it skips
+    (still, or over budget) within max_coast frames of the last detection get
+    the ball position from a constant-acceleration Kalman filter (rows with
+    conf 0); once the detector runs and misses, nothing is filled until it
+    finds the ball again.
+    Yields (frame_idx, rows) like batch_track; pass a dict as stats to get
+    frames / detected / skipped_still / skipped_budget / interpolated counts.
+    progress(frames_done, total) is called every progress_every decoded frames,
+    whether or not they produced rows.
+    """
+    detector = get_detector(model_name, backend, imgsz=imgsz)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+    gate = MotionGate()
+    budget = DetectionBudget(detect_budget, fps)
+    kalman = BallKalman()
+    tracker = make_tracker(tracker, frame_rate=int(round(fps)))
+    stats = stats if stats is not None else {}
+    stats.update({"frames": 0, "detected": 0, "skipped_still": 0, "skipped_budget": 0,
+                  "interpolated": 0})
+    ball_id, ball_size = -1, (8.0, 8.0)
+    lost = True   # the detector has looked since the last ball it found, and missed
+
+    frame_idx = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            stats["frames"] += 1
+            budget.tick()
+            moving = gate(frame)
+            rows = None
+            skipped = not (moving and budget.take())
+            if not skipped:
+                stats["detected"] += 1
+                if roi:
+                    rx1, ry1, rx2, ry2 = roi
+                    det = detector.predict([np.ascontiguousarray(frame[ry1:ry2, rx1:rx2])], conf=conf,
+                                           classes=[BALL_CLASS])[0]
+                else:
+                    det = detector.predict([frame], conf=conf, classes=[BALL_CLASS])[0]
+                if roi and len(det):
+                    det.data[:, :4] += (rx1, ry1, rx1, ry1)
+                tracks = tracker.update(det, frame)
+                if len(tracks):
+                    rows = to_rows(frame_idx, tracks[:, :4], tracks[:, 6], tracks[:, 4], tracks[:, 5])
+                    best = rows[np.argmax(rows["conf"])]
+                    kalman.update(frame_idx, (best["x1"] + best["x2"]) / 2, (best["y1"] + best["y2"]) / 2)
+                    ball_id = int(best["id"])
+                    ball_size = (best["x2"] - best["x1"], best["y2"] - best["y1"])
+                lost = rows is None
+            else:
+                stats["skipped_still" if not moving else "skipped_budget"] += 1
+                # skipped frames still count for ByteTrack, so a gap ages lost tracks as it would under model.track
+                tracker.update(Detections(np.empty((0, 6))), frame)
+
+            if skipped and not lost and kalman.initialized and frame_idx - kalman.last_frame <= max_coast:
+                x, y = kalman.predict(frame_idx)
+                hw, hh = ball_size[0] / 2, ball_size[1] / 2
+                rows = to_rows(frame_idx, [[x - hw, y - hh, x + hw, y + hh]], [BALL_CLASS], [ball_id], [0.0])
+                stats["interpolated"] += 1
+            if rows is not None:
+                yield frame_idx, rows
+            frame_idx += 1
+            if progress and frame_idx % progress_every == 0:
+                progress(frame_idx, total)
+    finally:
+        cap.release()
@@ -0,0 +1,135 @@
+"""
+Season-wide heatmaps and wagon wheels over many sessions.
+
+A session is an analysed video added to the season with its bowler and
+match date. Adding one copies only its ball rows (a few hundred KB) and
+builds its delivery index, so the season survives upload cleanup:
+
+    <root>/<session_id>/session.json      bowler, date, video size
+    <root>/<session_id>/chunk_NNNNN.npy   ball rows (track store layout)
+    <root>/<session_id>/deliveries.json   per-delivery index (src/deliveries.py)
+
+Queries filter sessions by bowler and date from session.json alone, then
+stream each matching session's chunks (memory-mapped) into one count
+grid and one angle histogram. Only a chunk is in memory at a time, so a
+season costs the same RAM as a single session.
+"""
+import os
+import json
+import time
+import shutil
+import datetime
+import numpy as np
+from .track_store import TrackWriter, iter_chunks, read_meta, BALL_CLASS
+from .deliveries import load_index
+from .heatmap import HeatmapAccumulator
+from .utils import PITCH_FRAME, scale_pitch, in_pitch
+
+SEASON_DIR = os.path.join("data", "season")
+SEASON_SHAPE = PITCH_FRAME  # every session is scaled to this (height, width), the size config.json's pitch box is for
+WAGON_BINS = 36             # 10 degree sectors
+
+
+class SeasonStore:
+    """The sessions of a season, one directory each under root."""
+    def __init__(self, root=SEASON_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def session_dir(self, session_id):
+        return os.path.join(self.root, session_id)
+
+    def add(self, session_id, store_dir, bowler=None, date=None):
+        """
+        Copy the ball rows of an analysed track store into the season as
+        session_id (replacing an earlier copy). date is an ISO date
+        (YYYY-MM-DD), by default today.
+        """
+        meta = read_meta(store_dir)
+        if not meta:
+            raise FileNotFoundError(f"{store_dir} has no tracks")
+        date = datetime.date.fromisoformat(date).isoformat() if date else datetime.date.today().isoformat()
+        dest = self.session_dir(session_id)
+        writer = TrackWriter(dest)
+        for chunk in iter_chunks(store_dir):
+            writer.add_rows(chunk[chunk["cls"] == BALL_CLASS])
+        writer.close(**{k: meta.get(k) for k in ("video", "video_digest", "fps", "width", "height", "frame_count")})
+        index = load_index(dest)
+        session = {"id": session_id, "bowler": bowler, "date": date, "added": time.time(),
+                   "width": meta.get("width"), "height": meta.get("height"),
+                   "deliveries": len(index["deliveries"])}
+        with open(os.path.join(dest, "session.json"), "w") as f:
+            json.dump(session, f, indent=2)
+        return session
+
+    def remove(self, session_id):
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+    def sessions(self, bowler=None, date_from=None, date_to=None):
+        """Sessions matching the filters (dates inclusive, ISO strings), oldest first."""
+        found = []
+        for session_id in os.listdir(self.root):
+            try:
+                with open(os.path.join(self.session_dir(session_id), "session.json"), "r") as f:
+                    session = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if bowler and (session["bowler"] or "").lower() != bowler.lower():
+                continue
+            if (date_from and session["date"] < date_from) or (date_to and session["date"] > date_to):
+                continue
+            found.append(session)
+        return sorted(found, key=lambda s: (s["date"], s["added"]))
+
+
+def aggregate(session_dirs, lengths=None, pitch=None, shape=SEASON_SHAPE, bins=WAGON_BINS, progress=None):
+    """
+    Sum the ball points of many sessions, chunk by chunk.
+
+    lengths keeps only deliveries of those src.analyzer.classify_length
+    classes; pitch (config.json's box, scaled to shape with
+    src.utils.scale_pitch) limits the heatmap to the pitch. Returns (HeatmapAccumulator of shape,
+    wagon wheel counts per angle bin, {"sessions", "deliveries", "points"}).
+    Angles are measured from each delivery's first sighting, as in
+    pipeline.make_wagon_wheel.
+    """
+    acc = HeatmapAccumulator(shape)
+    box = scale_pitch(pitch, shape[1], shape[0]) if pitch else None
+    wagon = np.zeros(bins, dtype=np.int64)
+    stats = {"sessions": 0, "deliveries": 0, "points": 0}
+    for n, store_dir in enumerate(session_dirs):
+        if progress:
+            progress(n, len(session_dirs))
+        deliveries = [d for d in load_index(store_dir)["deliveries"]
+                      if not lengths or d["length"] in lengths]
+        if not deliveries:
+            continue
+        meta = read_meta(store_dir)
+        sx = shape[1] / (meta.get("width") or shape[1])
+        sy = shape[0] / (meta.get("height") or shape[0])
+        starts = np.array([d["first_ball"] for d in deliveries])
+        ends = np.array([d["last_ball"] for d in deliveries])
+        origins = np.array([d["origin"] for d in deliveries], dtype=np.float64)
+        stats["sessions"] += 1
+        stats["deliveries"] += len(deliveries)
+
+        for chunk in iter_chunks(store_dir):
+            frames = chunk["frame"]
+            which = np.searchsorted(starts, frames, side="right") - 1
+            inside = (which >= 0) & (frames <= ends[np.maximum(which, 0)])
+            if not inside.any():
+                continue
+            rows, which = chunk[inside], which[inside]
+            xs, ys = (rows["x1"] + rows["x2"]) / 2, (rows["y1"] + rows["y2"]) / 2
+            angles = np.arctan2(ys - origins[which, 1], xs - origins[which, 0])
+            sector = ((angles + np.pi) / (2 * np.pi) * bins).astype(np.intp) % bins
+            wagon += np.bincount(sector, minlength=bins)
+
+            hx, hy = xs * sx, ys * sy
+            if box:
+                keep = in_pitch(box, hx, hy)
+                hx, hy = hx[keep], hy[keep]
+            stats["points"] += acc.add(hx, hy)
+    if progress:
+        progress(len(session_dirs), len(session_dirs))
+    return acc, wagon, stats
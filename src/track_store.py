@@ -0,0 +1,165 @@
+import os
+import glob
+import json
+import numpy as np
+
+# One row per detection; ~30 bytes instead of a dict per box
+TRACK_DTYPE = np.dtype([
+    ("frame", "<i4"), ("id", "<i4"), ("cls", "<i2"),
+    ("x1", "<f4"), ("y1", "<f4"), ("x2", "<f4"), ("y2", "<f4"),
+    ("conf", "<f4"),
+])
+CHUNK_ROWS = 65536   # rows per .npy chunk file
+BALL_CLASS = 32      # COCO "sports ball"
+
+
+def store_path(video_path):
+    """Track store directory that sits next to the video: data/match.mp4 -> data/match.tracks"""
+    return os.path.splitext(video_path)[0] + ".tracks"
+
+
+class TrackWriter:
+    """
+    Appends detections to a track store: fixed-size chunk_NNNNN.npy files of
+    TRACK_DTYPE rows plus a meta.json describing the video. Rows are buffered
+    in a preallocated array and flushed a chunk at a time. on_rows, if set,
+    is called with every batch of rows as it is added (before any flush).
+    """
+    def __init__(self, store_dir, chunk_rows=CHUNK_ROWS, append=False):
+        self.store_dir = store_dir
+        self.chunk_rows = chunk_rows
+        os.makedirs(store_dir, exist_ok=True)
+        if not append:
+            for p in glob.glob(os.path.join(store_dir, "chunk_*.npy")):
+                os.remove(p)
+            if os.path.exists(os.path.join(store_dir, "meta.json")):
+                os.remove(os.path.join(store_dir, "meta.json"))
+        self.meta = read_meta(store_dir)
+        self.chunks = len(glob.glob(os.path.join(store_dir, "chunk_*.npy")))
+        self.rows = self.meta.get("rows", 0)
+        self.buf = np.empty(chunk_rows, dtype=TRACK_DTYPE)
+        self.n = 0
+        self.on_rows = None
+
+    def add(self, frame, xyxy, cls, ids=None, conf=None):
+        """Add all detections of one frame; xyxy is (N, 4), the rest length N."""
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        rows = np.empty(len(xyxy), dtype=TRACK_DTYPE)
+        rows["frame"] = frame
+        rows["id"] = -1 if ids is None else ids
+        rows["cls"] = cls
+        rows["x1"], rows["y1"], rows["x2"], rows["y2"] = xyxy.T
+        rows["conf"] = 1.0 if conf is None else conf
+        self.add_rows(rows)
+
+    def add_rows(self, rows):
+        """Append rows that are already TRACK_DTYPE."""
+        if self.on_rows is not None and len(rows):
+            self.on_rows(rows.copy())
+        start = 0
+        while start < len(rows):
+            take = min(len(rows) - start, self.chunk_rows - self.n)
+            self.buf[self.n:self.n + take] = rows[start:start + take]
+            self.n += take
+            start += take
+            if self.n == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        if self.n == 0:
+            return
+        np.save(os.path.join(self.store_dir, f"chunk_{self.chunks:05d}.npy"), self.buf[:self.n])
+        self.chunks += 1
+        self.rows += self.n
+        self.n = 0
+
+    def close(self, **meta):
+        """Flush the last partial chunk and write meta.json (video size, fps, ...)."""
+        self.flush()
+        self.meta.update(meta)
+        self.meta.update({"rows": self.rows, "chunks": self.chunks})
+        write_meta(self.store_dir, self.meta)
+        return self.store_dir
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def read_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, "meta.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_meta(store_dir, meta):
+    tmp = os.path.join(store_dir, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(store_dir, "meta.json"))
+
+
+def iter_chunks(store_dir, mmap=True):
+    """Yield each chunk as a (memory-mapped) TRACK_DTYPE array, in frame order."""
+    for p in sorted(glob.glob(os.path.join(store_dir, "chunk_*.npy"))):
+        yield np.load(p, mmap_mode="r" if mmap else None)
+
+
+def load_tracks(store_dir, mmap=True):
+    """All rows of a store as one TRACK_DTYPE array (memory-mapped when it is a single chunk)."""
+    chunks = list(iter_chunks(store_dir, mmap=mmap))
+    if not chunks:
+        return np.empty(0, dtype=TRACK_DTYPE)
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def read_rows(store_dir, start, end):
+    """Rows [start, end) of a store, reading only the chunks that overlap them."""
+    parts, offset = [], 0
+    for chunk in iter_chunks(store_dir):
+        if offset >= end:
+            break
+        if offset + len(chunk) > start:
+            parts.append(np.array(chunk[max(0, start - offset):end - offset]))
+        offset += len(chunk)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=TRACK_DTYPE)
+
+
+def frame_rows(store_dir, start, end):
+    """Rows of frames start..end inclusive; chunks are frame-ordered, so others are skipped unread."""
+    parts = []
+    for chunk in iter_chunks(store_dir):
+        if not len(chunk) or chunk["frame"][-1] < start:
+            continue
+        if chunk["frame"][0] > end:
+            break
+        lo, hi = np.searchsorted(chunk["frame"], [start, end + 1])
+        parts.append(np.array(chunk[lo:hi]))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=TRACK_DTYPE)
+
+
+def is_track_array(data):
+    return isinstance(data, np.ndarray) and data.dtype.names is not None
+
+
+def ball_points(data, cls=BALL_CLASS):
+    """
+    (frames, xs, ys) arrays of box centres for one class.
+    Accepts a track store array or the legacy [(frame, (x, y)), ...] list
+    from pipeline.track_ball, so chart code can take either.
+    """
+    if is_track_array(data):
+        if cls is not None:
+            data = data[data["cls"] == cls]
+        return (np.asarray(data["frame"]),
+                (data["x1"] + data["x2"]) / 2,
+                (data["y1"] + data["y2"]) / 2)
+    pts = [(f, p[0], p[1]) for f, p in data if p is not None]
+    if not pts:
+        return np.empty(0, dtype=np.int32), np.empty(0), np.empty(0)
+    arr = np.asarray(pts, dtype=np.float64)
+    return arr[:, 0].astype(np.int32), arr[:, 1], arr[:, 2]
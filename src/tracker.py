@@ -1,21 +1,8 @@
 import os
 import numpy as np
-import torch
-import ultralytics.nn.tasks as tasks
-from ultralytics import YOLO
-
-# ✅ Fix PyTorch 2.6 unpickling issues
-torch.serialization.add_safe_globals([
-    tasks.DetectionModel,                # YOLO model
-    torch.nn.modules.container.Sequential,  # standard Sequential
-    torch.nn.Conv2d,
-    torch.nn.BatchNorm2d,
-    torch.nn.ReLU,
-    torch.nn.SiLU,
-    torch.nn.MaxPool2d,
-    torch.nn.AdaptiveAvgPool2d,
-    torch.nn.Linear,
-])
+from .models import get_model
+from .track_store import TrackWriter, store_path, load_tracks
+from .batch_infer import batch_track
 
 
 MODEL_NAME = "yolov8n.pt"
@@ -25,9 +12,9 @@ def run_tracking(video_path, project="outputs", name="track"):
     Run YOLOv8 tracking on input video.
     Saves annotated video to outputs/project/name.
     """
-    model = YOLO(MODEL_NAME)
+    model = get_model(MODEL_NAME)
     model.track(source=video_path, tracker="bytetrack.yaml", imgsz=640, conf=0.25,
-                save=True, project=project,classes=[32], name=name)
+                save=True, project=project,classes=[32], name=name, exist_ok=True)
     # find annotated file
     out_dir = os.path.join(project, name)
     for f in os.listdir(out_dir):
@@ -35,12 +22,21 @@ def run_tracking(video_path, project="outputs", name="track"):
             return os.path.join(out_dir, f)
     return None
 
-def extract_tracks(video_path):
+def extract_tracks(video_path, store_dir=None, backend="torch"):
     """
     Return per-frame ball/player tracks with id, cls, and coordinates.
+    Tracks are written to a track store next to the video (or store_dir)
+    and returned as a TRACK_DTYPE array. Backends other than torch
+    (see src/detectors.py) detect in batches and track with ByteTrack directly.
     """
-    model = YOLO(MODEL_NAME)
-    tracks = []
+    store_dir = store_dir or store_path(video_path)
+    writer = TrackWriter(store_dir)
+    if backend != "torch":
+        for _, rows in batch_track(video_path, model_name=MODEL_NAME, classes=None, backend=backend):
+            writer.add_rows(rows)
+        writer.close(video=os.path.basename(video_path), model=MODEL_NAME, backend=backend)
+        return load_tracks(store_dir)
+    model = get_model(MODEL_NAME)
     for i, r in enumerate(model.track(source=video_path, stream=True,
                                       tracker="bytetrack.yaml", imgsz=640, conf=0.25)):
         if not r.boxes: 
@@ -50,8 +46,6 @@ def extract_tracks(video_path):
         cls = boxes.cls.cpu().numpy().astype(int)
         xyxy = boxes.xyxy.cpu().numpy()
         ids = boxes.id.cpu().numpy().astype(int) if boxes.id is not None else np.arange(len(cls))
-        for c, tid, bb in zip(cls, ids, xyxy):
-            x1,y1,x2,y2 = bb
-            cx, cy = float((x1+x2)/2), float((y1+y2)/2)
-            tracks.append({"frame": int(frame_no), "id": int(tid), "cls": int(c), "cx": cx, "cy": cy})
-    return tracks
+        writer.add(int(frame_no), xyxy, cls, ids, boxes.conf.cpu().numpy())
+    writer.close(video=os.path.basename(video_path), model=MODEL_NAME)
+    return load_tracks(store_dir)
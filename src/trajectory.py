@@ -0,0 +1,177 @@
+"""
+Ball trajectory fitting for whole sessions at once.
+
+Each delivery is a run of ball centroids (frame, x, y) in image
+coordinates. Deliveries are padded into (B, N) arrays and fitted together
+with batched least squares:
+
+    before the bounce   x(t), y(t) quadratic   (swing, dip)
+    after the bounce    x(t) linear, y(t) quadratic
+
+The bounce is where y (image rows grow downwards) peaks; its exact frame
+is where the two y parabolas meet. The same code serves the live loop
+(B = 1, a few dozen points) and offline sessions (every delivery in one call).
+"""
+import numpy as np
+from .track_store import ball_points, BALL_CLASS
+
+MIN_POINTS = 3       # per side of the bounce for a piecewise fit
+FUTURE_STEPS = 4     # frames of predicted path returned by default
+DELIVERY_GAP = 15    # frames without the ball that end a delivery
+DEAD_BALL = 30       # frames of a barely moving ball that make it dead (keeper's gloves, on the ground)
+STILL_SPEED = 1.0    # px per frame counted as "barely moving"
+RIDGE = 1e-6         # keeps the normal equations solvable with too few points
+
+
+def pad(deliveries):
+    """[(frames, xs, ys), ...] -> (T, X, Y, mask) float arrays of shape (B, N)."""
+    n = max((len(d[0]) for d in deliveries), default=0)
+    T = np.zeros((len(deliveries), n))
+    X, Y = np.zeros_like(T), np.zeros_like(T)
+    M = np.zeros(T.shape, dtype=bool)
+    for i, (f, x, y) in enumerate(deliveries):
+        k = len(f)
+        T[i, :k], X[i, :k], Y[i, :k], M[i, :k] = f, x, y, True
+    return T, X, Y, M
+
+
+def polyfit(t, v, mask, deg):
+    """Least-squares polynomial per row over the masked points; coefficients low -> high order."""
+    V = t[..., None] ** np.arange(deg + 1)
+    Vw = V * mask[..., None]
+    A = Vw.transpose(0, 2, 1) @ V + RIDGE * np.eye(deg + 1)
+    b = (Vw * v[..., None]).sum(axis=1)
+    return np.linalg.solve(A, b[..., None])[..., 0]
+
+
+def polyval(c, t):
+    """Evaluate per-row coefficients c (B, d+1) at t (B, K)."""
+    return (c[:, None, :] * t[..., None] ** np.arange(c.shape[1])).sum(axis=-1)
+
+
+def _slope(c, t):
+    """Derivative of per-row polynomials (degree <= 2) at t (B,)."""
+    d = c[:, 1].copy()
+    if c.shape[1] > 2:
+        d += 2 * c[:, 2] * t
+    return d
+
+
+def fit(deliveries, steps=FUTURE_STEPS, stumps_y=None):
+    """
+    Fit every delivery in [(frames, xs, ys), ...] and return one dict each:
+
+        bounce         (frame, x, y) of the pitch point, or None before/without one
+        path           [(frame, x, y), ...] predicted for the next steps frames,
+                       cut where the ball reaches image row stumps_y if given
+        swing_px       signed lateral bend of the pre-bounce flight (px)
+        deviation_deg  change of lateral direction off the pitch (degrees)
+        rmse           fit residual (px)
+    """
+    if not deliveries:
+        return []
+    T, X, Y, M = pad(deliveries)
+    B, N = T.shape
+    idx = np.arange(N)
+    t0 = np.where(M, T, np.inf).min(axis=1)
+    t = np.where(M, T - t0[:, None], 0.0)     # frames since the first sighting, for conditioning
+    n_valid = M.sum(axis=1)
+    last = np.where(M, t, -np.inf).max(axis=1)
+
+    k = np.where(M, Y, -np.inf).argmax(axis=1)
+    pre = M & (idx <= k[:, None])
+    post = M & (idx >= k[:, None])
+    bounced = (pre.sum(axis=1) >= MIN_POINTS) & (post.sum(axis=1) >= MIN_POINTS)
+    pre = np.where(bounced[:, None], pre, M)
+
+    x_pre, y_pre = polyfit(t, X, pre, 2), polyfit(t, Y, pre, 2)
+    x_post, y_post = polyfit(t, X, post, 1), polyfit(t, Y, post, 2)
+
+    # Bounce frame: the root of y_pre - y_post nearest the highest-y sample
+    tk = t[np.arange(B), k]
+    d = y_pre - y_post
+    disc = np.maximum(d[:, 1] ** 2 - 4 * d[:, 2] * d[:, 0], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roots = np.stack([(-d[:, 1] + np.sqrt(disc)) / (2 * d[:, 2]),
+                          (-d[:, 1] - np.sqrt(disc)) / (2 * d[:, 2])], axis=1)
+    roots = np.where(np.isfinite(roots), roots, tk[:, None])
+    tb = roots[np.arange(B), np.abs(roots - tk[:, None]).argmin(axis=1)]
+    tb = np.clip(tb, tk - 2, tk + 2)
+    xb = polyval(x_pre, tb[:, None])[:, 0]
+    yb = polyval(y_pre, tb[:, None])[:, 0]
+
+    # Swing: how far the pre-bounce x(t) parabola bows away from its chord
+    span = np.where(bounced, tb, last)
+    swing = -x_pre[:, 2] * span ** 2 / 4
+    pre_angle = np.degrees(np.arctan2(_slope(x_pre, tb), np.abs(_slope(y_pre, tb))))
+    post_angle = np.degrees(np.arctan2(_slope(x_post, tb), np.abs(_slope(y_post, tb))))
+    deviation = np.where(bounced, post_angle - pre_angle, np.nan)
+
+    # Residuals of whichever piece covers each sample
+    fx = np.where(post & bounced[:, None], polyval(x_post, t), polyval(x_pre, t))
+    fy = np.where(post & bounced[:, None], polyval(y_post, t), polyval(y_pre, t))
+    sq = np.where(M, (fx - X) ** 2 + (fy - Y) ** 2, 0)
+    rmse = np.sqrt(sq.sum(axis=1) / np.maximum(n_valid, 1))
+
+    # Predicted path for the next steps frames
+    ft = last[:, None] + np.arange(1, steps + 1)
+    px = np.where(bounced[:, None], polyval(x_post, ft), polyval(x_pre, ft))
+    py = np.where(bounced[:, None], polyval(y_post, ft), polyval(y_pre, ft))
+    keep = np.ones(px.shape, dtype=bool)
+    if stumps_y is not None:
+        side = np.sign(Y[np.arange(B), n_valid - 1] - stumps_y)[:, None]
+        keep = np.cumprod(np.sign(py - stumps_y) == side, axis=1).astype(bool)
+
+    out = []
+    for i in range(B):
+        out.append({
+            "bounce": (float(tb[i] + t0[i]), float(xb[i]), float(yb[i])) if bounced[i] else None,
+            "path": [(float(f + t0[i]), float(x), float(y))
+                     for f, x, y in zip(ft[i][keep[i]], px[i][keep[i]], py[i][keep[i]])],
+            "swing_px": float(swing[i]),
+            "deviation_deg": float(deviation[i]),
+            "rmse": float(rmse[i]),
+        })
+    return out
+
+
+def delivery_ranges(frames, xs, ys, gap=DELIVERY_GAP, dead=DEAD_BALL, still_speed=STILL_SPEED,
+                    min_points=2 * MIN_POINTS):
+    """
+    [(i0, i1), ...] index ranges of frame-sorted ball points, one per delivery:
+    cut wherever the ball is unseen for more than gap frames, or lies still
+    for dead frames (those sightings are dropped).
+    """
+    n = len(frames)
+    if n < min_points:
+        return []
+    steps = np.maximum(np.diff(frames), 1)
+    still = (np.hypot(np.diff(xs), np.diff(ys)) / steps < still_speed) & (steps <= gap)
+    edges = np.diff(np.concatenate([[0], still.astype(np.int8), [0]]))
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    live = np.ones(n, dtype=bool)
+    for s, e in zip(run_starts, run_ends):
+        if frames[e] - frames[s] >= dead:
+            live[s + 1:e + 1] = False
+    idx = np.flatnonzero(live)
+    breaks = (np.diff(frames[idx]) > gap) | (np.diff(idx) > 1)
+    cuts = np.concatenate([[0], np.flatnonzero(breaks) + 1, [len(idx)]])
+    return [(int(idx[a]), int(idx[b - 1]) + 1) for a, b in zip(cuts[:-1], cuts[1:])
+            if b - a >= min_points]
+
+
+def split_deliveries(frames, xs, ys, gap=DELIVERY_GAP, dead=DEAD_BALL, min_points=2 * MIN_POINTS):
+    """A session's ball points as [(frames, xs, ys), ...], one per delivery (see delivery_ranges)."""
+    order = np.argsort(frames, kind="stable")
+    frames, xs, ys = np.asarray(frames)[order], np.asarray(xs)[order], np.asarray(ys)[order]
+    return [(frames[a:b], xs[a:b], ys[a:b])
+            for a, b in delivery_ranges(frames, xs, ys, gap=gap, dead=dead, min_points=min_points)]
+
+
+def fit_session(tracks, steps=FUTURE_STEPS, stumps_y=None, gap=DELIVERY_GAP, cls=BALL_CLASS):
+    """Fit every delivery in a track store array (or legacy ball list) in one batch."""
+    deliveries = split_deliveries(*ball_points(tracks, cls=cls), gap=gap)
+    fits = fit(deliveries, steps=steps, stumps_y=stumps_y)
+    for (frames, _, _), result in zip(deliveries, fits):
+        result["start"], result["end"] = int(frames[0]), int(frames[-1])
+    return fits
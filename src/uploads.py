@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import time
+import shutil
+import secrets
+import threading
+
+UPLOAD_DIR = os.path.join("static", "uploads")
+MAX_AGE_HOURS = 72      # uploads untouched for this long are deleted
+QUOTA_MB = 20480        # total disk the uploads (videos + their outputs) may use
+CHUNK_SIZE = 1 << 20    # copy request bodies to disk 1 MB at a time
+
+_ID_RE = re.compile(r"^[0-9a-f]{16}$")
+
+
+class OffsetMismatch(ValueError):
+    """A chunk did not start where the upload on disk ends; offset is where it does."""
+    def __init__(self, offset):
+        super().__init__(f"upload is at byte {offset}")
+        self.offset = offset
+
+
+class QuotaExceeded(ValueError):
+    """Accepting a chunk would take the uploads over the disk quota (or past the declared size)."""
+
+
+class UploadStore:
+    """
+    One directory per upload under root:
+
+        <upload_id>/upload.json     filename, size, bytes received, complete
+        <upload_id>/video.mp4       the finished video (video.mp4.part while receiving)
+        <upload_id>/outputs/        charts and annotated video for this upload
+
+    Chunks are appended straight from the request stream, so multi-GB videos
+    never sit in memory and an interrupted upload resumes from offset().
+    cleanup() enforces the age limit and the disk quota; writes that would
+    take the store over the quota are refused as they stream in. Each upload
+    has its own lock, so a slow client only holds up its own upload.
+    """
+    def __init__(self, root=UPLOAD_DIR, max_age_hours=MAX_AGE_HOURS, quota_mb=QUOTA_MB):
+        self.root = root
+        self.max_age = max_age_hours * 3600
+        self.quota = quota_mb * 1024 * 1024
+        self.lock = threading.Lock()   # guards used and _locks; never held while streaming
+        self.used = None               # bytes on disk under root, measured on first need
+        self._locks = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _upload_lock(self, upload_id):
+        with self.lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _usage(self, upload_id):
+        upload_dir = self.upload_dir(upload_id)
+        return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(upload_dir) for f in files)
+
+    def _reserve(self, n):
+        """Count n more bytes against the quota; False (nothing counted) if they don't fit."""
+        with self.lock:
+            if self.used is None:
+                self.used = sum(self._usage(i) for i in os.listdir(self.root) if _ID_RE.match(i))
+            if self.used + n > self.quota:
+                return False
+            self.used += n
+            return True
+
+    def upload_dir(self, upload_id):
+        if not _ID_RE.match(upload_id or ""):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+
+    def out_dir(self, upload_id):
+        path = os.path.join(self.upload_dir(upload_id), "outputs")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def info(self, upload_id):
+        try:
+            with open(os.path.join(self.upload_dir(upload_id), "upload.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_info(self, info):
+        path = os.path.join(self.upload_dir(info["id"]), "upload.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(info, f)
+        os.replace(path + ".tmp", path)
+
+    def video_path(self, upload_id):
+        info = self.info(upload_id)
+        if info is None:
+            raise KeyError(upload_id)
+        return os.path.join(self.upload_dir(upload_id), "video" + info["ext"])
+
+    def create(self, filename, size=None):
+        """Start an upload of size bytes (None if unknown); returns its info."""
+        if size is not None and size > self.quota:
+            raise QuotaExceeded(f"{size} bytes is over the {self.quota} byte upload quota")
+        self.cleanup()
+        upload_id = secrets.token_hex(8)
+        os.makedirs(self.upload_dir(upload_id))
+        ext = os.path.splitext(filename)[1].lower() or ".mp4"
+        info = {"id": upload_id, "filename": os.path.basename(filename), "ext": ext,
+                "size": size, "received": 0, "complete": False, "created": time.time()}
+        self._write_info(info)
+        open(self.video_path(upload_id) + ".part", "wb").close()
+        return info
+
+    def offset(self, upload_id):
+        info = self.info(upload_id)
+        if info is None:
+            raise KeyError(upload_id)
+        return info["size"] if info["complete"] else os.path.getsize(self.video_path(upload_id) + ".part")
+
+    def write_chunk(self, upload_id, stream, offset, length=None):
+        """
+        Append bytes read from stream at offset. Raises OffsetMismatch if the
+        upload on disk is elsewhere (the client should resume from e.offset),
+        and QuotaExceeded, keeping nothing of this chunk, if it would go past
+        the declared size or the disk quota. The upload completes once size
+        bytes have arrived.
+        """
+        with self._upload_lock(upload_id):
+            info = self.info(upload_id)
+            if info is None:
+                raise KeyError(upload_id)
+            current = self.offset(upload_id)
+            if info["complete"] or offset != current:
+                raise OffsetMismatch(current)
+            part = self.video_path(upload_id) + ".part"
+            written = 0
+            with open(part, "ab") as f:
+                remaining = length
+                while remaining is None or remaining > 0:
+                    chunk = stream.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    over_size = info["size"] is not None and current + written + len(chunk) > info["size"]
+                    if over_size or not self._reserve(len(chunk)):
+                        f.truncate(current)
+                        with self.lock:
+                            self.used -= written
+                        raise QuotaExceeded("upload is larger than its declared size" if over_size
+                                            else "upload quota is full")
+                    f.write(chunk)
+                    written += len(chunk)
+                    if remaining is not None:
+                        remaining -= len(chunk)
+            info["received"] = os.path.getsize(part)
+            if info["size"] is not None and info["received"] >= info["size"]:
+                self._finish(info)
+            else:
+                self._write_info(info)
+            return info
+
+    def finish(self, upload_id):
+        """Mark an upload of unknown size as complete with what has arrived."""
+        with self._upload_lock(upload_id):
+            info = self.info(upload_id)
+            if info is None:
+                raise KeyError(upload_id)
+            if not info["complete"]:
+                info["size"] = info["received"]
+                self._finish(info)
+            return info
+
+    def _finish(self, info):
+        path = self.video_path(info["id"])
+        os.replace(path + ".part", path)
+        info["complete"] = True
+        info["completed"] = time.time()
+        self._write_info(info)
+
+    def save(self, filename, stream):
+        """Whole-file upload (e.g. a plain form post) in one go; returns its info."""
+        info = self.create(filename)
+        self.write_chunk(info["id"], stream, 0)
+        return self.finish(info["id"])
+
+    def touch(self, upload_id):
+        """Mark an upload as in use so cleanup() keeps it around."""
+        os.utime(os.path.join(self.upload_dir(upload_id), "upload.json"))
+
+    def list(self, complete=True):
+        """Upload infos, most recently used first."""
+        infos = []
+        for upload_id in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            info = self.info(upload_id)
+            if info and (not complete or info["complete"]):
+                info["used"] = os.path.getmtime(os.path.join(self.upload_dir(upload_id), "upload.json"))
+                infos.append(info)
+        return sorted(infos, key=lambda i: -i["used"])
+
+    def cleanup(self, keep=None):
+        """
+        Delete uploads past max age, then least recently used ones until under
+        quota. Uploads receiving a chunk right now are left alone.
+        """
+        with self.lock:
+            now = time.time()
+            entries = []
+            for info in self.list(complete=False):
+                lock = self._locks.get(info["id"])
+                if info["id"] == keep or (lock and lock.locked()):
+                    entries.append((float("inf"), self._usage(info["id"]), info["id"]))
+                    continue
+                if now - info["used"] > self.max_age:
+                    self._remove(info["id"])
+                    continue
+                entries.append((info["used"], self._usage(info["id"]), info["id"]))
+            total = sum(size for _, size, _ in entries)
+            for used, size, upload_id in sorted(entries):
+                if total <= self.quota or used == float("inf"):
+                    break
+                self._remove(upload_id)
+                total -= size
+            self.used = total
+
+    def _remove(self, upload_id):
+        shutil.rmtree(self.upload_dir(upload_id), ignore_errors=True)
+        self._locks.pop(upload_id, None)
@@ -4,3 +4,18 @@ def ensure_dir(path):
     if not os.path.exists(path):
         os.makedirs(path)
     return path
+
+
+PITCH_FRAME = (360, 640)   # (height, width) of the frame config.json's pitch box is drawn on
+
+
+def scale_pitch(pitch, width, height):
+    """config.json pitch box {x1, x2, y1, y2} in the pixels of a width x height frame."""
+    sx, sy = width / PITCH_FRAME[1], height / PITCH_FRAME[0]
+    return {"x1": int(round(pitch["x1"] * sx)), "x2": int(round(pitch["x2"] * sx)),
+            "y1": int(round(pitch["y1"] * sy)), "y2": int(round(pitch["y2"] * sy))}
+
+
+def in_pitch(box, xs, ys):
+    """Mask of the points inside a pitch box (already in the points' frame, see scale_pitch)."""
+    return (xs >= box["x1"]) & (xs <= box["x2"]) & (ys >= box["y1"]) & (ys <= box["y2"])
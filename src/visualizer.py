@@ -1,25 +1,25 @@
-import os
 import math
-import matplotlib.pyplot as plt
+from . import charts
+from .track_store import ball_points, is_track_array
+
+# Charts are drawn with NumPy/OpenCV (src/charts.py); these keep the old
+# path-in, path-out interface for the pipeline.
 
 def plot_heatmap(points, out_path, bins=(30,30)):
-    if not points: return None
-    xs=[p[0] for p in points]; ys=[p[1] for p in points]
-    plt.figure(figsize=(4,6))
-    plt.hist2d(xs, ys, bins=bins)
-    plt.gca().invert_yaxis()
-    plt.colorbar(); plt.title("Bowling Heatmap")
-    plt.savefig(out_path); plt.close()
-    return out_path
+    """points is a list of (x, y) or a track store array of ball rows."""
+    if len(points) == 0: return None
+    if is_track_array(points):
+        _, xs, ys = ball_points(points, cls=None)
+    else:
+        xs=[p[0] for p in points]; ys=[p[1] for p in points]
+    return charts.save_png(charts.hist2d(xs, ys, bins=bins, title="Bowling Heatmap"), out_path)
 
 def compute_wagon_wheel(vectors, out_path):
     if not vectors:
-        plt.figure(); plt.text(0.5,0.5,"No shots", ha="center"); plt.axis("off")
-        plt.savefig(out_path); plt.close()
-        return out_path
+        return charts.save_png(charts.message("No shots"), out_path)
     angles = [math.degrees(math.atan2(dy, dx)) for dx,dy in vectors]
-    plt.figure(figsize=(5,5))
-    plt.hist(angles, bins=12)
-    plt.title("Wagon Wheel (shot angles)")
-    plt.savefig(out_path); plt.close()
-    return out_path
+    return charts.save_png(charts.histogram(angles, bins=12, title="Wagon Wheel (shot angles)"), out_path)
+
+def plot_wagon_counts(counts, out_path, title="Wagon Wheel"):
+    """Polar bars of an angle histogram (bin 0 starts at -180 degrees), e.g. a season's shots."""
+    return charts.save_png(charts.wagon_counts(counts, title=title), out_path)
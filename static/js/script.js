@@ -17,6 +17,206 @@ document.addEventListener('DOMContentLoaded', () => {
   const body = document.body;
   const darkModeToggle = document.getElementById('dark-mode-toggle');
 
+  // Follow a queued analysis job until it finishes; onUpdate gets every status payload.
+  // Uses the server-sent event stream when the browser has EventSource, else polls.
+  async function pollJob(statusUrl, onUpdate) {
+    if (window.EventSource) {
+      const job = await new Promise(resolve => {
+        const source = new EventSource(statusUrl + '/events');
+        let last = null;
+        source.onmessage = e => {
+          last = JSON.parse(e.data);
+          onUpdate(last);
+          if (last.state === 'done' || last.state === 'failed') { source.close(); resolve(last); }
+        };
+        source.onerror = () => { source.close(); resolve(null); };
+      });
+      if (job) return job;
+    }
+    while (true) {
+      const res = await fetch(statusUrl, { cache: 'no-store' });
+      const job = await res.json();
+      onUpdate(job);
+      if (!res.ok || job.state === 'done' || job.state === 'failed') return job;
+      await new Promise(r => setTimeout(r, 1000));
+    }
+  }
+  function describeJob(job) {
+    const p = job.progress || {};
+    const rate = p.fps ? ` · ${p.fps} fps` : '';
+    const eta = p.eta != null ? ` · ~${Math.ceil(p.eta)}s left` : '';
+    if (job.state === 'running' && p.total) return `Processing frame ${p.done} / ${p.total}${rate}${eta}`;
+    if (job.state === 'running') return `Processing (${p.done || 0} frames)`;
+    if (job.state === 'failed') return `Analysis failed: ${job.error || 'unknown error'}`;
+    return job.state === 'done' ? 'Done' : 'Queued…';
+  }
+  // Chart URLs answer 202 + a job while their aggregation is built; wait for it and ask again.
+  // Resolves to the final response, or null if the build failed.
+  async function fetchBuilt(url) {
+    while (true) {
+      const res = await fetch(url);
+      if (res.status !== 202) return res;
+      const job = await pollJob((await res.json()).status_url, () => {});
+      if (!job || job.state !== 'done') return null;
+    }
+  }
+
+  // Zoomable heatmap: the wheel zooms around the cursor and dragging pans. Every view
+  // is rendered by the server from the pre-aggregated pyramid, e.g. /uploads/<id>/heatmap.png
+  function zoomableHeatmap(img, baseUrl) {
+    let region = null, frame = null, drag = null, busy = false, queued = null;
+    async function load(r) {
+      if (busy) { queued = r; return; }
+      busy = true;
+      const w = img.clientWidth || 512;
+      const params = new URLSearchParams(r ? {
+        x0: Math.round(r[0]), y0: Math.round(r[1]), x1: Math.round(r[2]), y1: Math.round(r[3]),
+        w, h: Math.max(1, Math.round(w * (r[3] - r[1]) / (r[2] - r[0]))),
+      } : {});
+      try {
+        const res = await fetchBuilt(`${baseUrl}?${params}`);
+        if (res && res.ok) {
+          region = res.headers.get('X-Heatmap-Region').split(',').map(Number);
+          frame = res.headers.get('X-Heatmap-Frame').split(',').map(Number);
+          const old = img.src;
+          img.src = URL.createObjectURL(await res.blob());
+          if (old.startsWith('blob:')) URL.revokeObjectURL(old);
+        }
+      } finally {
+        busy = false;
+        if (queued) { const next = queued; queued = null; load(next); }
+      }
+    }
+    // keep a region inside the frame without changing its size
+    function clamp(r) {
+      const w = Math.min(r[2] - r[0], frame[0]), h = Math.min(r[3] - r[1], frame[1]);
+      const x0 = Math.max(0, Math.min(r[0], frame[0] - w)), y0 = Math.max(0, Math.min(r[1], frame[1] - h));
+      return [x0, y0, x0 + w, y0 + h];
+    }
+    img.addEventListener('wheel', e => {
+      if (!region) return;
+      e.preventDefault();
+      const box = img.getBoundingClientRect();
+      const fx = (e.clientX - box.left) / box.width, fy = (e.clientY - box.top) / box.height;
+      const k = e.deltaY > 0 ? 1.25 : 0.8;
+      const w = Math.max(16, (region[2] - region[0]) * k), h = Math.max(16, (region[3] - region[1]) * k);
+      const cx = region[0] + fx * (region[2] - region[0]), cy = region[1] + fy * (region[3] - region[1]);
+      load(clamp([cx - fx * w, cy - fy * h, cx - fx * w + w, cy - fy * h + h]));
+    }, { passive: false });
+    img.addEventListener('mousedown', e => { if (region) { drag = { x: e.clientX, y: e.clientY, r: region }; e.preventDefault(); } });
+    window.addEventListener('mouseup', () => { drag = null; });
+    window.addEventListener('mousemove', e => {
+      if (!drag) return;
+      const box = img.getBoundingClientRect();
+      const dx = (e.clientX - drag.x) / box.width * (drag.r[2] - drag.r[0]);
+      const dy = (e.clientY - drag.y) / box.height * (drag.r[3] - drag.r[1]);
+      load(clamp([drag.r[0] - dx, drag.r[1] - dy, drag.r[2] - dx, drag.r[3] - dy]));
+    });
+    img.addEventListener('dblclick', () => load(null));   // back to the pitch box
+    img.title = 'Scroll to zoom, drag to pan, double-click to reset';
+    load(null);
+  }
+
+  // Chart data (/uploads/<id>/charts.json) drawn on canvases, so changing a filter
+  // costs one small JSON request instead of a server-side render.
+  const JET = Array.from({ length: 256 }, (_, i) => {
+    const t = i / 255, c = v => Math.round(255 * Math.min(1, Math.max(0, 1.5 - Math.abs(4 * t - v))));
+    return [c(3), c(2), c(1)];
+  });
+  async function decodeGrid(grid) {
+    let bytes = Uint8Array.from(atob(grid.data), ch => ch.charCodeAt(0));
+    if (grid.encoding === 'deflate') {
+      const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+      bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+    if (grid.encoding !== 'rle') return bytes;
+    const out = new Uint8Array(grid.width * grid.height);
+    for (let i = 0, o = 0; i < bytes.length; i += 2) {
+      out.fill(bytes[i + 1], o, o + bytes[i]);
+      o += bytes[i];
+    }
+    return out;
+  }
+  async function drawHeatmapData(canvas, grid) {
+    const values = await decodeGrid(grid);
+    const small = document.createElement('canvas');
+    small.width = grid.width; small.height = grid.height;
+    const sctx = small.getContext('2d');
+    const img = sctx.createImageData(grid.width, grid.height);
+    values.forEach((v, i) => { img.data.set(JET[v], i * 4); img.data[i * 4 + 3] = 255; });
+    sctx.putImageData(img, 0, 0);
+    const ctx = canvas.getContext('2d');
+    ctx.imageSmoothingEnabled = true;
+    ctx.drawImage(small, 0, 0, canvas.width, canvas.height);
+  }
+  function drawWagonData(canvas, wagon) {
+    const ctx = canvas.getContext('2d');
+    const cx = canvas.width / 2, cy = canvas.height / 2, r = Math.min(cx, cy) - 20;
+    const counts = wagon.counts, peak = Math.max(1, ...counts);
+    const width = 2 * Math.PI / counts.length;
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.strokeStyle = '#d2d2d2';
+    [0.5, 1].forEach(k => { ctx.beginPath(); ctx.arc(cx, cy, r * k, 0, 2 * Math.PI); ctx.stroke(); });
+    ctx.fillStyle = 'rgba(0, 128, 0, 0.75)';
+    counts.forEach((n, i) => {
+      if (!n) return;
+      // 0 degrees at the top, clockwise, as on the server-drawn wagon wheel
+      const a0 = (wagon.start_deg * Math.PI / 180) + width * i - Math.PI / 2;
+      ctx.beginPath();
+      ctx.moveTo(cx, cy);
+      ctx.arc(cx, cy, r * n / peak, a0, a0 + width);
+      ctx.closePath();
+      ctx.fill();
+    });
+  }
+  function exploreCharts(panel) {
+    const filter = document.getElementById('lengthFilter');
+    const heatCanvas = document.getElementById('heatmapCanvas');
+    const wagonCanvas = document.getElementById('wagonCanvas');
+    async function load() {
+      const params = new URLSearchParams(filter.value ? { length: filter.value } : {});
+      const res = await fetchBuilt(`${panel.dataset.chartsUrl}?${params}`);
+      if (!res || !res.ok) return;
+      const data = await res.json();
+      const [x0, y0, x1, y1] = data.heatmap.region;
+      heatCanvas.height = Math.round(heatCanvas.width * (y1 - y0) / (x1 - x0));
+      await drawHeatmapData(heatCanvas, data.heatmap);
+      drawWagonData(wagonCanvas, data.wagon);
+    }
+    filter.addEventListener('change', load);
+    panel.style.display = '';
+    load();
+  }
+
+  // Result page: fill in the images once the job behind it completes
+  const jobView = document.getElementById('jobView');
+  if (jobView) {
+    const jobStatus = document.getElementById('jobStatus');
+    const heatmapImg = document.getElementById('heatmapImg');
+    pollJob(jobView.dataset.jobUrl, job => {
+      jobStatus.textContent = describeJob(job);
+      const urls = job.result_urls || {};
+      const partial = job.partial_urls || {};
+      if (partial.partial_heatmap && !urls.pitch_heatmap) {
+        heatmapImg.src = `${partial.partial_heatmap}?frame=${job.progress.done}`;
+      }
+      if (urls.pitch_heatmap) {
+        if (!jobView.dataset.heatmapUrl) heatmapImg.src = urls.pitch_heatmap;
+        else if (!heatmapImg.dataset.zoomable) {
+          heatmapImg.dataset.zoomable = '1';
+          zoomableHeatmap(heatmapImg, jobView.dataset.heatmapUrl);
+        }
+      }
+      if (urls.wagon_wheel) document.getElementById('wagonImg').src = urls.wagon_wheel;
+      const panel = document.getElementById('chartData');
+      if (job.state === 'done' && panel && panel.dataset.chartsUrl && !panel.dataset.loaded) {
+        panel.dataset.loaded = '1';
+        exploreCharts(panel);
+      }
+    }).catch(err => { jobStatus.textContent = `Request failed: ${err.message}`; });
+    return;
+  }
+
   // safety: bail if critical nodes missing and print diagnostics
   if (!fileInput || !uploadBox || !previewContainer || !analysisControls) {
     console.error('Missing one or more required DOM nodes. Check IDs/classes. Found:',
@@ -60,11 +260,11 @@ document.addEventListener('DOMContentLoaded', () => {
   });
   function setAnalysisState(running, message) {
     if (running) {
-      analyzeHeatBtn.disabled = true;
+      if (analyzeHeatBtn) analyzeHeatBtn.disabled = true;
       analyzeTrajBtn.disabled = true;
       analysisStatus.textContent = message || 'Processing...';
     } else {
-      analyzeHeatBtn.disabled = false;
+      if (analyzeHeatBtn) analyzeHeatBtn.disabled = false;
       analyzeTrajBtn.disabled = false;
       analysisStatus.textContent = message || '';
     }
@@ -126,6 +326,53 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   });
 
+  // Resumable upload: the file goes up in UPLOAD_CHUNK slices; if a slice fails
+  // we ask the server where it got to and carry on from there. The upload id is
+  // remembered per file, so re-submitting after a reload resumes too.
+  const UPLOAD_CHUNK = 8 * 1024 * 1024;
+  let currentUploadId = null;
+  async function uploadInChunks(file, onProgress) {
+    const memoKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+    let upload = null;
+    const known = localStorage.getItem(memoKey);
+    if (known) {
+      const res = await fetch(`/uploads/${known}`, { cache: 'no-store' });
+      if (res.ok) upload = await res.json();
+    }
+    if (!upload) {
+      const res = await fetch('/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size }),
+      });
+      upload = await res.json();
+      if (!res.ok) throw new Error(upload.message || 'upload refused');
+      localStorage.setItem(memoKey, upload.upload_id);
+    }
+    let failures = 0;
+    while (!upload.complete) {
+      onProgress(Math.floor(100 * upload.offset / file.size));
+      try {
+        const res = await fetch(upload.upload_url, {
+          method: 'PATCH',
+          headers: { 'Upload-Offset': String(upload.offset) },
+          body: file.slice(upload.offset, upload.offset + UPLOAD_CHUNK),
+        });
+        const json = await res.json();
+        if (res.ok) { upload = json; failures = 0; continue; }
+        if (res.status !== 409) throw new Error(json.message || `HTTP ${res.status}`);
+        upload.offset = json.offset;   // server is elsewhere; resume from there
+      } catch (err) {
+        if (++failures > 5) throw err;
+        await new Promise(r => setTimeout(r, 1000 * failures));
+        const res = await fetch(`/uploads/${upload.upload_id}`, { cache: 'no-store' });
+        if (res.ok) upload = await res.json();
+      }
+    }
+    localStorage.removeItem(memoKey);
+    return upload;
+  }
+
   // Optional: intercept form submit to upload via fetch (AJAX) so user doesn't lose preview
   // If you prefer to keep default full-form submit & reload, you may remove this block.
   if (uploadForm) {
@@ -136,22 +383,13 @@ document.addEventListener('DOMContentLoaded', () => {
         alert('Please select a video first.');
         return;
       }
-      const formData = new FormData();
-      formData.append('video', fileInput.files[0]);
-
       try {
         setAnalysisState(true, 'Uploading...');
-        const resp = await fetch(uploadForm.action, { method: 'POST', body: formData });
-        // after upload, server redirects normally; we handle both response types:
-        if (resp.redirected) {
-          // if server redirected (typical when using flash + redirect), follow the redirect
-          window.location.href = resp.url;
-          return;
-        }
-        const text = await resp.text();
-        console.log('Upload response:', text);
-        // run a check to load server sample if uploaded successfully
-        await checkSampleExists();
+        const upload = await uploadInChunks(fileInput.files[0],
+          pct => setAnalysisState(true, `Uploading... ${pct}%`));
+        currentUploadId = upload.upload_id;
+        document.getElementById('loading_spinner').href = `/heatwagon?upload_id=${encodeURIComponent(currentUploadId)}`;
+        console.log('Upload complete:', upload);
       } catch (err) {
         console.error('Upload failed', err);
         alert('Upload failed: ' + err.message);
@@ -170,6 +408,7 @@ document.addEventListener('DOMContentLoaded', () => {
         return;
       }
       const j = await res.json();
+      if (j.upload_id) currentUploadId = j.upload_id;
       if (j.exists && j.url) {
         showPreviewFromServer(j.url);
       } else {
@@ -187,12 +426,22 @@ document.addEventListener('DOMContentLoaded', () => {
     setAnalysisState(true, `Starting ${friendlyName}...`);
     analysisResults.innerHTML = ''; // clear previous results
     try {
-      const resp = await fetch(endpoint, { method: 'POST' });
-      const json = await resp.json();
+      const resp = await fetch(endpoint, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(currentUploadId ? { upload_id: currentUploadId } : {}),
+      });
+      let json = await resp.json();
+      if (resp.status === 202 && json.status_url) {
+        json = await pollJob(json.status_url, job => setAnalysisState(true, `${friendlyName}: ${describeJob(job)}`));
+        json.status = json.state === 'done' ? 'ok' : 'error';
+        json.message = json.error;
+      }
       if (resp.ok && json.status === 'ok') {
         setAnalysisState(false, `${friendlyName} complete — ${json.message || 'results ready'}.`);
         // show results inline
-        const urls = json.result_urls || (json.result_url ? [json.result_url] : []);
+        let urls = json.result_urls || (json.result_url ? [json.result_url] : []);
+        if (!Array.isArray(urls)) urls = Object.values(urls);
         if (urls.length) {
           urls.forEach(url => {
             const wrapper = document.createElement('div');
@@ -229,7 +478,7 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 
   // wire buttons
-  analyzeHeatBtn.addEventListener('click', () => runAnalysis('/heatwagon', 'Heatmap & Wagon Wheel Analysis'));
+  if (analyzeHeatBtn) analyzeHeatBtn.addEventListener('click', () => runAnalysis('/heatwagon', 'Heatmap & Wagon Wheel Analysis'));
   analyzeTrajBtn.addEventListener('click', () => runAnalysis('/analyze/trajectory', 'Trajectory & On-field Detection'));
 
   function showLoading() {
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def video(tmp_path):
+    """A 20-frame 64x48 video; returns its path."""
+    path = str(tmp_path / "clip.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(20):
+        out.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    out.release()
+    return path
@@ -0,0 +1,41 @@
+import base64
+import zlib
+
+import numpy as np
+import pytest
+
+from src.charts import encode_grid
+
+
+def decode_grid(grid):
+    """What decodeGrid in static/js/script.js does, in NumPy."""
+    data = base64.b64decode(grid["data"])
+    if grid["encoding"] == "deflate":
+        data = zlib.decompress(data)
+    values = np.frombuffer(data, dtype=np.uint8)
+    if grid["encoding"] == "rle":
+        values = np.repeat(values[1::2], values[0::2])
+    return values.reshape(grid["height"], grid["width"])
+
+
+def quantised(grid, levels):
+    step = 255 / (levels - 1)
+    return (np.round(grid / step) * step).round().astype(np.uint8)
+
+
+rng = np.random.default_rng(0)
+GRIDS = {
+    "raw": rng.integers(0, 256, (30, 40), dtype=np.uint8),
+    "rle": np.repeat(np.arange(0, 240, 60, dtype=np.uint8), 300).reshape(30, 40),
+    "deflate": np.tile(np.arange(0, 256, 16, dtype=np.uint8), (30, 5))[:, :40],
+}
+
+
+@pytest.mark.parametrize("name", GRIDS)
+@pytest.mark.parametrize("levels", [256, 32, 2])
+def test_encode_grid_decodes_to_quantised_grid(name, levels):
+    grid = GRIDS[name]
+    encoded = encode_grid(grid, levels)
+    if levels == 256:
+        assert encoded["encoding"] == name
+    np.testing.assert_array_equal(decode_grid(encoded), quantised(grid, levels))
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import pipeline
+from src import checkpoint
+from src.checkpoint import resume, track_resumable, load_checkpoint
+from src.track_store import TRACK_DTYPE, TrackWriter, read_meta
+
+
+DECODED = {"frames": 20, "ball": range(20)}   # what the fake batch_track decodes, and where it sees a ball
+
+
+@pytest.fixture
+def tracked(monkeypatch):
+    """
+    Replace batch_track with one that decodes DECODED["frames"] frames in
+    batches and yields a ball row on the DECODED["ball"] ones; returns the
+    frames it processed.
+    """
+    frames = []
+    monkeypatch.setitem(DECODED, "frames", 20)
+    monkeypatch.setitem(DECODED, "ball", range(20))
+
+    def fake_batch_track(video_path, batch_size=8, start=0, tracker=None, on_decoded=None, **kwargs):
+        for first in range(start, DECODED["frames"], batch_size):
+            end = min(first + batch_size, DECODED["frames"])
+            for i in range(first, end):
+                frames.append(i)
+                if i in DECODED["ball"]:
+                    rows = np.zeros(1, dtype=TRACK_DTYPE)
+                    rows["frame"], rows["cls"], rows["x2"], rows["y2"] = i, 32, 4, 4
+                    yield i, rows
+            if on_decoded:
+                on_decoded(end)
+
+    monkeypatch.setattr(checkpoint, "batch_track", fake_batch_track)
+    monkeypatch.setattr(checkpoint, "make_tracker", lambda frame_rate=30: {"frame_rate": frame_rate})
+    return frames
+
+
+def test_resume_same_run(video, tmp_path, tracked):
+    store = str(tmp_path / "store")
+    track_resumable(video, TrackWriter(store), checkpoint_every=5, run={"backend": "torch", "roi": (1, 2, 3, 4)})
+    writer, start, tracker = resume(store, video, {"backend": "torch", "roi": (1, 2, 3, 4)})
+    assert start == 20 and writer.rows == 20 and tracker == {"frame_rate": 10}
+
+
+def test_checkpoints_without_a_ball(video, tmp_path, tracked, monkeypatch):
+    monkeypatch.setitem(DECODED, "ball", range(3))
+    saved = []
+    monkeypatch.setattr(checkpoint, "save_checkpoint", lambda store_dir, frame, *a: saved.append(frame))
+    track_resumable(video, TrackWriter(str(tmp_path / "store")), checkpoint_every=5, batch_size=4)
+    assert saved == [8, 16, 20]   # every >= 5 decoded frames, then the end; the ball left at frame 3
+
+
+def test_final_checkpoint_at_last_decoded_frame(video, tmp_path, tracked, monkeypatch):
+    store = str(tmp_path / "store")
+    monkeypatch.setitem(DECODED, "frames", 26)   # the file grew past the 20 frames its header claims
+    track_resumable(video, TrackWriter(store), checkpoint_every=100)
+    writer, start, _ = resume(store, video)
+    assert start == 26 and writer.rows == 20
+
+
+def test_resume_rejects_other_run(video, tmp_path, tracked):
+    store = str(tmp_path / "store")
+    track_resumable(video, TrackWriter(store), checkpoint_every=5, run={"backend": "torch"})
+    assert load_checkpoint(store, video, {"backend": "onnxruntime"}) == (None, None)
+    writer, start, tracker = resume(store, video, {"backend": "onnxruntime"})
+    assert (start, writer.rows, tracker) == (0, 0, None)
+
+
+def test_retrack_with_other_backend(video, tmp_path, tracked, monkeypatch):
+    config = {"pitch": {"x1": 0, "x2": 64, "y1": 0, "y2": 48},
+              "tracking": {"mode": "batch", "checkpoint_every": 5},
+              "detector": {"backend": "onnxruntime"}}
+    monkeypatch.setattr(pipeline, "load_config", lambda config_path=None: config)
+    store = str(tmp_path / "store")
+
+    pipeline.track_ball(video, store_dir=store)
+    assert tracked == list(range(20))
+
+    # the video was just written, so its final checkpoint is kept, but it was tracked on another backend
+    config["detector"]["backend"] = "openvino"
+    rows = pipeline.track_ball(video, store_dir=store)
+    assert tracked == list(range(20)) * 2
+    assert len(rows) == 20 and read_meta(store)["backend"] == "openvino"
@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.deliveries import build_index
+from src.track_store import TRACK_DTYPE, TrackWriter, load_tracks
+from src.trajectory import fit_session
+
+
+def session_store(path):
+    """Three deliveries at 30 fps: a 16-frame gap, then a dead ball (60 still sightings), then a 15-frame gap."""
+    frames = np.concatenate([np.arange(0, 20), np.arange(36, 56), np.arange(56, 116),
+                             np.arange(116, 136), np.arange(150, 170)])
+    xs = np.concatenate([10 + 5 * np.arange(20), 10 + 5 * np.arange(20), np.full(60, 105),
+                         200 + 5 * np.arange(20), 300 + 5 * np.arange(20)]).astype(float)
+    ys = 50 + (xs % 97)
+    rows = np.zeros(len(frames), dtype=TRACK_DTYPE)
+    rows["frame"], rows["cls"] = frames, 32
+    rows["x1"] = rows["x2"] = xs
+    rows["y1"] = rows["y2"] = ys
+    writer = TrackWriter(path)
+    writer.add_rows(rows)
+    writer.close(fps=30, width=640, height=360, frame_count=170)
+
+
+def test_index_and_session_fit_agree(tmp_path):
+    store = str(tmp_path / "match.tracks")
+    session_store(store)
+    index = [(d["first_ball"], d["last_ball"]) for d in build_index(store)["deliveries"]]
+    fits = [(d["start"], d["end"]) for d in fit_session(load_tracks(store))]
+
+    # the still run ends the second delivery; the 15-frame gap is not long enough to cut
+    assert index == [(0, 19), (36, 55), (116, 169)]
+    assert fits == index
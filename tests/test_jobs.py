@@ -0,0 +1,76 @@
+import os
+import time
+
+import pytest
+
+from conftest import ROOT
+from src import jobs
+from src.jobs import JobQueue, QueueFull
+
+
+def add(a, b, progress=None):
+    progress(1, 1)
+    return a + b
+
+
+def nap(seconds, progress=None):
+    time.sleep(seconds)
+    return seconds
+
+
+def die(progress=None):
+    os._exit(1)
+
+
+def wait(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status["state"] in ("done", "failed"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {status['state']}")
+
+
+@pytest.fixture
+def queue():
+    q = JobQueue(max_workers=1, max_queue=1)
+    yield q
+    q.shutdown()
+
+
+def test_runs_job_with_progress(queue):
+    status = wait(queue, queue.submit(add, 2, 3, kind="sum"))
+    assert status["state"] == "done" and status["result"] == 5 and status["kind"] == "sum"
+    assert status["progress"]["done"] == 1 and status["progress"]["total"] == 1
+
+
+def test_queue_full_answers_429(queue, monkeypatch):
+    monkeypatch.chdir(ROOT)   # app reads config.json relative to the working directory
+    import app
+    monkeypatch.setattr(app, "JOBS", queue)
+    running, waiting = queue.submit(nap, 0.5), queue.submit(nap, 0)
+    with pytest.raises(QueueFull):
+        queue.submit(nap, 0)
+    with app.app.test_request_context():
+        job_id, (resp, code) = app.submit_job(nap, 0)
+    assert job_id is None and code == 429 and resp.headers["Retry-After"]
+    wait(queue, running), wait(queue, waiting)
+    assert wait(queue, queue.submit(nap, 0))["state"] == "done"
+
+
+def test_prune_forgets_oldest_finished(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "KEEP_FINISHED", 2)
+    done = []
+    for i in range(4):
+        done.append(queue.submit(add, i, i))
+        wait(queue, done[-1])
+    latest = queue.submit(add, 9, 9)
+    assert set(queue.jobs) == {done[2], done[3], latest}
+    assert queue.status(done[0]) is None and done[0] not in queue.progress
+
+
+def test_recovers_from_dead_worker(queue):
+    status = wait(queue, queue.submit(die))
+    assert status["state"] == "failed" and "worker" in status["error"]
+    assert wait(queue, queue.submit(add, 1, 2))["result"] == 3
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+import pipeline
+from conftest import ROOT
+from src.batch_infer import pitch_roi
+from src.heatmap import HeatmapAccumulator
+from src.season import aggregate, SEASON_SHAPE
+from src.track_store import TRACK_DTYPE, TrackWriter
+from src.utils import scale_pitch
+
+CONFIG = os.path.join(ROOT, "config.json")
+PITCH = {"x1": 200, "x2": 440, "y1": 100, "y2": 280}
+
+
+def hd_store(path):
+    """A 1280x720 store with one delivery crossing the frame at y=300 (below the unscaled box)."""
+    rows = np.zeros(40, dtype=TRACK_DTYPE)
+    rows["frame"] = np.arange(40)
+    rows["cls"] = 32
+    rows["x1"] = rows["x2"] = 100 + 28 * np.arange(40)
+    rows["y1"] = rows["y2"] = 300
+    writer = TrackWriter(path)
+    writer.add_rows(rows)
+    writer.close(fps=30, width=1280, height=720, frame_count=40)
+    return rows
+
+
+def test_scale_pitch():
+    assert scale_pitch(PITCH, 640, 360) == PITCH
+    assert scale_pitch(PITCH, 1280, 720) == {"x1": 400, "x2": 880, "y1": 200, "y2": 560}
+
+
+def test_upload_and_season_heatmaps_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "load_config", lambda config_path=CONFIG: {"pitch": PITCH})
+    store = str(tmp_path / "match.tracks")
+    rows = hd_store(store)
+    counts = str(tmp_path / "counts.npy")
+    pipeline.make_pitch_heatmap(rows, (720, 1280), accumulator_path=counts,
+                                out_path=str(tmp_path / "heatmap.png"))
+    upload = HeatmapAccumulator.load(counts, (720, 1280)).total()
+
+    assert upload == 17   # x 408..856 of 100..1192
+    assert aggregate([store], pitch=PITCH, shape=(720, 1280))[2]["points"] == upload
+    assert aggregate([store], pitch=PITCH, shape=SEASON_SHAPE)[2]["points"] == upload
+
+
+def test_roi_covers_scaled_pitch():
+    x1, y1, x2, y2 = pitch_roi(PITCH, 1280, 720)
+    box = scale_pitch(PITCH, 1280, 720)
+    assert x1 <= box["x1"] and y1 <= box["y1"] and x2 >= box["x2"] and y2 >= box["y2"]
+    assert (x1, y1, x2, y2) == (320, 120, 960, 640)
+    assert pitch_roi(PITCH, 640, 360) == (160, 60, 480, 320)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.track_store import TRACK_DTYPE, TrackWriter, load_tracks, read_rows, read_meta, ball_points
+
+
+def rows(frames):
+    out = np.zeros(len(frames), dtype=TRACK_DTYPE)
+    out["frame"] = frames
+    out["cls"] = 32
+    out["x1"], out["y1"] = 2 * np.asarray(frames), 10
+    out["x2"], out["y2"] = out["x1"] + 4, 14
+    return out
+
+
+def test_round_trip_across_chunks(tmp_path):
+    store = str(tmp_path / "s")
+    expected = rows(np.arange(23))
+    writer = TrackWriter(store, chunk_rows=5)
+    seen = []
+    writer.on_rows = seen.append
+    writer.add_rows(expected[:12])
+    for r in expected[12:]:
+        writer.add(int(r["frame"]), [[r["x1"], r["y1"], r["x2"], r["y2"]]], [32], ids=[0], conf=[0.0])
+    writer.close(fps=30, width=640, height=360)
+
+    tracks = load_tracks(store)
+    assert read_meta(store)["rows"] == 23 and read_meta(store)["chunks"] == 5
+    np.testing.assert_array_equal(tracks, expected)
+    np.testing.assert_array_equal(read_rows(store, 4, 17), expected[4:17])
+    np.testing.assert_array_equal(np.concatenate(seen), expected)
+    frames, xs, ys = ball_points(tracks)
+    assert frames.tolist() == list(range(23)) and xs[3] == 8 and ys[3] == 12
+
+
+def test_append_keeps_existing_rows(tmp_path):
+    store = str(tmp_path / "s")
+    first = TrackWriter(store, chunk_rows=4)
+    first.add_rows(rows(np.arange(6)))
+    first.close(fps=30)
+    more = TrackWriter(store, chunk_rows=4, append=True)
+    more.add_rows(rows(np.arange(6, 9)))
+    more.close()
+    np.testing.assert_array_equal(load_tracks(store), rows(np.arange(9)))
+    assert read_meta(store)["fps"] == 30
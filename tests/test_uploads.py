@@ -0,0 +1,112 @@
+import io
+import os
+import time
+
+import pytest
+
+from conftest import ROOT
+from src import uploads
+from src.uploads import UploadStore, OffsetMismatch, QuotaExceeded
+
+KB = 1 / 1024   # quota_mb for a 1 KB quota
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # copy a few bytes at a time so refused chunks are part-written first
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 2)
+
+
+def write(store, upload_id, data, offset):
+    return store.write_chunk(upload_id, io.BytesIO(data), offset, len(data))
+
+
+def test_offset_mismatch_reports_server_offset(tmp_path):
+    store = UploadStore(str(tmp_path))
+    info = store.create("match.mp4", size=10)
+    write(store, info["id"], b"abcd", 0)
+    with pytest.raises(OffsetMismatch) as e:
+        write(store, info["id"], b"abcd", 0)
+    assert e.value.offset == 4 and "byte 4" in str(e.value)
+    assert store.offset(info["id"]) == 4
+
+
+def test_chunk_past_declared_size_is_dropped(tmp_path):
+    store = UploadStore(str(tmp_path))
+    info = store.create("match.mp4", size=6)
+    write(store, info["id"], b"abcd", 0)
+    with pytest.raises(QuotaExceeded):
+        write(store, info["id"], b"efghi", 4)
+    assert store.offset(info["id"]) == 4 and store.used == 4
+    info = write(store, info["id"], b"ef", 4)
+    assert info["complete"]
+    with open(store.video_path(info["id"]), "rb") as f:
+        assert f.read() == b"abcdef"
+
+
+def test_chunk_over_quota_is_dropped(tmp_path):
+    store = UploadStore(str(tmp_path), quota_mb=KB)
+    info = store.create("match.mp4")
+    with pytest.raises(QuotaExceeded):
+        store.create("other.mp4", size=2048)
+    write(store, info["id"], b"x" * 1000, 0)
+    with pytest.raises(QuotaExceeded):
+        write(store, info["id"], b"y" * 100, 1000)
+    assert store.offset(info["id"]) == 1000 and store.used == 1000
+    write(store, info["id"], b"y" * 24, 1000)
+    assert store.used == 1024
+
+
+def test_finish_unknown_size(tmp_path):
+    store = UploadStore(str(tmp_path))
+    info = store.create("match.mp4")
+    write(store, info["id"], b"abc", 0)
+    info = write(store, info["id"], b"de", 3)
+    assert not info["complete"] and info["size"] is None
+    info = store.finish(info["id"])
+    assert info["complete"] and info["size"] == 5 and store.offset(info["id"]) == 5
+    assert os.path.exists(store.video_path(info["id"]))
+    assert not os.path.exists(store.video_path(info["id"]) + ".part")
+    with pytest.raises(OffsetMismatch):
+        write(store, info["id"], b"f", 5)
+
+
+def test_cleanup_drops_old_then_least_recently_used(tmp_path):
+    store = UploadStore(str(tmp_path), max_age_hours=1, quota_mb=KB)
+    old, lru, recent = (store.create(f"{n}.mp4") for n in ("old", "lru", "recent"))
+    for info in (old, lru, recent):
+        write(store, info["id"], b"x" * 200, 0)
+    now = time.time()
+    for info, age in ((old, 7200), (lru, 60), (recent, 0)):
+        path = os.path.join(store.upload_dir(info["id"]), "upload.json")
+        os.utime(path, (now - age, now - age))
+
+    store.cleanup()
+    assert store.info(old["id"]) is None
+    assert store.info(lru["id"]) and store.info(recent["id"])
+
+    # charts and annotated video land in outputs/ without a reservation
+    with open(os.path.join(store.out_dir(recent["id"]), "chart.png"), "wb") as f:
+        f.write(b"x" * 500)
+    store.cleanup()
+    assert store.info(lru["id"]) is None and store.info(recent["id"])
+    assert store.used == store._usage(recent["id"]) <= store.quota
+
+
+def test_chunk_endpoint_statuses(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)   # app reads config.json relative to the working directory
+    import app
+    monkeypatch.setattr(app, "UPLOADS", UploadStore(str(tmp_path), quota_mb=KB))
+    client = app.app.test_client()
+    r = client.post("/uploads", json={"filename": "match.mp4", "size": 6})
+    assert r.status_code == 201
+    url = r.get_json()["upload_url"]
+    assert client.patch(url, data=b"abcd", headers={"Upload-Offset": "0"}).status_code == 200
+
+    r = client.patch(url, data=b"ef", headers={"Upload-Offset": "0"})
+    assert r.status_code == 409 and r.get_json()["offset"] == 4
+    assert client.patch(url, data=b"efg", headers={"Upload-Offset": "4"}).status_code == 413
+    assert client.patch(url, data=b"ef", headers={"Upload-Offset": "x"}).status_code == 400
+    r = client.patch(url, data=b"ef", headers={"Upload-Offset": "4"})
+    assert r.status_code == 200 and r.get_json()["complete"]
+    assert client.post("/uploads", json={"filename": "big.mp4", "size": 4096}).status_code == 413